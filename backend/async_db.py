@@ -0,0 +1,92 @@
+"""
+Awaitable access to the synchronous crud/database functions for the API.
+
+Calls run on a dedicated thread pool, so a slow query (a cold COUNT on /results/, a
+large search) only occupies one of its threads while the event loop keeps serving
+other requests. Reads are additionally limited to API_DB_MAX_CONCURRENT_READS at a
+time; further reads wait for a slot instead of taking every pooled connection from
+the monitor and the results writer.
+
+    keywords = await async_db.read(crud.get_all_keywords, active_only=True)
+
+With API_DB_THREADS=0 calls run directly on the event loop (the previous behaviour).
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from backend import metrics
+from backend.config import settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_read_slots = asyncio.Semaphore(max(1, settings.API_DB_MAX_CONCURRENT_READS))
+_running = {'read': 0, 'write': 0}
+_waiting = 0
+_DONE = object()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.API_DB_THREADS, thread_name_prefix="api-db")
+        return _executor
+
+
+async def _call(kind: str, fn: Callable, args, kwargs) -> Any:
+    _running[kind] += 1
+    try:
+        if settings.API_DB_THREADS <= 0:
+            return fn(*args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
+    finally:
+        _running[kind] -= 1
+
+
+async def read(fn: Callable, *args, **kwargs) -> Any:
+    """Runs a read-only DB call off the event loop, at most API_DB_MAX_CONCURRENT_READS at once."""
+    global _waiting
+    _waiting += 1
+    try:
+        await _read_slots.acquire()
+    finally:
+        _waiting -= 1
+    try:
+        return await _call('read', fn, args, kwargs)
+    finally:
+        _read_slots.release()
+
+
+async def write(fn: Callable, *args, **kwargs) -> Any:
+    """Runs a DB call that writes off the event loop. SQLite serializes writers itself."""
+    return await _call('write', fn, args, kwargs)
+
+
+async def iterate(iterator: Iterator) -> AsyncIterator:
+    """Pulls every item of a blocking iterator (e.g. a cursor-backed generator) through read()."""
+    while True:
+        item = await read(next, iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+def stats() -> Dict[str, int]:
+    return {'running_reads': _running['read'], 'running_writes': _running['write'], 'waiting_reads': _waiting}
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+metrics.registry.gauge(
+    "rss_api_db_calls", "API database calls running on the DB threads or waiting for a read slot.", ["state"],
+    callback=lambda: {('running_read',): _running['read'], ('running_write',): _running['write'], ('waiting_read',): _waiting},
+)
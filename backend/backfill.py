@@ -0,0 +1,165 @@
+"""
+Retroactive matching: keywords that are added, renamed or reactivated are matched
+against the entry archive, so entries fetched in the last ENTRY_ARCHIVE_DAYS are found
+without fetching any feed again.
+
+Keywords queued while a scan runs are matched together in the next scan. A scan reads
+the archive in id order, BACKFILL_BATCH_SIZE entries at a time, and stores matches
+through the results writer; an entry that is already a result gains the new keyword
+through the duplicate merge, which also makes cached result counts recount.
+Feed runs keep matching with the old keyword set until their keyword cache notices the
+change, so a scan also covers whatever is archived during that time.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend import crud, dates, metrics
+from backend.config import settings
+from backend.events import result_broadcaster
+from backend.matcher import KeywordMatcher
+from backend.processing import unpack_entry
+from backend.writer import result_writer
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordBackfill:
+    """Runs backfill scans on one background thread and keeps the status of recent ones."""
+
+    def __init__(
+        self,
+        batch_size: int = settings.BACKFILL_BATCH_SIZE,
+        pause_seconds: float = settings.BACKFILL_BATCH_PAUSE_SECONDS,
+        history: int = 50,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.pause_seconds = pause_seconds
+        self.history = history
+        self._lock = threading.Lock()
+        self._pending: Dict[int, float] = {} # keyword id -> monotonic time it was queued
+        self._jobs: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, keyword_id: int) -> Dict[str, Any]:
+        """Queues a keyword for matching against the archive; returns its job status."""
+        with self._lock:
+            self._pending[keyword_id] = time.monotonic()
+            job = {
+                'keyword_id': keyword_id,
+                'keyword': None,
+                'state': 'queued',
+                'queued_at': dates.now_utc().isoformat(),
+                'finished_at': None,
+                'scanned': 0,
+                'matched': 0,
+                'new_results': 0,
+                'error': None,
+            }
+            self._jobs.pop(keyword_id, None)
+            self._jobs[keyword_id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="keyword-backfill", daemon=True)
+                self._thread.start()
+            return dict(job)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Recent backfill jobs, newest first."""
+        with self._lock:
+            return [dict(job) for job in reversed(self._jobs.values())]
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                pending, self._pending = self._pending, {}
+            try:
+                self._scan(pending)
+            except Exception as e:
+                logger.error(f"Keyword backfill failed: {e}", exc_info=True)
+                with self._lock:
+                    for keyword_id in pending:
+                        job = self._jobs.get(keyword_id)
+                        if job and job['state'] in ('queued', 'running'):
+                            job.update(state='failed', error=str(e), finished_at=dates.now_utc().isoformat())
+
+    def _scan(self, pending: Dict[int, float]):
+        jobs: Dict[str, Dict[str, Any]] = {}
+        for keyword_id in pending:
+            keyword = crud.get_keyword(keyword_id)
+            job = self._jobs.get(keyword_id)
+            if job is None:
+                continue
+            if not keyword or not keyword['is_active']:
+                job.update(state='skipped', finished_at=dates.now_utc().isoformat())
+                continue
+            job.update(state='running', keyword=keyword['keyword'])
+            jobs[keyword['keyword'].lower()] = job
+        if not jobs:
+            return
+
+        matcher = KeywordMatcher(list(jobs))
+        # Entries archived until every process has reloaded its keywords may have missed them
+        settle_until = max(pending.values()) + 2 * settings.KEYWORD_CACHE_CHECK_SECONDS
+        started = time.perf_counter()
+        new_results = 0
+        last_id = 0
+        while True:
+            rows = crud.get_archived_entries(last_id, self.batch_size)
+            if not rows:
+                wait = settle_until - time.monotonic()
+                if wait <= 0:
+                    break
+                time.sleep(wait)
+                continue
+            last_id = rows[-1]['id']
+
+            matches = defaultdict(list)
+            for row in rows:
+                title, summary = unpack_entry(row['content'])
+                matched = matcher.match(f"{title.lower()} {summary.lower()}")
+                if not matched:
+                    continue
+                for keyword in matched:
+                    jobs[keyword]['matched'] += 1
+                matches[row['feed_id']].append({
+                    'title': title,
+                    'link': row['link'],
+                    'summary': summary,
+                    'published_date': datetime.fromisoformat(row['published_date']) if row['published_date'] else None,
+                    'matched_keywords': matched,
+                })
+            for job in jobs.values():
+                job['scanned'] += len(rows)
+            metrics.backfill_entries.inc(len(rows), ["scanned"])
+            metrics.backfill_entries.inc(sum(map(len, matches.values())), ["matched"])
+
+            futures = [result_writer.submit(feed_id, entries) for feed_id, entries in matches.items()]
+            new_ids = [result_id for future in futures for result_id in future.result()]
+            if new_ids:
+                new_results += len(new_ids)
+                metrics.results_stored.inc(len(new_ids))
+                for job in jobs.values():
+                    job['new_results'] = new_results
+                if result_broadcaster.subscriber_count:
+                    result_broadcaster.publish(crud.get_results_by_ids(new_ids))
+            if len(rows) == self.batch_size:
+                time.sleep(self.pause_seconds)
+
+        finished_at = dates.now_utc().isoformat()
+        for job in jobs.values():
+            job.update(state='done', finished_at=finished_at)
+        logger.info(
+            f"Backfilled keywords {sorted(jobs)}: scanned {next(iter(jobs.values()))['scanned']} archived entries, "
+            f"{new_results} new results in {time.perf_counter() - started:.1f}s."
+        )
+
+
+keyword_backfill = KeywordBackfill()
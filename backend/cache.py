@@ -0,0 +1,58 @@
+import threading
+import time
+from typing import Any, Callable, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class VersionedCache(Generic[T]):
+    """
+    In-process cache for small, rarely changing tables.
+
+    The value is reloaded when invalidate() was called by a write path in this process,
+    or when the database-side version (bumped by triggers) has moved, which catches
+    changes made by other processes or directly in the DB. The database version is
+    checked at most once every `check_interval` seconds, so reads are normally served
+    from memory without touching SQLite.
+
+    `version` identifies the loaded value for dependants (e.g. the compiled keyword
+    matcher, the seen-entry index). With a db_version_loader it is the database version,
+    read before loading, so every process labels the same keyword set alike and a value
+    is never labelled newer than it is; otherwise it counts the reloads of this cache.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], T],
+        db_version_loader: Optional[Callable[[], Any]] = None,
+        check_interval: float = 5.0,
+    ):
+        self._loader = loader
+        self._db_version_loader = db_version_loader
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._db_version: Any = None
+        self._checked_at = 0.0
+        self._stale = True
+        self.version = 0
+
+    def invalidate(self):
+        self._stale = True
+
+    def get(self) -> Tuple[int, T]:
+        """Returns (version, value), reloading first if the cached value is out of date."""
+        if not self._stale and time.monotonic() - self._checked_at < self._check_interval:
+            return self.version, self._value
+        with self._lock:
+            now = time.monotonic()
+            if self._stale or now - self._checked_at >= self._check_interval:
+                db_version = self._db_version_loader() if self._db_version_loader else None
+                if self._stale or db_version != self._db_version:
+                    # Clear the flag before loading so an invalidation during the load is not lost
+                    self._stale = False
+                    self._value = self._loader()
+                    self._db_version = db_version
+                    self.version = db_version if self._db_version_loader else self.version + 1
+                self._checked_at = now
+            return self.version, self._value
@@ -9,5 +9,68 @@ class Settings:
     LOG_FILE_PATH: str = os.getenv("LOG_FILE_PATH", "logs/app.log")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     SUMMARY_MAX_LENGTH: int = int(os.getenv("SUMMARY_MAX_LENGTH", 1000)) # Max length for summary field
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 16)) # 0 disables pooling (one connection per call)
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))
+    DB_JOURNAL_MODE: str = os.getenv("DB_JOURNAL_MODE", "WAL") # WAL lets API reads run while the monitor writes
+    DB_SYNCHRONOUS: str = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+    DB_BUSY_TIMEOUT_MS: int = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+    DB_MMAP_SIZE: int = int(os.getenv("DB_MMAP_SIZE", 256 * 1024 * 1024))
+    DB_CACHE_SIZE: int = int(os.getenv("DB_CACHE_SIZE", -20000)) # Negative values are KiB
+    FETCH_TIMEOUT_SECONDS: float = float(os.getenv("FETCH_TIMEOUT_SECONDS", 20))
+    FETCH_MAX_CONNECTIONS: int = int(os.getenv("FETCH_MAX_CONNECTIONS", 200)) # Shared pool size across all hosts
+    FETCH_KEEPALIVE_SECONDS: float = float(os.getenv("FETCH_KEEPALIVE_SECONDS", 30)) # Idle time before pooled connections close
+    FETCH_PER_HOST_LIMIT: int = int(os.getenv("FETCH_PER_HOST_LIMIT", 8)) # Concurrent requests per host
+    FETCH_MAX_BODY_BYTES: int = int(os.getenv("FETCH_MAX_BODY_BYTES", 16 * 1024 * 1024)) # Larger feed bodies are abandoned and count as a failed fetch; 0 for no limit
+    FETCH_SPOOL_BYTES: int = int(os.getenv("FETCH_SPOOL_BYTES", 1024 * 1024)) # Larger bodies are written to a temporary file while downloading and parsed from there; 0 keeps every body in memory
+    FETCH_USER_AGENT: str = os.getenv("FETCH_USER_AGENT", "rss-monitor/1.0 (+https://github.com/L00kAhead/rss-monitor)")
+    KEYWORD_CACHE_CHECK_SECONDS: float = float(os.getenv("KEYWORD_CACHE_CHECK_SECONDS", 5)) # How often cached keywords are checked against the DB
+    FEED_STREAM_PARSE: bool = os.getenv("FEED_STREAM_PARSE", "true").lower() in ("1", "true", "yes") # Streaming parser first, feedparser only for documents it does not handle
+    FEED_EARLY_STOP_ENTRIES: int = int(os.getenv("FEED_EARLY_STOP_ENTRIES", 3)) # Known entries in a row, older than anything new, after which parsing stops; 0 reads every entry
+    SEEN_ENTRIES_PER_FEED: int = int(os.getenv("SEEN_ENTRIES_PER_FEED", 1000)) # Links remembered per feed to skip re-processing
+    WRITER_MAX_BATCHES_PER_COMMIT: int = int(os.getenv("WRITER_MAX_BATCHES_PER_COMMIT", 64)) # Feed runs grouped into one transaction
+    API_DB_MAX_CONCURRENT_READS: int = int(os.getenv("API_DB_MAX_CONCURRENT_READS", min(8, 2 * (os.cpu_count() or 1)))) # Further API reads wait; more only adds contention
+    API_DB_THREADS: int = int(os.getenv("API_DB_THREADS", API_DB_MAX_CONCURRENT_READS + 2)) # Threads running the API's database calls (reads + writes); 0 runs them on the event loop
+    STREAM_CLIENT_QUEUE_SIZE: int = int(os.getenv("STREAM_CLIENT_QUEUE_SIZE", 100)) # Pending events per /results/stream client
+    STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("STREAM_HEARTBEAT_SECONDS", 15))
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000)) # Rows per query and per chunk of /results/export
+    SCHEDULER_ADAPTIVE: bool = os.getenv("SCHEDULER_ADAPTIVE", "true").lower() in ("1", "true", "yes") # Learn per-feed intervals from observed updates
+    SCHEDULER_MIN_INTERVAL_MINUTES: float = float(os.getenv("SCHEDULER_MIN_INTERVAL_MINUTES", 1))
+    SCHEDULER_MAX_INTERVAL_MINUTES: float = float(os.getenv("SCHEDULER_MAX_INTERVAL_MINUTES", 360))
+    SCHEDULER_JITTER_FRACTION: float = float(os.getenv("SCHEDULER_JITTER_FRACTION", 0.1)) # Random spread of each run, as a fraction of the interval
+    SCHEDULER_STARTUP_SPREAD_SECONDS: float = float(os.getenv("SCHEDULER_STARTUP_SPREAD_SECONDS", 120)) # First runs are spread over this window
+    SCHEDULER_RECONCILE_MINUTES: float = float(os.getenv("SCHEDULER_RECONCILE_MINUTES", 10)) # Periodic DB/job diff; 0 disables
+    FEED_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("FEED_CIRCUIT_FAILURE_THRESHOLD", 3)) # Consecutive failures before a feed is backed off
+    FEED_BACKOFF_BASE_MINUTES: float = float(os.getenv("FEED_BACKOFF_BASE_MINUTES", 5)) # Doubles with every further failure
+    FEED_BACKOFF_MAX_MINUTES: float = float(os.getenv("FEED_BACKOFF_MAX_MINUTES", 720))
+    FEED_AUTO_DISABLE_FAILURES: int = int(os.getenv("FEED_AUTO_DISABLE_FAILURES", 20)) # Deactivate after this many consecutive failures; 0 never
+    METRICS_PER_FEED: bool = os.getenv("METRICS_PER_FEED", "true").lower() in ("1", "true", "yes") # Per-feed series in /metrics; disable for very large fleets
+    DEDUP_CONTENT: bool = os.getenv("DEDUP_CONTENT", "true").lower() in ("1", "true", "yes") # Merge entries with the same title and summary; URL variants are always merged
+    DEDUP_SUMMARY_WORDS: int = int(os.getenv("DEDUP_SUMMARY_WORDS", 20)) # Summary words in the content hash; copies often truncate summaries differently
+    DEDUP_MIN_WORDS: int = int(os.getenv("DEDUP_MIN_WORDS", 6)) # Shorter texts get no content hash (too likely to collide)
+    DEDUP_TRACKING_PARAMS: set = {p.strip().lower() for p in os.getenv("DEDUP_TRACKING_PARAMS", "").split(",") if p.strip()} # Extra query parameters to strip
+    RETENTION_MAX_AGE_DAYS: float = float(os.getenv("RETENTION_MAX_AGE_DAYS", 0)) # Results published longer ago are removed; 0 keeps them forever
+    RETENTION_MAX_ROWS: int = int(os.getenv("RETENTION_MAX_ROWS", 0)) # Cap on the whole results table, oldest removed first; 0 for no cap
+    RETENTION_ARCHIVE: bool = os.getenv("RETENTION_ARCHIVE", "true").lower() in ("1", "true", "yes") # Write removed results to archive files first
+    RETENTION_KEEP_RECENT_PER_FEED: int = int(os.getenv("RETENTION_KEEP_RECENT_PER_FEED", 100)) # Never removed, so entries still in a feed are not stored again
+    RETENTION_BATCH_SIZE: int = int(os.getenv("RETENTION_BATCH_SIZE", 500)) # Results removed per transaction
+    RETENTION_BATCH_PAUSE_SECONDS: float = float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", 0.05)) # Lets the results writer in between batches
+    RETENTION_INTERVAL_MINUTES: float = float(os.getenv("RETENTION_INTERVAL_MINUTES", 60)) # Retention and DB maintenance runs; 0 disables
+    ENTRY_ARCHIVE_DAYS: float = float(os.getenv("ENTRY_ARCHIVE_DAYS", 7)) # Fetched entries kept (compressed) for matching keywords added later; 0 disables
+    ENTRY_ARCHIVE_MAX_SUMMARY: int = int(os.getenv("ENTRY_ARCHIVE_MAX_SUMMARY", 8000)) # Summary characters kept per archived entry
+    BACKFILL_BATCH_SIZE: int = int(os.getenv("BACKFILL_BATCH_SIZE", 2000)) # Archived entries matched per batch when keywords are added
+    BACKFILL_BATCH_PAUSE_SECONDS: float = float(os.getenv("BACKFILL_BATCH_PAUSE_SECONDS", 0.02)) # Lets the results writer in between batches
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_MAX_FILE_MB: float = float(os.getenv("ARCHIVE_MAX_FILE_MB", 64)) # A new archive file is started at this compressed size
+    ARCHIVE_KEEP_FILES: int = int(os.getenv("ARCHIVE_KEEP_FILES", 0)) # Oldest archive files beyond this count are deleted; 0 keeps all
+    DB_INCREMENTAL_VACUUM_PAGES: int = int(os.getenv("DB_INCREMENTAL_VACUUM_PAGES", 2000)) # Free pages released per step of incremental VACUUM
+    DB_ANALYZE_LIMIT: int = int(os.getenv("DB_ANALYZE_LIMIT", 1000)) # PRAGMA analysis_limit for the scheduled ANALYZE; 0 analyzes fully
+    MONITOR_IN_API: bool = os.getenv("MONITOR_IN_API", "true").lower() in ("1", "true", "yes") # Run feed monitoring in the API process; false when it runs in python -m backend.worker
+    FEED_LEASES: bool = os.getenv("FEED_LEASES", "false").lower() in ("1", "true", "yes") # Split feeds between processes sharing the database through leases (always on in backend.worker)
+    LEASE_TTL_SECONDS: float = float(os.getenv("LEASE_TTL_SECONDS", 30)) # Leases not renewed for this long are taken over by other workers
+    LEASE_HEARTBEAT_SECONDS: float = float(os.getenv("LEASE_HEARTBEAT_SECONDS", 10)) # Lease renewal, rebalancing and claiming of new feeds; well below the TTL
+    WORKER_ID: str = os.getenv("WORKER_ID", "") # Defaults to host:pid:random
+    STREAM_POLL_SECONDS: float = float(os.getenv("STREAM_POLL_SECONDS", 1)) # How often results stored by other processes are read for /results/stream
+    PARSE_WORKERS: int = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1)) # Processes that parse and match feed bodies; 0 parses in-process
+    PROCESSING_WORKERS: int = int(os.getenv("PROCESSING_WORKERS", 2 * (os.cpu_count() or 1) + 2)) # Threads that hand bodies to the parse pool and store matches
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,8 +1,16 @@
+import base64
+import html
+import json
 import sqlite3
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from datetime import datetime
+from backend import dates, dedup
+from backend.cache import VersionedCache
 from backend.database import get_db_connection
-from backend.models import KeywordCreate, KeywordUpdate, RSSFeedCreate, RSSFeedUpdate
+from backend.models import KeywordCreate, KeywordUpdate, RSSFeedCreate, RSSFeedUpdate, RetentionPolicyUpdate
 from backend.config import settings
 import logging
 
@@ -14,6 +22,7 @@ def create_keyword(keyword: KeywordCreate) -> Optional[Dict[str, Any]]:
     try:
         cursor.execute("INSERT INTO keywords (keyword) VALUES (?)", (keyword.keyword.lower(),))
         conn.commit()
+        invalidate_keyword_cache()
         keyword_id = cursor.lastrowid
         return get_keyword(keyword_id)
     except sqlite3.IntegrityError:
@@ -46,6 +55,31 @@ def get_all_keywords(active_only: bool = False) -> List[Dict[str, Any]]:
     conn.close()
     return [dict(row) for row in rows]
 
+def get_data_version(name: str) -> int:
+    """Reads a change counter maintained by triggers (see database.create_tables)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT version FROM data_versions WHERE name = ?", (name,))
+    row = cursor.fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+_active_keywords_cache = VersionedCache(
+    loader=lambda: get_all_keywords(active_only=True),
+    db_version_loader=lambda: get_data_version('keywords'),
+    check_interval=settings.KEYWORD_CACHE_CHECK_SECONDS,
+)
+
+def get_active_keywords_cached() -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Active keywords served from memory, as (version, keywords). The version is the
+    'keywords' data version the set was loaded at, the same in every process.
+    """
+    return _active_keywords_cache.get()
+
+def invalidate_keyword_cache():
+    _active_keywords_cache.invalidate()
+
 def update_keyword(keyword_id: int, keyword: KeywordUpdate) -> Optional[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -69,6 +103,7 @@ def update_keyword(keyword_id: int, keyword: KeywordUpdate) -> Optional[Dict[str
     try:
         cursor.execute(query, tuple(params))
         conn.commit()
+        invalidate_keyword_cache()
         return get_keyword(keyword_id)
     except Exception as e:
         logger.error(f"Error updating keyword {keyword_id}: {e}")
@@ -82,8 +117,11 @@ def delete_keyword(keyword_id: int) -> bool:
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM keywords WHERE id = ?", (keyword_id,))
+        deleted = cursor.rowcount > 0
+        cursor.execute("DELETE FROM result_keywords WHERE keyword_id = ?", (keyword_id,))
         conn.commit()
-        return cursor.rowcount > 0
+        invalidate_keyword_cache()
+        return deleted
     except Exception as e:
         logger.error(f"Error deleting keyword {keyword_id}: {e}")
         conn.rollback()
@@ -92,6 +130,12 @@ def delete_keyword(keyword_id: int) -> bool:
         conn.close()
 
 #  RSS Feed CRUD Operations 
+_FEED_COLUMNS = (
+    "id, url, name, last_fetched, fetch_interval_minutes, is_active, "
+    "consecutive_failures, last_error, last_status_code, last_latency_ms, "
+    "last_success_at, last_failure_at, backoff_until, auto_disabled"
+)
+
 def create_rss_feed(feed: RSSFeedCreate) -> Optional[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -117,7 +161,7 @@ def get_rss_feed(feed_id: int) -> Optional[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute(
-        "SELECT id, url, name, last_fetched, fetch_interval_minutes, is_active FROM rss_feeds WHERE id = ?",
+        f"SELECT {_FEED_COLUMNS} FROM rss_feeds WHERE id = ?",
         (feed_id,)
     )
     row = cursor.fetchone()
@@ -127,7 +171,7 @@ def get_rss_feed(feed_id: int) -> Optional[Dict[str, Any]]:
 def get_all_rss_feeds(active_only: bool = False) -> List[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
-    query = "SELECT id, url, name, last_fetched, fetch_interval_minutes, is_active FROM rss_feeds"
+    query = f"SELECT {_FEED_COLUMNS} FROM rss_feeds"
     params = []
     if active_only:
         query += " WHERE is_active = 1"
@@ -137,6 +181,13 @@ def get_all_rss_feeds(active_only: bool = False) -> List[Dict[str, Any]]:
     return [dict(row) for row in rows]
 
 def update_rss_feed(feed_id: int, feed: RSSFeedUpdate) -> Optional[Dict[str, Any]]:
+    current = get_rss_feed(feed_id)
+    if current is None:
+        return None
+    url_changed = feed.url is not None and str(feed.url) != current['url']
+    interval_changed = feed.fetch_interval_minutes is not None and feed.fetch_interval_minutes != current['fetch_interval_minutes']
+    reactivated = bool(feed.is_active) and not current['is_active']
+
     conn = get_db_connection()
     cursor = conn.cursor()
     update_fields = []
@@ -145,15 +196,23 @@ def update_rss_feed(feed_id: int, feed: RSSFeedUpdate) -> Optional[Dict[str, Any
     if feed.url is not None:
         update_fields.append("url = ?")
         params.append(str(feed.url))
+    if url_changed:
+        # Validators belong to the old URL
+        update_fields.append("etag = NULL")
+        update_fields.append("last_modified = NULL")
     if feed.name is not None:
         update_fields.append("name = ?")
         params.append(feed.name)
     if feed.fetch_interval_minutes is not None:
         update_fields.append("fetch_interval_minutes = ?")
         params.append(feed.fetch_interval_minutes)
+    reset_schedule = url_changed or interval_changed
     if feed.is_active is not None:
         update_fields.append("is_active = ?")
         params.append(1 if feed.is_active else 0)
+    if url_changed or reactivated:
+        # A new URL or a manual reactivation gets a fresh start from the circuit breaker
+        update_fields.extend(["consecutive_failures = 0", "backoff_until = NULL", "auto_disabled = 0"])
 
     if not update_fields:
         conn.close()
@@ -164,6 +223,9 @@ def update_rss_feed(feed_id: int, feed: RSSFeedUpdate) -> Optional[Dict[str, Any
 
     try:
         cursor.execute(query, tuple(params))
+        if reset_schedule:
+            # Learned intervals describe the old URL or are superseded by the new setting
+            cursor.execute("DELETE FROM feed_schedule WHERE feed_id = ?", (feed_id,))
         conn.commit()
         return get_rss_feed(feed_id)
     except Exception as e:
@@ -177,8 +239,22 @@ def delete_rss_feed(feed_id: int) -> bool:
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
+        # Results also found in other feeds move to one of those; the rest are deleted
+        cursor.execute("DELETE FROM result_sources WHERE feed_id = ?", (feed_id,))
+        cursor.execute(
+            """
+            UPDATE results SET feed_id = (SELECT MIN(feed_id) FROM result_sources WHERE result_id = results.id)
+            WHERE feed_id = ? AND EXISTS (SELECT 1 FROM result_sources WHERE result_id = results.id)
+            """,
+            (feed_id,)
+        )
         # Also delete associated results to maintain data integrity
         cursor.execute("DELETE FROM results WHERE feed_id = ?", (feed_id,))
+        cursor.execute("DELETE FROM feed_schedule WHERE feed_id = ?", (feed_id,))
+        cursor.execute("DELETE FROM retention_policies WHERE feed_id = ?", (feed_id,))
+        cursor.execute("DELETE FROM feed_leases WHERE feed_id = ?", (feed_id,))
+        cursor.execute("DELETE FROM feed_refetch_requests WHERE feed_id = ?", (feed_id,))
+        cursor.execute("DELETE FROM entry_archive WHERE feed_id = ?", (feed_id,))
         cursor.execute("DELETE FROM rss_feeds WHERE id = ?", (feed_id,))
         conn.commit()
         return cursor.rowcount > 0
@@ -195,7 +271,7 @@ def update_last_fetched_time(feed_id: int):
     try:
         cursor.execute(
             "UPDATE rss_feeds SET last_fetched = ? WHERE id = ?",
-            (datetime.now().isoformat(), feed_id)
+            (dates.now_utc().isoformat(), feed_id)
         )
         conn.commit()
     except Exception as e:
@@ -204,27 +280,525 @@ def update_last_fetched_time(feed_id: int):
     finally:
         conn.close()
 
-#  Results Operations 
-def add_result(feed_id: int, title: str, link: str, summary: str, published_date: Optional[datetime], matched_keywords: List[str]) -> bool:
+def get_feed_validators(feed_id: int) -> Dict[str, Optional[str]]:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT etag, last_modified FROM rss_feeds WHERE id = ?", (feed_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row) if row else {"etag": None, "last_modified": None}
+
+def update_feed_validators(feed_id: int, etag: Optional[str], last_modified: Optional[str]):
+    """Stores the HTTP validators of the latest successful fetch and moves last_fetched forward."""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        # Truncate summary if too long
-        if summary and len(summary) > settings.SUMMARY_MAX_LENGTH:
-            summary = summary[:settings.SUMMARY_MAX_LENGTH] + "..."
+        cursor.execute(
+            "UPDATE rss_feeds SET etag = ?, last_modified = ?, last_fetched = ? WHERE id = ?",
+            (etag, last_modified, dates.now_utc().isoformat(), feed_id)
+        )
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error updating validators for feed {feed_id}: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
 
-        published_date_str = published_date.isoformat() if published_date else None
-        matched_keywords_str = ",".join(matched_keywords)
+def record_fetch_success(feed_id: int, status_code: Optional[int], latency_ms: Optional[float]):
+    """Closes the circuit breaker of a feed and stores the health of its latest fetch."""
+    now = dates.now_utc().isoformat()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            UPDATE rss_feeds SET
+                consecutive_failures = 0, backoff_until = NULL, last_status_code = ?,
+                last_latency_ms = ?, last_success_at = ?, last_fetched = ?
+            WHERE id = ?
+            """,
+            (status_code, latency_ms, now, now, feed_id)
+        )
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error recording fetch success for feed {feed_id}: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
 
+def record_fetch_failure(feed_id: int, error: str, status_code: Optional[int], latency_ms: Optional[float]) -> int:
+    """Stores a failed fetch and returns the feed's number of consecutive failures (0 if the feed is gone)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
         cursor.execute(
-            "INSERT INTO results (feed_id, title, link, summary, published_date, matched_keywords) VALUES (?, ?, ?, ?, ?, ?)",
-            (feed_id, title, link, summary, published_date_str, matched_keywords_str)
+            """
+            UPDATE rss_feeds SET
+                consecutive_failures = consecutive_failures + 1, last_error = ?, last_status_code = ?,
+                last_latency_ms = ?, last_failure_at = ?
+            WHERE id = ?
+            RETURNING consecutive_failures
+            """,
+            (error[:1000], status_code, latency_ms, dates.now_utc().isoformat(), feed_id)
         )
+        row = cursor.fetchone()
         conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        # logger.warning(f"Result with link '{link}' already exists. Skipping.")
+        return row[0] if row else 0
+    except Exception as e:
+        logger.error(f"Error recording fetch failure for feed {feed_id}: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        conn.close()
+
+def open_feed_circuit(feed_id: int, backoff_until: datetime, disable: bool = False):
+    """Holds a failing feed back until backoff_until; disable also deactivates it."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if disable:
+            cursor.execute(
+                "UPDATE rss_feeds SET backoff_until = ?, is_active = 0, auto_disabled = 1 WHERE id = ?",
+                (backoff_until.isoformat(), feed_id)
+            )
+        else:
+            cursor.execute("UPDATE rss_feeds SET backoff_until = ? WHERE id = ?", (backoff_until.isoformat(), feed_id))
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error opening circuit for feed {feed_id}: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+def get_feed_schedules() -> Dict[int, Dict[str, Any]]:
+    """Persisted adaptive scheduler state of every feed, keyed by feed id."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM feed_schedule")
+    rows = {row['feed_id']: dict(row) for row in cursor.fetchall()}
+    conn.close()
+    return rows
+
+def get_feed_schedule(feed_id: int) -> Optional[Dict[str, Any]]:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM feed_schedule WHERE feed_id = ?", (feed_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def save_feed_schedule(state: Dict[str, Any]):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO feed_schedule (feed_id, interval_seconds, items_per_hour, not_modified_ratio, fetches, last_observed_at)
+            SELECT :feed_id, :interval_seconds, :items_per_hour, :not_modified_ratio, :fetches, :last_observed_at
+            WHERE EXISTS (SELECT 1 FROM rss_feeds WHERE id = :feed_id) -- Feed may have been deleted meanwhile
+            ON CONFLICT(feed_id) DO UPDATE SET
+                interval_seconds = excluded.interval_seconds,
+                items_per_hour = excluded.items_per_hour,
+                not_modified_ratio = excluded.not_modified_ratio,
+                fetches = excluded.fetches,
+                last_observed_at = excluded.last_observed_at
+            """,
+            state
+        )
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error saving schedule state for feed {state.get('feed_id')}: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+#  Retention Operations 
+def get_retention_policies() -> Dict[int, Dict[str, Any]]:
+    """Per-feed retention overrides, keyed by feed id."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT feed_id, max_age_days, max_rows, archive FROM retention_policies ORDER BY feed_id")
+    rows = {row['feed_id']: dict(row) for row in cursor.fetchall()}
+    conn.close()
+    return rows
+
+def set_retention_policy(feed_id: int, policy: RetentionPolicyUpdate) -> Optional[Dict[str, Any]]:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO retention_policies (feed_id, max_age_days, max_rows, archive)
+            SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM rss_feeds WHERE id = ?)
+            ON CONFLICT(feed_id) DO UPDATE SET
+                max_age_days = excluded.max_age_days,
+                max_rows = excluded.max_rows,
+                archive = excluded.archive
+            """,
+            (feed_id, policy.max_age_days, policy.max_rows, policy.archive, feed_id)
+        )
+        conn.commit()
+        if cursor.rowcount == 0:
+            return None
+        cursor.execute("SELECT feed_id, max_age_days, max_rows, archive FROM retention_policies WHERE feed_id = ?", (feed_id,))
+        return dict(cursor.fetchone())
+    except Exception as e:
+        logger.error(f"Error saving retention policy for feed {feed_id}: {e}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+def delete_retention_policy(feed_id: int) -> bool:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM retention_policies WHERE feed_id = ?", (feed_id,))
+        conn.commit()
+        return cursor.rowcount > 0
+    except Exception as e:
+        logger.error(f"Error deleting retention policy for feed {feed_id}: {e}")
+        conn.rollback()
         return False
+    finally:
+        conn.close()
+
+def get_result_feed_ids() -> List[int]:
+    """Feed ids that have stored results, including orphans of feeds deleted by hand."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT feed_id FROM results ORDER BY feed_id")
+    feed_ids = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return feed_ids
+
+def get_nth_newest_result_id(offset: int, feed_id: Optional[int] = None) -> Optional[int]:
+    """Id of the result `offset` places below the newest one (0 = newest), overall or of one feed."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    if feed_id is None:
+        cursor.execute("SELECT id FROM results ORDER BY id DESC LIMIT 1 OFFSET ?", (offset,))
+    else:
+        cursor.execute("SELECT id FROM results WHERE feed_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?", (feed_id, offset))
+    row = cursor.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+def get_expired_results(
+    feed_id: int,
+    below_id: Optional[int],
+    published_before: Optional[datetime],
+    max_id: Optional[int],
+    limit: int,
+) -> List[sqlite3.Row]:
+    """
+    Oldest results of a feed (only those with id < below_id, when given) that were published
+    before `published_before` (stored before it, when undated) or have id <= max_id.
+    """
+    expired = []
+    params: list = [feed_id]
+    if published_before is not None:
+        cutoff = dates.to_utc(published_before)
+        expired.append("published_date < ? OR (published_date IS NULL AND processed_at < ?)")
+        params.extend([cutoff.isoformat(), cutoff.strftime("%Y-%m-%d %H:%M:%S")])
+    if max_id is not None:
+        expired.append("id <= ?")
+        params.append(max_id)
+    if not expired:
+        return []
+    query = f"SELECT {', '.join(RESULT_COLUMNS)} FROM results WHERE feed_id = ? AND ({' OR '.join(expired)})"
+    if below_id is not None:
+        query += " AND id < ?"
+        params.append(below_id)
+    params.append(limit)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(query + " ORDER BY id LIMIT ?", params)
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+def delete_results(result_ids: List[int]) -> int:
+    if not result_ids:
+        return 0
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DELETE FROM results WHERE id IN ({','.join('?' * len(result_ids))})", result_ids)
+        conn.commit()
+        return cursor.rowcount
+    except Exception as e:
+        logger.error(f"Error deleting {len(result_ids)} results: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+#  Entry Archive Operations 
+def archive_entries(conn, feed_id: int, rows: List[Tuple[str, str, bytes]]) -> int:
+    """
+    Stores (link, published date, packed entry) rows on an open connection without
+    committing. Entries already archived with the same content are left untouched.
+    """
+    if not rows:
+        return 0
+    seen_at = time.time()
+    cursor = conn.executemany(
+        """
+        INSERT INTO entry_archive (feed_id, link, published_date, seen_at, content) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(feed_id, link) DO UPDATE SET
+            published_date = excluded.published_date,
+            seen_at = excluded.seen_at,
+            content = excluded.content
+        WHERE entry_archive.content != excluded.content
+        """,
+        [(feed_id, link, published_date, seen_at, content) for link, published_date, content in rows]
+    )
+    return cursor.rowcount
+
+def count_archived_entries() -> int:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM entry_archive")
+    count = cursor.fetchone()[0]
+    conn.close()
+    return count
+
+def get_archived_entries(after_id: int, limit: int) -> List[sqlite3.Row]:
+    """Archived entries with an id above after_id, in id order: (id, feed_id, link, published_date, content)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, feed_id, link, published_date, content FROM entry_archive WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id, limit)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+def prune_entry_archive(seen_before: float, limit: int) -> int:
+    """Deletes up to `limit` archived entries first seen before the given time."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "DELETE FROM entry_archive WHERE id IN (SELECT id FROM entry_archive WHERE seen_at < ? ORDER BY seen_at LIMIT ?)",
+            (seen_before, limit)
+        )
+        conn.commit()
+        return cursor.rowcount
+    except Exception as e:
+        logger.error(f"Error pruning the entry archive: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+#  Lease Operations 
+def heartbeat_worker(worker_id: str, hostname: str, pid: int, started_at: float, now: float, dead_before: float) -> List[Dict[str, Any]]:
+    """Records a worker as alive, forgets workers silent since dead_before and returns the live ones, oldest first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO workers (worker_id, hostname, pid, started_at, heartbeat_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+            """,
+            (worker_id, hostname, pid, started_at, now)
+        )
+        cursor.execute("DELETE FROM workers WHERE heartbeat_at < ? AND worker_id != ?", (dead_before, worker_id))
+        conn.commit()
+        cursor.execute("SELECT worker_id, hostname, pid, started_at, heartbeat_at FROM workers ORDER BY started_at, worker_id")
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def renew_feed_leases(worker_id: str, expires_at: float) -> List[int]:
+    """
+    Extends the leases a worker still holds and drops those of feeds that were
+    deactivated or deleted. Returns the ids of the feeds it holds.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "DELETE FROM feed_leases WHERE worker_id = ? AND feed_id NOT IN (SELECT id FROM rss_feeds WHERE is_active = 1)",
+            (worker_id,)
+        )
+        cursor.execute("UPDATE feed_leases SET expires_at = ? WHERE worker_id = ?", (expires_at, worker_id))
+        cursor.execute("SELECT feed_id FROM feed_leases WHERE worker_id = ? ORDER BY feed_id", (worker_id,))
+        feed_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        return feed_ids
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def claim_feed_leases(worker_id: str, now: float, expires_at: float, limit: int) -> List[int]:
+    """
+    Takes up to `limit` active feeds that have no lease or an expired one and returns
+    their ids. Runs under the write lock, so two workers never claim the same feed.
+    """
+    if limit <= 0:
+        return []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            """
+            INSERT INTO feed_leases (feed_id, worker_id, acquired_at, expires_at)
+            SELECT f.id, ?, ?, ? FROM rss_feeds f LEFT JOIN feed_leases l ON l.feed_id = f.id
+            WHERE f.is_active = 1 AND (l.feed_id IS NULL OR l.expires_at < ?)
+            ORDER BY f.id LIMIT ?
+            ON CONFLICT(feed_id) DO UPDATE SET
+                worker_id = excluded.worker_id,
+                acquired_at = excluded.acquired_at,
+                expires_at = excluded.expires_at
+            WHERE feed_leases.expires_at < ?
+            """,
+            (worker_id, now, expires_at, now, limit, now)
+        )
+        cursor.execute("SELECT feed_id FROM feed_leases WHERE worker_id = ? AND acquired_at = ? ORDER BY feed_id", (worker_id, now))
+        feed_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        return feed_ids
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def release_feed_leases(worker_id: str, feed_ids: Optional[List[int]] = None) -> int:
+    """Gives up some (or, without feed_ids, all) leases of a worker so others can claim the feeds at once."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if feed_ids is None:
+            cursor.execute("DELETE FROM feed_leases WHERE worker_id = ?", (worker_id,))
+        elif feed_ids:
+            cursor.execute(
+                f"DELETE FROM feed_leases WHERE worker_id = ? AND feed_id IN ({','.join('?' * len(feed_ids))})",
+                [worker_id, *feed_ids]
+            )
+        conn.commit()
+        return max(cursor.rowcount, 0)
+    except Exception as e:
+        logger.error(f"Error releasing feed leases of worker {worker_id}: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        conn.close()
+
+def request_feed_refetch(feed_id: int, now: float):
+    """Asks whichever worker holds (or next claims) the feed's lease to fetch it now."""
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "INSERT INTO feed_refetch_requests (feed_id, requested_at) VALUES (?, ?) "
+            "ON CONFLICT(feed_id) DO UPDATE SET requested_at = excluded.requested_at",
+            (feed_id, now)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def take_feed_refetch_requests(worker_id: str) -> List[int]:
+    """Removes and returns the requested re-fetches of the feeds a worker holds."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            "SELECT r.feed_id FROM feed_refetch_requests r JOIN feed_leases l ON l.feed_id = r.feed_id "
+            "WHERE l.worker_id = ? ORDER BY r.requested_at",
+            (worker_id,)
+        )
+        feed_ids = [row[0] for row in cursor.fetchall()]
+        if feed_ids:
+            cursor.execute(f"DELETE FROM feed_refetch_requests WHERE feed_id IN ({','.join('?' * len(feed_ids))})", feed_ids)
+        conn.commit()
+        return feed_ids
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def remove_worker(worker_id: str):
+    """Deregisters a stopping worker together with its leases."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM feed_leases WHERE worker_id = ?", (worker_id,))
+        cursor.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error removing worker {worker_id}: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+def count_active_feeds() -> int:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM rss_feeds WHERE is_active = 1")
+    count = cursor.fetchone()[0]
+    conn.close()
+    return count
+
+def get_lease_overview(now: float) -> Dict[str, Any]:
+    """Registered workers with the number of feeds each holds, and active feeds nobody holds."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT w.worker_id, w.hostname, w.pid, w.started_at, w.heartbeat_at,
+               (SELECT COUNT(*) FROM feed_leases l WHERE l.worker_id = w.worker_id AND l.expires_at >= ?) AS feeds
+        FROM workers w ORDER BY w.started_at, w.worker_id
+        """,
+        (now,)
+    )
+    workers = [dict(row) for row in cursor.fetchall()]
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM rss_feeds f
+        WHERE f.is_active = 1 AND NOT EXISTS (SELECT 1 FROM feed_leases l WHERE l.feed_id = f.id AND l.expires_at >= ?)
+        """,
+        (now,)
+    )
+    unassigned = cursor.fetchone()[0]
+    conn.close()
+    return {'workers': workers, 'unassigned_feeds': unassigned}
+
+#  Results Operations 
+def _result_row(feed_id: int, title: str, link: str, summary: str, published_date: Optional[datetime], matched_keywords: List[str]) -> tuple:
+    # Truncate summary if too long
+    if summary and len(summary) > settings.SUMMARY_MAX_LENGTH:
+        summary = summary[:settings.SUMMARY_MAX_LENGTH] + "..."
+
+    # Stored as UTC so the ISO strings sort chronologically
+    published_date_str = dates.to_utc(published_date).isoformat() if published_date else None
+    matched_keywords_str = ",".join(matched_keywords)
+    return (feed_id, title, link, summary, published_date_str, matched_keywords_str)
+
+def add_result(feed_id: int, title: str, link: str, summary: str, published_date: Optional[datetime], matched_keywords: List[str]) -> bool:
+    """Stores one result; False when it was already stored (it is then merged, see insert_results)."""
+    conn = get_db_connection()
+    try:
+        entry = {'title': title, 'link': link, 'summary': summary, 'published_date': published_date, 'matched_keywords': matched_keywords}
+        added = insert_results(conn, feed_id, [entry])
+        conn.commit()
+        return bool(added)
     except Exception as e:
         logger.error(f"Error adding result for link '{link}': {e}")
         conn.rollback()
@@ -232,54 +806,512 @@ def add_result(feed_id: int, title: str, link: str, summary: str, published_date
     finally:
         conn.close()
 
-def get_results(
-    page: int = 1,
-    page_size: int = 12,
-    keyword_filters: Optional[List[str]] = None
-) -> Dict[str, Any]:
+def _link_result_keywords(conn, links: List[Tuple[int, List[str]]]):
+    """Writes result_keywords rows for (result_id, matched keyword names) pairs."""
+    names = {name for _, matched in links for name in matched}
+    if not names:
+        return
+    placeholders = ",".join("?" * len(names))
+    keyword_ids = {
+        row[1]: row[0]
+        for row in conn.execute(f"SELECT id, keyword FROM keywords WHERE keyword IN ({placeholders})", tuple(names))
+    }
+    conn.executemany(
+        "INSERT OR IGNORE INTO result_keywords (result_id, keyword_id) VALUES (?, ?)",
+        [(result_id, keyword_ids[name]) for result_id, matched in links for name in matched if name in keyword_ids]
+    )
+
+_LOOKUP_CHUNK = 500 # Values per IN (...) list, well below SQLite's bound parameter limit
+
+def _stored_ids(conn, column: str, values) -> Dict[Any, int]:
+    """{value: id of the oldest stored result with it} for the given values of a results column."""
+    values = list(set(values))
+    found = {}
+    for start in range(0, len(values), _LOOKUP_CHUNK):
+        chunk = values[start:start + _LOOKUP_CHUNK]
+        found.update(conn.execute(
+            f"SELECT {column}, MIN(id) FROM results WHERE {column} IN ({','.join('?' * len(chunk))}) GROUP BY {column}",
+            chunk
+        ).fetchall())
+    return found
+
+def _merge_duplicates(conn, duplicates: List[Tuple[int, int, str, List[str]]]):
+    """
+    Records (result_id, feed_id, link, matched keywords) copies of stored results: the feed
+    becomes another source of the result, and keywords only the copy matched are added.
+    """
+    if not duplicates:
+        return
+    sources_added = conn.executemany(
+        "INSERT OR IGNORE INTO result_sources (result_id, feed_id, link) VALUES (?, ?, ?)",
+        [(result_id, feed_id, link) for result_id, feed_id, link, _ in duplicates]
+    ).rowcount
+    result_ids = list({result_id for result_id, _, _, _ in duplicates})
+    stored = {
+        row[0]: [name for name in (row[1] or "").split(",") if name]
+        for row in conn.execute(f"SELECT id, matched_keywords FROM results WHERE id IN ({','.join('?' * len(result_ids))})", result_ids)
+    }
+    new_links = []
+    for result_id, _, _, matched in duplicates:
+        added = [name for name in matched if name not in stored[result_id]]
+        if added:
+            stored[result_id].extend(added)
+            conn.execute("UPDATE results SET matched_keywords = ? WHERE id = ?", (",".join(stored[result_id]), result_id))
+            new_links.append((result_id, added))
+    _link_result_keywords(conn, new_links)
+    if sources_added or new_links:
+        # Existing results now pass more feed or keyword filters; cached counts must be redone
+        conn.execute("UPDATE data_versions SET version = version + 1 WHERE name = 'results_merges'")
+
+def insert_results(conn, feed_id: int, entries: List[Dict[str, Any]]) -> List[int]:
+    """
+    Inserts matched entries on an open connection without committing. Returns the ids of the new rows.
+
+    An entry that is already stored, under the same canonical URL, with the same content
+    (see backend.dedup) or under the same link, is merged into the stored result instead of
+    being added; so is a later entry of the batch that is a copy of an earlier one. Stored
+    copies are found with one lookup per key for the whole batch, and the new rows are
+    written with a single executemany.
+    """
+    if not conn.in_transaction:
+        # Nothing may be stored by another worker between the lookups and the inserts
+        conn.execute("BEGIN IMMEDIATE")
+    keys = [
+        (
+            e.get('canonical_url') or dedup.canonical_url(e['link']),
+            e['content_hash'] if 'content_hash' in e else dedup.content_hash(e['title'], e['summary']),
+        )
+        for e in entries
+    ]
+    use_content = settings.DEDUP_CONTENT
+    by_url = _stored_ids(conn, "canonical_url", [url for url, _ in keys])
+    by_hash = _stored_ids(conn, "content_hash", [h for _, h in keys if h is not None]) if use_content else {}
+    by_link = _stored_ids(conn, "link", [e['link'] for e in entries])
+
+    rows = []
+    new_entries = []
+    copies = [] # (entry, stored result id, or -1 - index into new_entries)
+    for e, (canonical_url, content_hash) in zip(entries, keys):
+        duplicate_id = by_url.get(canonical_url)
+        if duplicate_id is None and content_hash is not None and use_content:
+            duplicate_id = by_hash.get(content_hash)
+        if duplicate_id is None:
+            # Same link, stored with a canonical URL computed under other settings
+            duplicate_id = by_link.get(e['link'])
+        if duplicate_id is not None:
+            copies.append((e, duplicate_id))
+            continue
+        # Later copies in this batch merge into the row about to be inserted
+        pending = -1 - len(new_entries)
+        by_url[canonical_url] = pending
+        if content_hash is not None and use_content:
+            by_hash[content_hash] = pending
+        by_link[e['link']] = pending
+        new_entries.append(e)
+        rows.append(_result_row(feed_id, e['title'], e['link'], e['summary'], e['published_date'], e['matched_keywords']) + (canonical_url, content_hash))
+
+    new_ids = []
+    if rows:
+        conn.executemany(
+            "INSERT INTO results (feed_id, title, link, summary, published_date, matched_keywords, canonical_url, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        # AUTOINCREMENT ids of consecutive inserts under one write lock are consecutive
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        new_ids = list(range(last_id - len(rows) + 1, last_id + 1))
+        conn.executemany(
+            "INSERT INTO result_sources (result_id, feed_id, link) VALUES (?, ?, ?)",
+            [(result_id, feed_id, e['link']) for result_id, e in zip(new_ids, new_entries)]
+        )
+        _link_result_keywords(conn, [(result_id, e['matched_keywords']) for result_id, e in zip(new_ids, new_entries)])
+    _merge_duplicates(conn, [
+        (new_ids[-1 - duplicate_id] if duplicate_id < 0 else duplicate_id, feed_id, e['link'], e['matched_keywords'])
+        for e, duplicate_id in copies
+    ])
+    return new_ids
+
+def add_results_bulk(feed_id: int, entries: List[Dict[str, Any]]) -> int:
+    """Stores all matches of one feed run in a single transaction. Returns how many were new."""
+    if not entries:
+        return 0
+    conn = get_db_connection()
+    try:
+        added = insert_results(conn, feed_id, entries)
+        conn.commit()
+        return len(added)
+    except Exception as e:
+        logger.error(f"Error adding {len(entries)} results for feed {feed_id}: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        conn.close()
+
+def get_results_by_ids(result_ids: List[int]) -> List[Dict[str, Any]]:
+    if not result_ids:
+        return []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    placeholders = ",".join("?" * len(result_ids))
+    cursor.execute(
+        f"SELECT id, feed_id, title, link, summary, published_date, matched_keywords, processed_at FROM results WHERE id IN ({placeholders}) ORDER BY id",
+        result_ids
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def get_results_after(after_id: int, limit: int) -> List[Dict[str, Any]]:
+    """Results stored after the given id, oldest first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, feed_id, title, link, summary, published_date, matched_keywords, processed_at FROM results WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id, limit)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def get_result_sources(result_id: int) -> List[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
+    cursor.execute("SELECT feed_id, link, added_at FROM result_sources WHERE result_id = ? ORDER BY added_at, feed_id", (result_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def get_recent_result_links(per_feed_limit: int, feed_ids: Optional[List[int]] = None) -> List[Tuple[int, str]]:
+    """Most recently stored links of every feed (or of the given ones), oldest first within each feed."""
+    where, params = "", []
+    if feed_ids is not None:
+        where = f"WHERE feed_id IN ({','.join('?' * len(feed_ids))})"
+        params = list(feed_ids)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        SELECT feed_id, link FROM (
+            SELECT feed_id, link, id, ROW_NUMBER() OVER (PARTITION BY feed_id ORDER BY id DESC) AS rn
+            FROM results {where}
+        ) WHERE rn <= ? ORDER BY feed_id, id
+        """,
+        params + [per_feed_limit]
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return [(row[0], row[1]) for row in rows]
+
+def _keyword_ids(cursor, names: List[str]) -> List[int]:
+    names = list({name.strip().lower() for name in names if name.strip()})
+    if not names:
+        return []
+    placeholders = ",".join("?" * len(names))
+    cursor.execute(f"SELECT id FROM keywords WHERE keyword IN ({placeholders})", names)
+    return [row[0] for row in cursor.fetchall()]
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after `row` in /results/ order."""
+    payload = json.dumps([row['published_date'], row['processed_at'], row['id']], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor_token: str) -> Tuple[Optional[str], Optional[str], int]:
+    try:
+        padded = cursor_token + "=" * (-len(cursor_token) % 4)
+        published_date, processed_at, result_id = json.loads(base64.urlsafe_b64decode(padded))
+        return published_date, processed_at, int(result_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor_token}") from e
+
+def _keyset_condition(published_date: Optional[str], processed_at: Optional[str], result_id: int) -> Tuple[str, list]:
+    """Rows strictly after the cursor in (published_date DESC, processed_at DESC, id DESC) order; NULL dates sort last."""
+    after_processed = "(processed_at < ? OR (processed_at = ? AND id < ?))"
+    if published_date is None:
+        return f"(published_date IS NULL AND {after_processed})", [processed_at, processed_at, result_id]
+    return (
+        f"(published_date < ? OR (published_date = ? AND {after_processed}) OR published_date IS NULL)",
+        [published_date, published_date, processed_at, processed_at, result_id],
+    )
+
+_COUNT_CACHE_SIZE = 256
+_count_cache: "OrderedDict[Tuple, Tuple[int, int, Tuple[int, int]]]" = OrderedDict()
+_count_cache_lock = threading.Lock()
+
+def _count_results(cursor, where: str, params: list, cache_key: Tuple) -> int:
+    """
+    COUNT(*) for a filter, cached per filter. While no results were deleted or merged into,
+    a cached count is brought up to date by counting only rows inserted since (id > last
+    seen max id), which is a primary-key range scan instead of a full recount.
+    """
+    cursor.execute(
+        "SELECT COALESCE(MAX(id), 0), "
+        "(SELECT version FROM data_versions WHERE name = 'results_deletes'), "
+        "(SELECT version FROM data_versions WHERE name = 'results_merges') FROM results"
+    )
+    max_id, deletes_version, merges_version = cursor.fetchone()
+    data_version = (deletes_version, merges_version)
+
+    with _count_cache_lock:
+        cached = _count_cache.get(cache_key)
+    if cached is not None and cached[2] == data_version:
+        count, counted_max_id, _ = cached
+        if counted_max_id != max_id:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM results WHERE id > ? AND id <= ?{' AND ' + where if where else ''}",
+                [counted_max_id, max_id] + params
+            )
+            count += cursor.fetchone()[0]
+    else:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM results WHERE id <= ?{' AND ' + where if where else ''}",
+            [max_id] + params
+        )
+        count = cursor.fetchone()[0]
+
+    with _count_cache_lock:
+        _count_cache[cache_key] = (count, max_id, data_version)
+        _count_cache.move_to_end(cache_key)
+        while len(_count_cache) > _COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return count
+
+RESULT_COLUMNS = ("id", "feed_id", "title", "link", "summary", "published_date", "matched_keywords", "processed_at")
 
-    base_query = "SELECT id, feed_id, title, link, summary, published_date, matched_keywords, processed_at FROM results"
-    count_query = "SELECT COUNT(*) FROM results"
+def _results_filter(
+    cursor,
+    keyword_filters: Optional[List[str]],
+    match_all: bool,
+    feed_ids: Optional[List[int]],
+    published_after: Optional[datetime],
+    published_before: Optional[datetime],
+) -> Tuple[List[str], list]:
+    """WHERE conditions and parameters for the result filters shared by listing and export."""
     conditions = []
     params = []
 
     if keyword_filters:
-        # Using OR for keyword filtering
-        keyword_clauses = []
-        for kw in keyword_filters:
-            # Case-insensitive search for keywords within the comma-separated string
-            keyword_clauses.append("LOWER(matched_keywords) LIKE ?")
-            params.append(f"%{kw.lower()}%") 
+        # Exact keyword matches through result_keywords; OR by default, AND with match_all
+        keyword_ids = _keyword_ids(cursor, keyword_filters)
+        requested = len({kw.strip().lower() for kw in keyword_filters if kw.strip()})
+        if not keyword_ids or (match_all and len(keyword_ids) < requested):
+            conditions.append("0")
+        else:
+            placeholders = ",".join("?" * len(keyword_ids))
+            if match_all and len(keyword_ids) > 1:
+                conditions.append(
+                    f"id IN (SELECT result_id FROM result_keywords WHERE keyword_id IN ({placeholders}) "
+                    f"GROUP BY result_id HAVING COUNT(*) = ?)"
+                )
+                params.extend(keyword_ids)
+                params.append(len(keyword_ids))
+            else:
+                conditions.append(f"id IN (SELECT result_id FROM result_keywords WHERE keyword_id IN ({placeholders}))")
+                params.extend(keyword_ids)
 
-        if keyword_clauses:
-            conditions.append(f"({' OR '.join(keyword_clauses)})")
+    if feed_ids:
+        # Any source feed, so a merged duplicate shows up under every feed it was found in
+        conditions.append(f"id IN (SELECT result_id FROM result_sources WHERE feed_id IN ({','.join('?' * len(feed_ids))}))")
+        params.extend(feed_ids)
+    if published_after:
+        conditions.append("published_date >= ?")
+        params.append(dates.to_utc(published_after).isoformat())
+    if published_before:
+        conditions.append("published_date < ?")
+        params.append(dates.to_utc(published_before).isoformat())
+    return conditions, params
 
-    if conditions:
-        base_query += " WHERE " + " AND ".join(conditions)
-        count_query += " WHERE " + " AND ".join(conditions)
+def get_results(
+    page: int = 1,
+    page_size: int = 12,
+    keyword_filters: Optional[List[str]] = None,
+    match_all: bool = False,
+    feed_ids: Optional[List[int]] = None,
+    published_after: Optional[datetime] = None,
+    published_before: Optional[datetime] = None,
+    use_cursor: bool = False,
+    cursor_token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Paginated results, newest first.
 
-    # Get total count
-    cursor.execute(count_query, params)
-    total_items = cursor.fetchone()[0]
+    By default pages are addressed with LIMIT/OFFSET. With use_cursor=True the page
+    starts after `cursor_token` (None for the first page) and the response carries a
+    next_cursor, so deep pages cost the same as the first one.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    base_query = f"SELECT {', '.join(RESULT_COLUMNS)} FROM results"
+    conditions, params = _results_filter(cursor, keyword_filters, match_all, feed_ids, published_after, published_before)
+
+    where = " AND ".join(conditions)
+    total_items = _count_results(cursor, where, list(params), (where, tuple(params)))
+
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if use_cursor and cursor_token:
+        keyset_sql, keyset_params = _keyset_condition(*decode_cursor(cursor_token))
+        page_conditions.append(keyset_sql)
+        page_params.extend(keyset_params)
+    if page_conditions:
+        base_query += " WHERE " + " AND ".join(page_conditions)
 
     # Add order by and limit/offset for pagination
-    base_query += " ORDER BY published_date DESC, processed_at DESC LIMIT ? OFFSET ?"
-    params.append(page_size)
-    params.append((page - 1) * page_size)
+    base_query += " ORDER BY published_date DESC, processed_at DESC, id DESC LIMIT ?"
+    if use_cursor:
+        # Fetch one extra row to know whether another page exists
+        page_params.append(page_size + 1)
+    else:
+        base_query += " OFFSET ?"
+        page_params.append(page_size)
+        page_params.append((page - 1) * page_size)
 
-    cursor.execute(base_query, params)
+    cursor.execute(base_query, page_params)
     rows = cursor.fetchall()
     conn.close()
 
     results = [dict(row) for row in rows]
     total_pages = (total_items + page_size - 1) // page_size
 
+    next_cursor = None
+    if use_cursor:
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if has_more:
+            next_cursor = encode_cursor(results[-1])
+    else:
+        has_more = page < total_pages
+
     return {
         "items": results,
         "total_items": total_items,
         "total_pages": total_pages,
         "current_page": page,
         "page_size": page_size,
-    }
\ No newline at end of file
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
+
+def get_max_result_id() -> int:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM results")
+    max_id = cursor.fetchone()[0]
+    conn.close()
+    return max_id
+
+def iter_results_export(
+    upto_id: int,
+    since_id: int = 0,
+    limit: Optional[int] = None,
+    keyword_filters: Optional[List[str]] = None,
+    match_all: bool = False,
+    feed_ids: Optional[List[int]] = None,
+    published_after: Optional[datetime] = None,
+    published_before: Optional[datetime] = None,
+    batch_size: int = settings.EXPORT_BATCH_SIZE,
+) -> Iterator[List[sqlite3.Row]]:
+    """
+    Yields batches of results with since_id < id <= upto_id, oldest id first.
+
+    Each batch is its own primary-key range query that continues after the last id of the
+    previous one, and the connection goes back to the pool in between. A slow consumer
+    therefore holds neither a pool connection nor a read snapshot (which would keep WAL
+    checkpoints from completing), and memory stays at one batch however large the export.
+    Ids are AUTOINCREMENT and assigned in commit order, so `since_id` is a safe resume point.
+    """
+    conn = get_db_connection()
+    try:
+        conditions, params = _results_filter(conn.cursor(), keyword_filters, match_all, feed_ids, published_after, published_before)
+    finally:
+        conn.close()
+    query = (
+        f"SELECT {', '.join(RESULT_COLUMNS)} FROM results WHERE id > ? AND id <= ?"
+        + "".join(f" AND {condition}" for condition in conditions)
+        + " ORDER BY id LIMIT ?"
+    )
+
+    last_id = since_id
+    remaining = limit
+    while last_id < upto_id and (remaining is None or remaining > 0):
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        conn = get_db_connection()
+        try:
+            rows = conn.execute(query, [last_id, upto_id] + params + [size]).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]['id']
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < size:
+            return
+
+def _fts_query(text: str) -> str:
+    """Turns free text into an FTS5 query: every word must match (prefix match on the last one)."""
+    terms = [t.replace('"', '""') for t in text.split() if t.strip('"')]
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+# snippet() delimiters; private-use characters, so the text around them can be escaped first
+_MARK_START, _MARK_END = "\ue000", "\ue001"
+
+def _snippet_html(snippet: Optional[str]) -> Optional[str]:
+    """Escapes the (untrusted) feed text of a snippet, then marks the matches with <mark>."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+class SearchUnavailable(Exception):
+    """Full-text search needs SQLite with FTS5; without it results_fts was never created."""
+
+def search_results(query: str, page: int = 1, page_size: int = 12) -> Dict[str, Any]:
+    """
+    Full-text search over title, summary and matched keywords, best matches first (BM25).
+    Title hits weigh more than keyword hits, which weigh more than summary hits.
+    Raises SearchUnavailable when the SQLite build has no FTS5.
+    """
+    match = _fts_query(query)
+    if not match:
+        return {"items": [], "total_items": 0, "total_pages": 0, "current_page": page, "page_size": page_size}
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM results_fts WHERE results_fts MATCH ?", (match,))
+        total_items = cursor.fetchone()[0]
+
+        cursor.execute(
+            """
+            SELECT r.id, r.feed_id, r.title, r.link, r.summary, r.published_date, r.matched_keywords, r.processed_at,
+                   bm25(results_fts, 10.0, 1.0, 5.0) AS rank,
+                   snippet(results_fts, -1, ?, ?, '…', 24) AS snippet
+            FROM results_fts
+            JOIN results r ON r.id = results_fts.rowid
+            WHERE results_fts MATCH ?
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+            """,
+            (_MARK_START, _MARK_END, match, page_size, (page - 1) * page_size)
+        )
+        rows = cursor.fetchall()
+    except sqlite3.OperationalError as e:
+        # "no such table: results_fts", or "no such module: fts5" for a database made elsewhere
+        if "results_fts" in str(e) or "fts5" in str(e):
+            raise SearchUnavailable("Full-text search is unavailable: this SQLite build has no FTS5") from e
+        raise
+    finally:
+        conn.close()
+
+    return {
+        "items": [dict(row, snippet=_snippet_html(row['snippet'])) for row in rows],
+        "total_items": total_items,
+        "total_pages": (total_items + page_size - 1) // page_size,
+        "current_page": page,
+        "page_size": page_size,
+    }
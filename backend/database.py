@@ -1,4 +1,10 @@
 import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from queue import Empty, LifoQueue
+from typing import Any, Dict
+from backend import dedup
 from backend.config import settings
 import logging
 from backend.logging_config import setup_logging
@@ -8,11 +14,352 @@ logger = logging.getLogger(__name__)
 
 DATABASE_FILE = settings.DATABASE_URL
 
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_FILE)
+
+def _open_connection() -> sqlite3.Connection:
+    # Connections move between threads through the pool; the pool guarantees one user at a time
+    conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False, timeout=settings.DB_BUSY_TIMEOUT_MS / 1000)
     conn.row_factory = sqlite3.Row # This allows accessing columns by name
+    # Must precede the journal mode, which writes the header of a new database; existing ones are converted by vacuum()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute(f"PRAGMA journal_mode = {settings.DB_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous = {settings.DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings.DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size = {int(settings.DB_CACHE_SIZE)}")
     return conn
 
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled sqlite3.Connection.
+
+    close() hands the connection back to the pool instead of closing it, so existing
+    `conn = get_db_connection() ... conn.close()` code keeps working unchanged.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._conn)
+
+    def __del__(self):
+        # Callers that raise before close() would otherwise leak the connection out of the pool
+        if not self._released:
+            self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections with per-thread re-entrancy.
+
+    A thread that already holds a connection gets the same one back on nested
+    get_db_connection() calls (e.g. create_keyword -> get_keyword), so nested CRUD
+    helpers never wait on the pool for a second connection. With size 0 every call
+    opens and closes its own connection (the previous behaviour).
+    """
+
+    def __init__(self, size: int = settings.DB_POOL_SIZE, timeout: float = settings.DB_POOL_TIMEOUT_SECONDS):
+        self.size = size
+        self.timeout = timeout
+        self._idle: LifoQueue = LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._max_in_use = 0
+        self._acquisitions = 0
+        self._reuses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+
+    def acquire(self) -> PooledConnection:
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            held[1] += 1
+            with self._lock:
+                self._reuses += 1
+            return PooledConnection(self, held[0])
+
+        conn = None
+        if self.size > 0:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if not can_create:
+                    started = time.perf_counter()
+                    try:
+                        conn = self._idle.get(timeout=self.timeout)
+                    except Empty:
+                        raise TimeoutError(f"Timed out after {self.timeout}s waiting for a database connection")
+                    finally:
+                        with self._lock:
+                            self._waits += 1
+                            self._wait_time += time.perf_counter() - started
+        if conn is None:
+            try:
+                conn = _open_connection()
+            except Exception:
+                if self.size > 0:
+                    with self._lock:
+                        self._created -= 1
+                raise
+            if self.size <= 0:
+                with self._lock:
+                    self._created += 1
+
+        self._local.held = [conn, 1]
+        with self._lock:
+            self._acquisitions += 1
+            self._in_use += 1
+            self._max_in_use = max(self._max_in_use, self._in_use)
+        return PooledConnection(self, conn)
+
+    def release(self, conn: sqlite3.Connection):
+        held = getattr(self._local, "held", None)
+        if held is not None and held[0] is conn:
+            held[1] -= 1
+            if held[1] > 0:
+                return # Still used further up this thread's call stack
+            self._local.held = None
+        with self._lock:
+            self._in_use -= 1
+        if conn.in_transaction:
+            conn.rollback() # Never hand out a connection with someone else's open transaction
+        if self.size > 0:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "max_in_use": self._max_in_use,
+                "acquisitions": self._acquisitions,
+                "reentrant_reuses": self._reuses,
+                "waits": self._waits,
+                "total_wait_seconds": round(self._wait_time, 6),
+            }
+
+
+pool = ConnectionPool()
+
+def get_db_connection():
+    return pool.acquire()
+
+def _add_column_if_missing(cursor, table: str, column: str, definition: str):
+    """Lightweight migration for databases created before a column was introduced."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info(f"Added column '{column}' to table '{table}'.")
+
+def _table_exists(cursor, name: str) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+    return cursor.fetchone() is not None
+
+def _run_once(cursor, name: str, migration):
+    """Runs a data migration once per database; the migrations table records that it ran."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS migrations (
+            name TEXT PRIMARY KEY,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("SELECT 1 FROM migrations WHERE name = ?", (name,))
+    if cursor.fetchone() is None:
+        migration(cursor)
+        cursor.execute("INSERT INTO migrations (name) VALUES (?)", (name,))
+
+def _normalize_published_dates(cursor):
+    """
+    Rewrites published dates stored before they were normalized to UTC: naive values
+    (local time) and values with other offsets, which did not sort chronologically.
+    """
+    cursor.execute("SELECT id, published_date FROM results WHERE published_date IS NOT NULL AND published_date NOT LIKE '%+00:00'")
+    updates = []
+    for row in cursor.fetchall():
+        try:
+            value = datetime.fromisoformat(row['published_date'])
+        except ValueError:
+            continue
+        # Naive values were written with datetime.now()/fromtimestamp(), i.e. local time
+        updates.append((value.astimezone(timezone.utc).isoformat(), row['id']))
+    if updates:
+        cursor.executemany("UPDATE results SET published_date = ? WHERE id = ?", updates)
+        logger.info(f"Normalized {len(updates)} published dates to UTC.")
+
+def _create_results_fts(cursor):
+    """
+    Full-text index over results (external content table, kept in sync by triggers).
+    Existing rows are indexed once when the index is first created.
+    """
+    is_new = not _table_exists(cursor, "results_fts")
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+                title, summary, matched_keywords,
+                content='results', content_rowid='id', tokenize='unicode61'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"SQLite FTS5 is unavailable, full-text search disabled: {e}")
+        return
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS results_fts_insert AFTER INSERT ON results BEGIN
+            INSERT INTO results_fts (rowid, title, summary, matched_keywords)
+            VALUES (new.id, new.title, new.summary, new.matched_keywords);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS results_fts_delete AFTER DELETE ON results BEGIN
+            INSERT INTO results_fts (results_fts, rowid, title, summary, matched_keywords)
+            VALUES ('delete', old.id, old.title, old.summary, old.matched_keywords);
+        END
+    ''')
+    # Only indexed columns need re-indexing (older databases had a trigger on any column)
+    cursor.execute("DROP TRIGGER IF EXISTS results_fts_update")
+    cursor.execute('''
+        CREATE TRIGGER results_fts_update AFTER UPDATE OF title, summary, matched_keywords ON results BEGIN
+            INSERT INTO results_fts (results_fts, rowid, title, summary, matched_keywords)
+            VALUES ('delete', old.id, old.title, old.summary, old.matched_keywords);
+            INSERT INTO results_fts (rowid, title, summary, matched_keywords)
+            VALUES (new.id, new.title, new.summary, new.matched_keywords);
+        END
+    ''')
+    if is_new:
+        cursor.execute("INSERT INTO results_fts (results_fts) VALUES ('rebuild')")
+        logger.info("Built full-text index for existing results.")
+
+def _create_result_keywords(cursor):
+    """
+    Normalized result <-> keyword links used for exact keyword filtering.
+    results.matched_keywords is kept as the display value; on first creation the
+    table is backfilled from it.
+    """
+    is_new = not _table_exists(cursor, "result_keywords")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS result_keywords (
+            result_id INTEGER NOT NULL,
+            keyword_id INTEGER NOT NULL,
+            PRIMARY KEY (result_id, keyword_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_result_keywords_keyword ON result_keywords (keyword_id, result_id)")
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS results_keywords_delete AFTER DELETE ON results BEGIN
+            DELETE FROM result_keywords WHERE result_id = old.id;
+        END
+    ''')
+    if is_new:
+        _backfill_result_keywords(cursor)
+
+def _backfill_result_keywords(cursor, chunk_size: int = 10000):
+    cursor.execute("SELECT id, keyword FROM keywords")
+    keyword_ids = {row[1]: row[0] for row in cursor.fetchall()}
+    last_id = 0
+    linked = 0
+    while True:
+        cursor.execute(
+            "SELECT id, matched_keywords FROM results WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, chunk_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        pairs = []
+        for result_id, matched in rows:
+            for name in (matched or "").split(","):
+                keyword_id = keyword_ids.get(name.strip().lower())
+                if keyword_id is not None:
+                    pairs.append((result_id, keyword_id))
+        cursor.executemany("INSERT OR IGNORE INTO result_keywords (result_id, keyword_id) VALUES (?, ?)", pairs)
+        linked += len(pairs)
+        last_id = rows[-1][0]
+    logger.info(f"Backfilled {linked} result-keyword links from existing results.")
+
+def _create_result_sources(cursor):
+    """
+    Every feed (and the link it used) a result was found in. A story syndicated to several
+    feeds, or seen again under another URL, is stored once and gets one row per source.
+    On first creation the table is backfilled with the feed of each existing result.
+    """
+    is_new = not _table_exists(cursor, "result_sources")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS result_sources (
+            result_id INTEGER NOT NULL,
+            feed_id INTEGER NOT NULL,
+            link TEXT NOT NULL,
+            added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (result_id, feed_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_result_sources_feed ON result_sources (feed_id, result_id)")
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS results_sources_delete AFTER DELETE ON results BEGIN
+            DELETE FROM result_sources WHERE result_id = old.id;
+        END
+    ''')
+    if is_new:
+        cursor.execute(
+            "INSERT OR IGNORE INTO result_sources (result_id, feed_id, link, added_at) "
+            "SELECT id, feed_id, link, processed_at FROM results"
+        )
+        logger.info(f"Backfilled {cursor.rowcount} result sources from existing results.")
+
+def _backfill_dedup_keys(cursor, chunk_size: int = 10000):
+    """Computes canonical URLs and content hashes of results stored before deduplication."""
+    last_id = 0
+    updated = 0
+    while True:
+        cursor.execute(
+            "SELECT id, link, title, summary FROM results WHERE id > ? AND canonical_url IS NULL ORDER BY id LIMIT ?",
+            (last_id, chunk_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        cursor.executemany(
+            "UPDATE results SET canonical_url = ?, content_hash = ? WHERE id = ?",
+            [(dedup.canonical_url(row['link']), dedup.content_hash(row['title'], row['summary']), row['id']) for row in rows]
+        )
+        updated += len(rows)
+        last_id = rows[-1]['id']
+    if updated:
+        logger.info(f"Computed deduplication keys of {updated} existing results.")
+
 def create_tables():
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -24,7 +371,45 @@ def create_tables():
             name TEXT,
             last_fetched DATETIME,
             fetch_interval_minutes INTEGER DEFAULT ' + str(settings.DEFAULT_FETCH_INTERVAL_MINUTES})',
-            is_active BOOLEAN DEFAULT 1
+            is_active BOOLEAN DEFAULT 1,
+            etag TEXT,
+            last_modified TEXT
+        )
+    ''')
+    # HTTP validators for conditional GET (ETag / Last-Modified)
+    _add_column_if_missing(cursor, "rss_feeds", "etag", "TEXT")
+    _add_column_if_missing(cursor, "rss_feeds", "last_modified", "TEXT")
+    # Fetch health and circuit breaker state
+    _add_column_if_missing(cursor, "rss_feeds", "consecutive_failures", "INTEGER NOT NULL DEFAULT 0")
+    _add_column_if_missing(cursor, "rss_feeds", "last_error", "TEXT")
+    _add_column_if_missing(cursor, "rss_feeds", "last_status_code", "INTEGER")
+    _add_column_if_missing(cursor, "rss_feeds", "last_latency_ms", "REAL")
+    _add_column_if_missing(cursor, "rss_feeds", "last_success_at", "TEXT")
+    _add_column_if_missing(cursor, "rss_feeds", "last_failure_at", "TEXT")
+    _add_column_if_missing(cursor, "rss_feeds", "backoff_until", "TEXT")
+    _add_column_if_missing(cursor, "rss_feeds", "auto_disabled", "BOOLEAN NOT NULL DEFAULT 0")
+
+    # Learned polling state of the adaptive scheduler, one row per feed
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feed_schedule (
+            feed_id INTEGER PRIMARY KEY,
+            interval_seconds REAL NOT NULL,
+            items_per_hour REAL,
+            not_modified_ratio REAL NOT NULL DEFAULT 0,
+            fetches INTEGER NOT NULL DEFAULT 0,
+            last_observed_at REAL,
+            FOREIGN KEY (feed_id) REFERENCES rss_feeds(id)
+        )
+    ''')
+
+    # Per-feed retention overrides; unset fields fall back to the global RETENTION_* settings
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS retention_policies (
+            feed_id INTEGER PRIMARY KEY,
+            max_age_days REAL,
+            max_rows INTEGER,
+            archive BOOLEAN,
+            FOREIGN KEY (feed_id) REFERENCES rss_feeds(id)
         )
     ''')
 
@@ -36,6 +421,64 @@ def create_tables():
         )
     ''')
 
+    # Change counters for in-process caches; bumped by triggers so direct DB edits are noticed too
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES ('keywords', 0)")
+    cursor.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES ('results_deletes', 0)")
+    # Bumped by crud when stored results gain sources or keywords (duplicate merges)
+    cursor.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES ('results_merges', 0)")
+    for action in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS keywords_version_{action.lower()} AFTER {action} ON keywords
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE name = 'keywords';
+            END
+        ''')
+
+    # Bumped only by edits that change how a feed is scheduled, not by fetch bookkeeping
+    cursor.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES ('feeds', 0)")
+    for action, event in (("insert", "INSERT"), ("update", "UPDATE OF url, name, is_active, fetch_interval_minutes"), ("delete", "DELETE")):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS feeds_version_{action} AFTER {event} ON rss_feeds
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE name = 'feeds';
+            END
+        ''')
+
+    # Processes sharing the database as feed workers, and the feeds each one holds (see backend/leases.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS workers (
+            worker_id TEXT PRIMARY KEY,
+            hostname TEXT,
+            pid INTEGER,
+            started_at REAL NOT NULL,
+            heartbeat_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feed_leases (
+            feed_id INTEGER PRIMARY KEY,
+            worker_id TEXT NOT NULL,
+            acquired_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            FOREIGN KEY (feed_id) REFERENCES rss_feeds(id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_feed_leases_worker ON feed_leases (worker_id)")
+    # Manual re-fetches for the worker holding the feed's lease, taken at its next heartbeat
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feed_refetch_requests (
+            feed_id INTEGER PRIMARY KEY,
+            requested_at REAL NOT NULL,
+            FOREIGN KEY (feed_id) REFERENCES rss_feeds(id)
+        )
+    ''')
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS results (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -49,9 +492,119 @@ def create_tables():
             FOREIGN KEY (feed_id) REFERENCES rss_feeds(id)
         )
     ''')
+    # Deduplication keys of the story (see backend/dedup.py); link stays the UNIQUE original URL
+    _add_column_if_missing(cursor, "results", "canonical_url", "TEXT")
+    _add_column_if_missing(cursor, "results", "content_hash", "INTEGER")
+    _create_results_fts(cursor)
+    # Dates are written as UTC since; scanning the table on every startup would find nothing new
+    _run_once(cursor, "normalize_published_dates", _normalize_published_dates)
+    _backfill_dedup_keys(cursor)
+
+    # Indexes for the /results/ ordering and filters
+    cursor.execute("DROP INDEX IF EXISTS idx_results_published") # Superseded by idx_results_order
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_order ON results (published_date DESC, processed_at DESC, id DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_feed ON results (feed_id, published_date DESC, processed_at DESC)")
+    # Newest-rows-per-feed lookups of retention and the seen-entry warm-up
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_feed_id ON results (feed_id, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_canonical_url ON results (canonical_url)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_content_hash ON results (content_hash) WHERE content_hash IS NOT NULL")
+    _create_result_keywords(cursor)
+    _create_result_sources(cursor)
+    # Recently fetched entries, matched or not, for matching keywords added later (see backend/backfill.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS entry_archive (
+            id INTEGER PRIMARY KEY,
+            feed_id INTEGER NOT NULL,
+            link TEXT NOT NULL,
+            published_date DATETIME,
+            seen_at REAL NOT NULL,
+            content BLOB NOT NULL,
+            UNIQUE (feed_id, link)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entry_archive_seen ON entry_archive (seen_at)")
+    # Cached result counts are only extended incrementally while nothing has been deleted
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS results_deletes_version AFTER DELETE ON results BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = 'results_deletes';
+        END
+    ''')
     conn.commit()
     conn.close()
-    logger.info("Database tables checked/created successfully.")
+    logger.info(f"Database tables checked/created successfully. Connection pool: {pool.stats()}")
+
+#  Maintenance 
+
+def space_stats(conn=None) -> Dict[str, Any]:
+    """Database size and free space from the page counters."""
+    own = conn is None
+    conn = conn or get_db_connection()
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    finally:
+        if own:
+            conn.close()
+    return {
+        "page_size": page_size,
+        "size_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist_count,
+        "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum, str(auto_vacuum)),
+    }
+
+def incremental_vacuum(
+    pages_per_step: int = settings.DB_INCREMENTAL_VACUUM_PAGES,
+    pause_seconds: float = settings.RETENTION_BATCH_PAUSE_SECONDS,
+) -> int:
+    """
+    Returns free pages to the file system in steps of pages_per_step, each its own short
+    write transaction. Only works once auto_vacuum is INCREMENTAL. Returns bytes released.
+    """
+    conn = get_db_connection()
+    try:
+        before = space_stats(conn)
+        if before["auto_vacuum"] != "incremental":
+            return 0
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        while free_pages > 0:
+            # executescript steps the pragma to completion; execute() would free a single page
+            conn.executescript(f"PRAGMA incremental_vacuum({max(1, int(pages_per_step))})")
+            remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if remaining >= free_pages:
+                break
+            free_pages = remaining
+            time.sleep(pause_seconds)
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        return before["size_bytes"] - space_stats(conn)["size_bytes"]
+    finally:
+        conn.close()
+
+def analyze(limit: int = settings.DB_ANALYZE_LIMIT):
+    """Refreshes query planner statistics; a positive limit samples that many rows per index."""
+    conn = get_db_connection()
+    try:
+        conn.execute(f"PRAGMA analysis_limit = {max(0, int(limit))}").fetchall()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+def vacuum() -> int:
+    """
+    Full VACUUM: rewrites the whole file and switches it to incremental auto_vacuum.
+    Blocks all writers while it runs. Returns bytes released.
+    """
+    conn = get_db_connection()
+    try:
+        before = space_stats(conn)["size_bytes"]
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return before - space_stats(conn)["size_bytes"]
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
     setup_logging()
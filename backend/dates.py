@@ -0,0 +1,115 @@
+"""
+Normalization of entry publish dates to timezone-aware UTC datetimes.
+
+feedparser already parses most dates into `published_parsed`/`updated_parsed`
+(struct_time in UTC), so those are used directly. Only when feedparser could not
+parse a date is the raw string tried against a list of formats; the format that
+worked is remembered per feed and tried first next time, since a feed nearly
+always uses one format for all of its entries.
+"""
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Set
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tried in order when feedparser left no parsed struct; "iso" and "rfc2822" are the
+# tolerant stdlib parsers, the rest are strptime formats seen in the wild
+FALLBACK_FORMATS = (
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "iso",
+    "rfc2822",
+    "%d %b %Y %H:%M:%S %z",
+    "%a, %d %b %Y %H:%M %z",
+    "%Y-%m-%d %H:%M:%S",
+    "%d.%m.%Y %H:%M",
+    "%Y/%m/%d %H:%M:%S",
+)
+
+_feed_formats: Dict[str, str] = {}
+_warned_feeds: Set[str] = set()
+_lock = threading.Lock()
+
+
+def to_utc(value: datetime) -> datetime:
+    """Converts to aware UTC; naive values are taken to be UTC already."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def from_struct(parsed) -> datetime:
+    """feedparser's *_parsed struct_time values are always UTC."""
+    return datetime(*parsed[:6], tzinfo=timezone.utc)
+
+
+def _parse_with(fmt: str, text: str) -> datetime:
+    if fmt == "iso":
+        return datetime.fromisoformat(text)
+    if fmt == "rfc2822":
+        return parsedate_to_datetime(text)
+    return datetime.strptime(text, fmt)
+
+
+def parse_date_string(text: str, feed_key: Optional[str] = None) -> Optional[datetime]:
+    """Parses a raw date string, trying the feed's remembered format first. None if nothing fits."""
+    text = text.strip()
+    remembered = _feed_formats.get(feed_key) if feed_key else None
+    if remembered:
+        try:
+            return to_utc(_parse_with(remembered, text))
+        except (ValueError, TypeError):
+            pass
+    for fmt in FALLBACK_FORMATS:
+        if fmt == remembered:
+            continue
+        try:
+            parsed = _parse_with(fmt, text)
+        except (ValueError, TypeError):
+            continue
+        if feed_key:
+            with _lock:
+                _feed_formats[feed_key] = fmt
+        return to_utc(parsed)
+    return None
+
+
+def entry_published_date(entry: Any, feed_key: Optional[str] = None) -> datetime:
+    """
+    Publish time of a feedparser entry as aware UTC: the parsed struct when feedparser
+    produced one, else the raw published/updated string, else the current time.
+    """
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if parsed:
+        try:
+            return from_struct(parsed)
+        except (TypeError, ValueError):
+            pass
+
+    text = entry.get('published') or entry.get('updated')
+    if not text:
+        return now_utc() # Default to current time if no date available
+    if isinstance(text, datetime):
+        return to_utc(text)
+    value = parse_date_string(text, feed_key)
+    if value is not None:
+        return value
+
+    # One warning per feed instead of one per entry
+    if feed_key not in _warned_feeds:
+        with _lock:
+            _warned_feeds.add(feed_key)
+        logger.warning(f"Could not parse date '{text}' from {feed_key or 'feed'}; using current time.")
+    return now_utc()
+
+
+def remembered_format(feed_key: str) -> Optional[str]:
+    return _feed_formats.get(feed_key)
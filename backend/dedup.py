@@ -0,0 +1,94 @@
+"""
+Keys for recognizing the same story under different URLs or in different feeds.
+
+* canonical_url: the link with tracking parameters, fragment, scheme, "www." and
+  other cosmetic differences removed, so URL variants of one page compare equal.
+* content_hash: a 64-bit hash of the normalized title and the start of the summary,
+  which stays the same when a story is syndicated to other feeds under other URLs.
+
+Both are stored on results and indexed, so finding the stored copy of an incoming
+entry is one index lookup per key.
+"""
+import hashlib
+import html
+import re
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from backend.config import settings
+
+# Query parameters that only track the click, never select content
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_hsenc", "_hsmi", "mkt_tok", "ref", "ref_src", "ref_url", "cmpid", "ocid", "spm",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+_TAG = re.compile(r"<[^>]+>")
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name in settings.DEDUP_TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of a link: lower-case host without "www." and default port, scheme
+    dropped (http and https are the same page), no fragment, no tracking parameters,
+    remaining parameters sorted, and no trailing slash.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+    host = (parts.hostname or "").rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    if ":" in host:
+        host = f"[{host}]" # IPv6 literal
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)))
+    return urlunsplit(("", host, path, query, ""))[2:] # Drop the leading "//" of a scheme-less URL
+
+
+def normalize_text(text: str) -> str:
+    """Markup, entities, case and punctuation removed; words separated by single spaces."""
+    return _NON_WORD.sub(" ", html.unescape(_TAG.sub(" ", text or "")).casefold()).strip()
+
+
+def leading_words(text: str, count: int) -> List[str]:
+    """The first `count` normalized words, normalizing no more of a long text than needed."""
+    text = text or ""
+    window = max(count, 1) * 16
+    while window < len(text):
+        head = text[:window]
+        if head.rfind("<") > head.rfind(">"):
+            head = head[:head.rfind("<")] # Cut inside a tag
+        words = normalize_text(head).split()
+        if len(words) > count: # The last word may be cut, so one spare
+            return words[:count]
+        window *= 4
+    return normalize_text(text).split()[:count]
+
+
+def content_hash(title: str, summary: str) -> Optional[int]:
+    """
+    Signed 64-bit hash (fits an SQLite INTEGER) of the normalized title and the first
+    DEDUP_SUMMARY_WORDS words of the summary. None when there is too little text
+    (DEDUP_MIN_WORDS) for equal content to mean the same story.
+    """
+    words = normalize_text(title).split()
+    words.append("\0")
+    words.extend(leading_words(summary, settings.DEDUP_SUMMARY_WORDS))
+    if len(words) - 1 < settings.DEDUP_MIN_WORDS:
+        return None
+    digest = hashlib.blake2b(" ".join(words).encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, keywords: Optional[Set[str]], max_queue: int):
+        self.keywords = keywords
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def wants(self, result: Dict[str, Any]) -> bool:
+        if not self.keywords:
+            return True
+        matched = {kw.strip() for kw in (result.get('matched_keywords') or "").split(",")}
+        return not self.keywords.isdisjoint(matched)
+
+
+class ResultBroadcaster:
+    """
+    In-process fan-out of newly stored results to streaming clients.
+
+    Subscribers live on the API event loop; publish() may be called from any thread
+    (feed processing, the writer) and never blocks: items are handed to the loop and
+    copied into each subscriber's bounded queue. When a slow client's queue is full the
+    oldest item is dropped and the client is told to resync, so one stalled connection
+    can never hold up ingestion or other clients.
+
+    When results are stored by other processes (separate workers, other API workers),
+    follow() reads them from the database instead and publish() is ignored.
+    """
+
+    def __init__(self, max_queue: int = settings.STREAM_CLIENT_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.following = False
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, keywords: Optional[List[str]] = None) -> Subscription:
+        wanted = {kw.strip().lower() for kw in keywords if kw.strip()} if keywords else None
+        subscription = Subscription(wanted, self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, results: List[Dict[str, Any]]):
+        loop = self._loop
+        if self.following or not results or loop is None or loop.is_closed() or not self._subscribers:
+            return
+        self.published += len(results)
+        try:
+            loop.call_soon_threadsafe(self._fan_out, results)
+        except RuntimeError:
+            pass # Loop shut down between the check and the call
+
+    async def follow(
+        self,
+        max_id: Callable[[], Awaitable[int]],
+        load_after: Callable[[int], Awaitable[List[Dict[str, Any]]]],
+        interval: float,
+    ):
+        """
+        Publishes results with ids above the last one seen, polling every `interval`
+        seconds while anyone is subscribed. Runs on the API loop until cancelled.
+        """
+        self.following = True
+        last_id = None
+        while True:
+            await asyncio.sleep(interval)
+            if not self._subscribers:
+                last_id = None # Nobody missed anything; start from the newest row again
+                continue
+            try:
+                if last_id is None:
+                    last_id = await max_id()
+                    continue
+                results = await load_after(last_id)
+            except Exception as e:
+                logger.error(f"Error reading new results for the stream: {e}")
+                continue
+            if results:
+                last_id = results[-1]['id']
+                self.published += len(results)
+                self._fan_out(results)
+
+    def _fan_out(self, results: List[Dict[str, Any]]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            for result in results:
+                if not subscription.wants(result):
+                    continue
+                if subscription.queue.full():
+                    subscription.queue.get_nowait()
+                    subscription.dropped += 1
+                subscription.queue.put_nowait(result)
+
+
+result_broadcaster = ResultBroadcaster()
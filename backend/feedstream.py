@@ -0,0 +1,313 @@
+"""
+Streaming feed parser: yields the entries of an RSS or Atom 1.0 document one at a time
+while the body is read, so the caller can stop at entries it already knows and the
+rest of the document is never parsed. Bodies the fetcher spooled to disk are read
+from the file a chunk at a time, so they are never held in memory whole.
+
+Only the entry fields the pipeline uses are kept (title, link, summary and the
+published/updated dates), and every element is dropped from the tree once it has been
+read, so memory does not grow with the number of entries. Fields are resolved the way
+feedparser resolves them (element precedence, guid as link, HTML sanitizing, date
+parsing), using feedparser's own helpers, so both parsers store the same text.
+
+Anything outside that subset (DOCTYPEs, xml:base, markup or child elements inside a
+field, inline XHTML or base64 content, Atom 0.3, unknown root elements) raises
+Unsupported, and so does malformed XML; callers then parse the body with feedparser.
+
+The helpers are feedparser internals, tested with the 6.0 series pinned in
+requirements.txt. If a release moves them this module fails to import and
+backend.processing parses everything with feedparser instead.
+"""
+import io
+import re
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from feedparser.datetimes import _parse_date
+from feedparser.html import _cp1252
+from feedparser.mixin import _FeedParserMixin
+from feedparser.sanitizer import _sanitize_html
+from feedparser.urls import _urljoin, resolve_relative_uris
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+HTML_TYPES = _FeedParserMixin.html_types
+
+# feedparser's element names (namespace prefix + "_" + lowercased local name) of the
+# fields kept, by the feedparser handler they go through
+TITLE = {'title', 'dc_title', 'media_title'}
+DESCRIPTION = {'description', 'dc_description', 'media_description'} # Default type text/html
+SUMMARY = {'summary', 'itunes_summary'} # Default type text/plain
+CONTENT_ENCODED = {'content_encoded', 'fullitem'}
+PUBLISHED = {'published', 'issued', 'pubdate', 'dcterms_issued'}
+UPDATED = {'updated', 'modified', 'lastbuilddate', 'dc_date', 'dcterms_modified'}
+FIELDS = TITLE | DESCRIPTION | SUMMARY | CONTENT_ENCODED | PUBLISHED | UPDATED | {'link', 'guid', 'id', 'content'}
+# Inside an entry feedparser gives these a meaning not reproduced here
+UNSUPPORTED = {'abstract', 'body', 'xhtml_body', 'image', 'textinput', 'item', 'entry'}
+ENTRY = {'item', 'entry'}
+ROOTS = {'rss', 'rdf_rdf', 'feed'}
+
+_NAMESPACES = {uri.lower(): prefix for uri, prefix in _FeedParserMixin.namespaces.items()}
+_ROOT_START = re.compile(rb"<[^?!]")
+_DECLARED_ENCODING = re.compile(rb"""^<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z0-9._-]+)["']""")
+
+
+class Unsupported(Exception):
+    """The document cannot be parsed here; parse it with feedparser instead."""
+
+
+def _element_name(tag: str) -> Optional[str]:
+    """feedparser's name for an element, or None for elements of unknown namespaces that are never read."""
+    if tag[0] != "{":
+        return tag.lower()
+    uri, local = tag[1:].split("}", 1)
+    local = local.lower()
+    uri = uri.lower()
+    if "backend.userland.com/rss" in uri:
+        uri = "http://backend.userland.com/rss"
+    prefix = _NAMESPACES.get(uri)
+    if prefix is None:
+        # feedparser names these by the document's prefix, which is lost here
+        if local in FIELDS or local in ENTRY or local == 'source':
+            raise Unsupported(f"<{local}> in unknown namespace {uri}")
+        return None
+    return f"{prefix}_{local}" if prefix else local
+
+
+def _map_content_type(content_type: str) -> str:
+    return _FeedParserMixin.map_content_type(content_type)
+
+
+def _document_encoding(head: bytes) -> str:
+    if head[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return "utf-16"
+    match = _DECLARED_ENCODING.match(head.lstrip(b"\xef\xbb\xbf")[:200])
+    return match.group(1).decode("ascii").lower() if match else "utf-8"
+
+
+class StreamParser:
+    """
+    Parses one feed body, given as bytes or as a binary file. Iterating entries() reads
+    the body chunk_size bytes at a time; bytes_parsed tells how much had been read when
+    iteration stopped.
+    """
+
+    def __init__(self, content: Union[bytes, BinaryIO], chunk_size: int = 64 * 1024):
+        self.body = io.BytesIO(content) if isinstance(content, bytes) else content
+        self.chunk_size = chunk_size
+        self.bytes_parsed = 0
+        self.encoding = 'utf-8'
+        self.version = ''
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Yields entries as dicts with feedparser's keys (title, link, summary, published_parsed, ...)."""
+        chunk = self.body.read(self.chunk_size)
+        self.encoding = _document_encoding(chunk)
+        head = chunk
+        if self.encoding == 'utf-16':
+            head = chunk[:len(chunk) // 2 * 2].decode('utf-16', 'replace').encode('utf-8') # The checks look for ASCII markup
+        # The prolog must fit in the first chunk; longer ones are left to feedparser
+        root_start = _ROOT_START.search(head)
+        if root_start is None:
+            raise Unsupported("no root element")
+        if b"<!DOCTYPE" in head[:root_start.start()].upper():
+            raise Unsupported("DOCTYPE declaration") # feedparser rewrites these itself
+
+        parser = XMLPullParser(events=("start-ns", "start", "end"))
+        stack: List[Any] = [] # Open elements
+        names: List[Optional[str]] = []
+        entry: Optional[_Entry] = None
+        source_depth = 0 # Depth of an open <source> inside the entry
+        try:
+            while True:
+                if chunk:
+                    parser.feed(chunk)
+                    self.bytes_parsed += len(chunk)
+                else:
+                    parser.close() # Raises for a document that ends early (e.g. a truncated download)
+                for event, elem in parser.read_events():
+                    if event == "start-ns":
+                        self._track_namespace(*elem)
+                        continue
+                    if event == "start":
+                        if XML_BASE in elem.attrib:
+                            raise Unsupported("xml:base")
+                        name = _element_name(elem.tag)
+                        if not stack:
+                            if name not in ROOTS or (name == 'feed' and elem.tag != f"{{{ATOM_NS}}}feed"):
+                                raise Unsupported(f"root element {elem.tag}")
+                            self._start_root(name)
+                        elif entry is not None:
+                            if names[-1] in FIELDS:
+                                raise Unsupported(f"<{name}> inside <{names[-1]}>")
+                            if name in UNSUPPORTED:
+                                raise Unsupported(f"<{name}> inside an entry")
+                            if name == 'source' and not source_depth:
+                                source_depth = len(stack) + 1
+                                entry.title_depth = -1
+                        elif name in ENTRY:
+                            attrs = _attributes(elem)
+                            if 'href' in attrs or 'lastmod' in attrs:
+                                raise Unsupported("CDF entry attributes")
+                            entry = _Entry(self, len(stack) + 1)
+                        stack.append(elem)
+                        names.append(name)
+                        continue
+
+                    depth = len(stack)
+                    name = names.pop()
+                    stack.pop()
+                    if entry is not None:
+                        if depth == entry.depth:
+                            yield entry.result()
+                            entry = None
+                        elif source_depth:
+                            if name in TITLE:
+                                entry.source_title(elem, depth)
+                            if depth == source_depth:
+                                source_depth = 0
+                        elif name in FIELDS:
+                            entry.end_field(name, elem, depth)
+                    if stack:
+                        del stack[-1][:] # Drop ended elements so the tree never holds more than the open path
+                if not chunk:
+                    break
+                chunk = self.body.read(self.chunk_size)
+        except (ParseError, ValueError, LookupError) as e:
+            raise Unsupported(f"{type(e).__name__}: {e}") from e
+
+    def _track_namespace(self, prefix: str, uri: str):
+        # feedparser guesses the version from the first known namespace declared...
+        if not self.version:
+            uri = uri.lower()
+            if not prefix and uri == 'http://my.netscape.com/rdf/simple/0.9/':
+                self.version = 'rss090'
+            elif uri == 'http://purl.org/rss/1.0/':
+                self.version = 'rss10'
+            elif uri == ATOM_NS.lower():
+                self.version = 'atom10'
+
+    def _start_root(self, name: str):
+        # ...and then from the root element
+        if name == 'rss' and not self.version.startswith('rss'):
+            self.version = 'rss'
+        elif name == 'feed' and not self.version:
+            self.version = 'atom'
+
+    def text(self, element: str, value: Optional[str], content_type: str = '') -> str:
+        """
+        Final value of a text field, as feedparser's pop() produces it. content_type is
+        empty for fields that are not content (links, ids, dates).
+        """
+        output = (value or "").strip()
+        if not self.version.startswith('atom') and content_type == 'text/plain' and _FeedParserMixin.looks_like_html(output):
+            content_type = 'text/html'
+        if content_type in HTML_TYPES and element in _FeedParserMixin.can_contain_dangerous_markup:
+            if "<" in output or "&" in output:
+                output = resolve_relative_uris(output, "", self.encoding, content_type)
+                output = _sanitize_html(output, self.encoding, content_type)
+            else:
+                output = output.replace("\r\n", "\n") # All the sanitizer changes in plain text
+        if not output.isascii():
+            if self.encoding == 'utf-8':
+                # feedparser's repair of UTF-8 that was decoded as Latin-1 somewhere upstream
+                try:
+                    output = output.encode("iso-8859-1").decode("utf-8")
+                except (UnicodeEncodeError, UnicodeDecodeError):
+                    pass
+            output = output.translate(_cp1252)
+        return output
+
+
+def _attributes(elem) -> Dict[str, str]:
+    return {key.lower(): value for key, value in elem.attrib.items() if key[0] != "{"}
+
+
+def _content_type(attrs: Dict[str, str], default: str) -> str:
+    content_type = _map_content_type(attrs.get('type', default))
+    if content_type == 'application/xhtml+xml':
+        raise Unsupported("inline XHTML content")
+    if attrs.get('mode') == 'base64' or not (
+        content_type.startswith('text/') or content_type.endswith('+xml') or content_type.endswith('/xml')
+    ):
+        raise Unsupported("base64 content")
+    return content_type
+
+
+class _Entry:
+    """Field state of one entry, following feedparser's precedence rules."""
+
+    def __init__(self, parser: StreamParser, depth: int):
+        self.parser = parser
+        self.depth = depth
+        self.values: Dict[str, Any] = {}
+        self.value_depths: Dict[str, int] = {}
+        self.title_depth = -1
+        self.has_content = False
+
+    def result(self) -> Dict[str, Any]:
+        # FeedParserDict answers for a missing updated date with the published one
+        if 'published' in self.values and 'updated' not in self.values:
+            self.values['updated'] = self.values['published']
+            self.values['updated_parsed'] = self.values['published_parsed']
+        return self.values
+
+    def _store(self, key: str, value: str, depth: int):
+        # A value only replaces one found at the same or a deeper level
+        old_depth = self.value_depths.get(key)
+        if old_depth is None or depth <= old_depth:
+            self.value_depths[key] = depth
+            self.values[key] = value
+
+    def source_title(self, elem, depth: int):
+        if self.parser.text('title', elem.text, _content_type(_attributes(elem), 'text/plain')):
+            self.title_depth = depth
+
+    def end_field(self, name: str, elem, depth: int):
+        attrs = _attributes(elem)
+        text = self.parser.text
+        if name in TITLE:
+            value = text('title', elem.text, _content_type(attrs, 'text/plain'))
+            if not -1 < self.title_depth <= depth:
+                self._store('title', value, depth)
+            if value and name != 'media_title':
+                self.title_depth = depth
+        elif name == 'link':
+            href = attrs.get('url', attrs.get('uri', attrs.get('href')))
+            if href:
+                attrs['href'] = href
+            if 'href' in attrs:
+                rel = attrs.get('rel', 'alternate')
+                link_type = attrs.get('type', 'application/atom+xml' if rel == 'self' else 'text/html')
+                if rel == 'alternate' and _map_content_type(link_type) in HTML_TYPES:
+                    self.values['link'] = _urljoin("", attrs['href'])
+            else:
+                value = (elem.text or "").strip()
+                value = text('link', _urljoin("", value) if value else value)
+                value = value.replace('&amp;', '&')
+                self.values['link'] = re.sub("&([A-Za-z0-9_]+);", r"&\g<1>", value)
+        elif name in ('guid', 'id'):
+            is_link = attrs.get('ispermalink', 'true') == 'true'
+            value = (elem.text or "").strip()
+            value = text('id', _urljoin("", value) if is_link and value else value)
+            if is_link:
+                self.values.setdefault('link', value)
+        elif name in DESCRIPTION or name in SUMMARY:
+            if 'summary' in self.values and not self.has_content:
+                # feedparser takes a second summary for content, which never replaces the first
+                self.has_content = True
+                _content_type(attrs, 'text/plain')
+            else:
+                default = 'text/html' if name in DESCRIPTION else 'text/plain'
+                element = 'description' if name in DESCRIPTION else 'summary'
+                self._store('summary', text(element, elem.text, _content_type(attrs, default)), depth)
+        elif name in CONTENT_ENCODED or name == 'content':
+            self.has_content = True
+            content_type = _content_type(attrs, 'text/html' if name in CONTENT_ENCODED else 'text/plain')
+            if content_type in HTML_TYPES or content_type == 'text/plain':
+                self.values.setdefault('summary', text('content', elem.text, content_type))
+        elif name in PUBLISHED or name in UPDATED:
+            key = 'published' if name in PUBLISHED else 'updated'
+            value = text(key, elem.text)
+            self._store(key, value, depth)
+            self.values[f"{key}_parsed"] = _parse_date(value)
@@ -0,0 +1,213 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import aiohttp
+
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: Optional[int] = None
+    content: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    content_file: Optional[str] = None # Temporary file holding a body above FETCH_SPOOL_BYTES; content is then empty
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code is not None and 200 <= self.status_code < 300
+
+    @property
+    def body(self) -> Union[bytes, str]:
+        """What the parser reads: the content, or the path of the file it was spooled to."""
+        return self.content_file or self.content
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.content_file) if self.content_file else len(self.content)
+
+    def discard(self):
+        """Removes the spooled body once the result has been handled."""
+        if self.content_file:
+            try:
+                os.unlink(self.content_file)
+            except FileNotFoundError:
+                pass
+            self.content_file = None
+
+
+class FeedFetcher:
+    """
+    Async download engine shared by every feed job.
+
+    A single aiohttp.ClientSession (connection pooling + keep-alive) runs on a dedicated
+    event loop thread. Scheduler threads hand URLs over with submit() and get a
+    concurrent.futures.Future back, so downloading never holds a scheduler thread.
+    Parsing is left to the caller.
+    """
+
+    def __init__(
+        self,
+        timeout: float = settings.FETCH_TIMEOUT_SECONDS,
+        max_connections: int = settings.FETCH_MAX_CONNECTIONS,
+        keepalive_timeout: float = settings.FETCH_KEEPALIVE_SECONDS,
+        per_host_limit: int = settings.FETCH_PER_HOST_LIMIT,
+        user_agent: str = settings.FETCH_USER_AGENT,
+        max_body_bytes: int = settings.FETCH_MAX_BODY_BYTES,
+        spool_bytes: int = settings.FETCH_SPOOL_BYTES,
+    ):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.per_host_limit = per_host_limit
+        self.user_agent = user_agent
+        self.max_body_bytes = max_body_bytes
+        self.spool_bytes = spool_bytes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0 # Only touched on the loop thread
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            ready = threading.Event()
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="feed-fetcher", daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.info(
+                f"Feed fetcher started (max_connections={self.max_connections}, per_host_limit={self.per_host_limit})."
+            )
+
+    def _run_loop(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        self._session = self._loop.run_until_complete(self._create_session())
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    async def _create_session(self) -> aiohttp.ClientSession:
+        # The connector enforces both the global and the per-host connection limits
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.per_host_limit,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": self.user_agent},
+        )
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._session = None
+            logger.info("Feed fetcher stopped.")
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """Downloads a single feed. Never raises; failures are reported on the result."""
+        started = time.perf_counter()
+        self.in_flight += 1
+        try:
+            async with self._session.get(url, headers=headers) as response:
+                content, content_file = await self._read_body(response)
+                return FetchResult(
+                    url=url,
+                    status_code=response.status,
+                    content=content,
+                    headers={k.lower(): v for k, v in response.headers.items()},
+                    elapsed=time.perf_counter() - started,
+                    content_file=content_file,
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError, BodyTooLarge) as e:
+            return FetchResult(url=url, elapsed=time.perf_counter() - started, error=f"{type(e).__name__}: {e}")
+        finally:
+            self.in_flight -= 1
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> Tuple[bytes, Optional[str]]:
+        """
+        Reads the (decompressed) body, giving up as soon as it exceeds max_body_bytes.
+        Returns (body, None), or (b"", path) once the body outgrew spool_bytes and the
+        rest of it was written to a temporary file instead of memory.
+        """
+        limit = self.max_body_bytes
+        if limit > 0 and response.content_length is not None and response.content_length > limit:
+            raise BodyTooLarge(f"Content-Length {response.content_length} exceeds {limit} bytes")
+        chunks = []
+        size = 0
+        spool = None
+        try:
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                size += len(chunk)
+                if 0 < limit < size:
+                    raise BodyTooLarge(f"body exceeds {limit} bytes")
+                if spool is None and 0 < self.spool_bytes < size:
+                    spool = tempfile.NamedTemporaryFile(prefix="feed-", suffix=".xml", delete=False)
+                    spool.writelines(chunks)
+                    chunks = []
+                if spool is not None:
+                    spool.write(chunk) # Small sequential writes to the page cache; not worth a thread hop
+                else:
+                    chunks.append(chunk)
+        except BaseException:
+            if spool is not None:
+                spool.close()
+                os.unlink(spool.name)
+            raise
+        if spool is not None:
+            spool.close()
+            return b"", spool.name
+        return b"".join(chunks), None
+
+    def submit(self, url: str, headers: Optional[Dict[str, str]] = None) -> Future:
+        """Schedules a download from any thread and returns a concurrent.futures.Future."""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(self.fetch(url, headers), self._loop)
+
+    def fetch_blocking(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        return self.submit(url, headers).result()
+
+    def fetch_many(self, urls: List[str]) -> List[FetchResult]:
+        """Downloads many feeds concurrently and returns results in input order; discard() them when done."""
+        if not self.running:
+            self.start()
+
+        async def _gather():
+            return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+        return asyncio.run_coroutine_threadsafe(_gather(), self._loop).result()
+
+
+fetcher = FeedFetcher()
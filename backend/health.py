@@ -0,0 +1,77 @@
+import random
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from backend import dates
+from backend.config import settings
+
+HEALTHY = "healthy"
+FAILING = "failing"
+BACKING_OFF = "backing_off"
+DISABLED = "disabled"
+PAUSED = "paused"
+
+
+def backoff_seconds(consecutive_failures: int) -> Optional[float]:
+    """
+    Circuit breaker delay after a failure: none below the threshold, then the base
+    delay doubling with every further failure up to the maximum, with +-10% jitter
+    so feeds that broke together (e.g. one host going down) do not retry together.
+    """
+    over = consecutive_failures - settings.FEED_CIRCUIT_FAILURE_THRESHOLD
+    if over < 0:
+        return None
+    delay = min(settings.FEED_BACKOFF_MAX_MINUTES, settings.FEED_BACKOFF_BASE_MINUTES * 2 ** min(over, 30)) * 60
+    return delay * random.uniform(0.9, 1.1)
+
+
+def should_disable(consecutive_failures: int) -> bool:
+    threshold = settings.FEED_AUTO_DISABLE_FAILURES
+    return threshold > 0 and consecutive_failures >= threshold
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return dates.to_utc(datetime.fromisoformat(value))
+
+
+def last_fetch_time(feed: Dict[str, Any]) -> Optional[datetime]:
+    """When the feed was last fetched, successfully or not, by any worker."""
+    times = [parse_timestamp(feed.get(field)) for field in ('last_success_at', 'last_failure_at')]
+    return max((t for t in times if t is not None), default=None)
+
+
+def feed_status(feed: Dict[str, Any], now: Optional[datetime] = None) -> str:
+    if feed.get('auto_disabled'):
+        return DISABLED
+    if not feed.get('is_active'):
+        return PAUSED
+    backoff_until = parse_timestamp(feed.get('backoff_until'))
+    if backoff_until and backoff_until > (now or dates.now_utc()):
+        return BACKING_OFF
+    if feed.get('consecutive_failures'):
+        return FAILING
+    return HEALTHY
+
+
+def feed_health(feed: Dict[str, Any], next_run_time: Optional[datetime] = None) -> Dict[str, Any]:
+    """Health summary of a feed row for the /rss-feeds/{id}/health endpoint."""
+    failures = feed.get('consecutive_failures') or 0
+    return {
+        'feed_id': feed['id'],
+        'status': feed_status(feed),
+        'is_active': bool(feed.get('is_active')),
+        'auto_disabled': bool(feed.get('auto_disabled')),
+        'consecutive_failures': failures,
+        'last_error': feed.get('last_error'),
+        'last_status_code': feed.get('last_status_code'),
+        'last_latency_ms': feed.get('last_latency_ms'),
+        'last_success_at': feed.get('last_success_at'),
+        'last_failure_at': feed.get('last_failure_at'),
+        'backoff_until': feed.get('backoff_until'),
+        'next_run_time': next_run_time,
+        'failures_until_disabled': (
+            max(0, settings.FEED_AUTO_DISABLE_FAILURES - failures) if settings.FEED_AUTO_DISABLE_FAILURES > 0 else None
+        ),
+    }
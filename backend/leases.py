@@ -0,0 +1,161 @@
+"""
+Feed leases: splitting the feeds between processes that share one database.
+
+Every process that monitors feeds in lease mode (uvicorn workers with FEED_LEASES=true,
+or python -m backend.worker) runs a LeaseManager. Every LEASE_HEARTBEAT_SECONDS it
+* records itself in the workers table and counts the live workers,
+* renews the leases it holds (expiry = now + LEASE_TTL_SECONDS),
+* releases leases above its fair share, ceil(active feeds / live workers), and
+* claims feeds without a valid lease up to that share, and
+* runs the manual re-fetches requested (through the API) for the feeds it holds.
+A worker that dies stops renewing, and once its leases have expired the others claim
+its feeds. A worker that stops cleanly releases them at once.
+
+A worker only runs a feed while it holds the lease by its own clock, counted from
+before the renewal was written, so it stops before anyone else can claim the feed.
+The clocks of all machines sharing the database must agree to well within
+LEASE_TTL_SECONDS.
+"""
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional, Set
+
+from backend import crud, metrics
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseManager:
+    """
+    Holds this process's share of the feeds. on_change(acquired, lost, feeds_changed) is
+    called from the heartbeat thread whenever the held set changed or feeds were edited
+    (added, removed, deactivated, URL or interval changed) anywhere; on_refetch(feed_ids)
+    with the held feeds whose re-fetch was requested since the last heartbeat.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[Set[int], Set[int], bool], None],
+        on_refetch: Optional[Callable[[List[int]], None]] = None,
+        worker_id: Optional[str] = None,
+        ttl: float = settings.LEASE_TTL_SECONDS,
+        heartbeat_interval: float = settings.LEASE_HEARTBEAT_SECONDS,
+    ):
+        self.worker_id = worker_id or settings.WORKER_ID or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.ttl = ttl
+        self.heartbeat_interval = min(heartbeat_interval, ttl / 2)
+        self.started_at = time.time()
+        self.live_workers = 0
+        self._on_change = on_change
+        self._on_refetch = on_refetch
+        self._held: Set[int] = set()
+        self._valid_until = 0.0 # Monotonic
+        self._leader = False
+        self._feeds_version: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _valid(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    def assigned(self, feed_id: int) -> bool:
+        """The feed is in this worker's share: its job stays scheduled here."""
+        return feed_id in self._held
+
+    def holds(self, feed_id: int) -> bool:
+        """True while this worker holds the lease of the feed and may run it."""
+        return feed_id in self._held and self._valid()
+
+    def held(self) -> List[int]:
+        return sorted(self._held)
+
+    def is_leader(self) -> bool:
+        """The oldest live worker runs the jobs that must not run in several places (retention)."""
+        return self._leader and self._valid()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        try:
+            self.heartbeat() # Take a share before the scheduler starts
+        except Exception as e:
+            logger.error(f"Initial lease heartbeat of worker {self.worker_id} failed: {e}")
+        self._thread = threading.Thread(target=self._run, name="feed-leases", daemon=True)
+        self._thread.start()
+        logger.info(f"Worker {self.worker_id} started (lease TTL {self.ttl:g}s, heartbeat every {self.heartbeat_interval:g}s).")
+
+    def stop(self):
+        """Stops renewing and releases every lease, so other workers take the feeds over at their next heartbeat."""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._held = set()
+        self._valid_until = 0.0
+        crud.remove_worker(self.worker_id)
+        logger.info(f"Worker {self.worker_id} stopped and released its feed leases.")
+
+    def _run(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                # Leases lapse by themselves if this keeps failing; holds() turns false first
+                logger.error(f"Lease heartbeat of worker {self.worker_id} failed: {e}")
+
+    def heartbeat(self):
+        started = time.monotonic()
+        now = time.time()
+        workers = crud.heartbeat_worker(self.worker_id, socket.gethostname(), os.getpid(), self.started_at, now, now - self.ttl)
+        held = set(crud.renew_feed_leases(self.worker_id, now + self.ttl))
+        valid_until = started + self.ttl
+
+        share = math.ceil(crud.count_active_feeds() / max(1, len(workers)))
+        released: Set[int] = set()
+        if len(held) > share:
+            released = set(sorted(held)[share:])
+            crud.release_feed_leases(self.worker_id, sorted(released))
+            held -= released
+        elif len(held) < share:
+            held.update(crud.claim_feed_leases(self.worker_id, now, now + self.ttl, share - len(held)))
+
+        previous = self._held
+        acquired = held - previous
+        lost = previous - held - released
+        feeds_version = crud.get_data_version('feeds')
+        feeds_changed = self._feeds_version is not None and feeds_version != self._feeds_version
+        self._feeds_version = feeds_version
+        self._held = held
+        self._valid_until = valid_until
+        self._leader = bool(workers) and workers[0]['worker_id'] == self.worker_id
+        self.live_workers = len(workers)
+
+        if acquired:
+            metrics.lease_changes.inc(len(acquired), ["acquired"])
+        if released:
+            metrics.lease_changes.inc(len(released), ["released"])
+        if lost:
+            metrics.lease_changes.inc(len(lost), ["lost"])
+        if acquired or released or lost:
+            logger.info(
+                f"Worker {self.worker_id} holds {len(held)} feeds (share {share} of {len(workers)} live workers): "
+                f"+{len(acquired)} acquired, -{len(released)} released, -{len(lost)} lost."
+            )
+        if acquired or released or lost or feeds_changed:
+            self._on_change(acquired, released | lost, feeds_changed)
+        if self._on_refetch is not None and held:
+            requested = crud.take_feed_refetch_requests(self.worker_id)
+            if requested:
+                self._on_refetch(requested)
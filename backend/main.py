@@ -1,18 +1,26 @@
-from fastapi import FastAPI, HTTPException, status, Query, BackgroundTasks
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, status, Query, BackgroundTasks, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import json
 import os
+import time
 from typing import List, Optional
 from datetime import datetime
 
-from backend import crud, monitor
+from backend import async_db, crud, database, export, health, metrics, monitor, retention
+from backend.backfill import keyword_backfill
+from backend.config import settings
+from backend.events import result_broadcaster
 from backend.models import (
     KeywordCreate, KeywordUpdate, KeywordInDB,
-    RSSFeedCreate, RSSFeedUpdate, RSSFeedInDB,
-    ResultInDB, PaginatedResults
+    RSSFeedCreate, RSSFeedUpdate, RSSFeedInDB, FeedHealth,
+    ResultInDB, ResultSource, PaginatedResults, PaginatedSearchResults,
+    RetentionPolicy, RetentionPolicyUpdate
 )
 from backend.logging_config import setup_logging
+from backend.seen import seen_entries
 import logging
 
 # Set up logging early
@@ -42,58 +50,104 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Labelled by route template (e.g. /rss-feeds/{feed_id}) to keep the series count bounded
+    route = request.scope.get("route")
+    if route is not None and request.url.path != "/metrics":
+        metrics.api_duration.observe(time.perf_counter() - started, [route.path, request.method])
+    return response
+
 # Serve static files (frontend)
 app.mount("/frontend", StaticFiles(directory="frontend"), name="static")
 
+_background_tasks = []
+
 @app.on_event("startup")
 async def startup_event():
+    result_broadcaster.bind_loop(asyncio.get_running_loop())
     monitor.start_monitor_on_startup()
+    if settings.FEED_LEASES or not settings.MONITOR_IN_API:
+        # Results are (also) stored by other processes; stream them from the database
+        _background_tasks.append(asyncio.create_task(result_broadcaster.follow(
+            lambda: async_db.read(crud.get_max_result_id),
+            lambda after_id: async_db.read(crud.get_results_after, after_id, 500),
+            settings.STREAM_POLL_SECONDS,
+        )))
     logger.info("FastAPI application startup completed.")
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    for task in _background_tasks:
+        task.cancel()
     monitor.stop_monitor_on_shutdown()
+    async_db.shutdown()
     logger.info("FastAPI application shutdown completed.")
 
+_index_page = {'mtime': None, 'html': ""}
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
-    """Serves the main HTML page."""
-    with open(os.path.join("frontend", "index.html"), "r") as f:
-        return f.read()
+    """Serves the main HTML page, re-read from disk only when the file changed."""
+    path = os.path.join("frontend", "index.html")
+    mtime = os.stat(path).st_mtime_ns
+    if _index_page['mtime'] != mtime:
+        with open(path, "r") as f:
+            _index_page['html'] = f.read()
+        _index_page['mtime'] = mtime
+    return _index_page['html']
 
 #  Keyword Endpoints 
 
 @app.post("/keywords/", response_model=KeywordInDB, status_code=status.HTTP_201_CREATED)
 async def create_new_keyword(keyword: KeywordCreate):
-    db_keyword = crud.create_keyword(keyword)
+    db_keyword = await async_db.write(crud.create_keyword, keyword)
     if db_keyword is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Keyword already exists."
         )
+    # Match the new keyword against recently fetched entries, without fetching feeds again
+    keyword_backfill.enqueue(db_keyword['id'])
     return db_keyword
 
 @app.get("/keywords/", response_model=List[KeywordInDB])
 async def get_all_keywords(active_only: bool = False):
-    return crud.get_all_keywords(active_only=active_only)
+    return await async_db.read(crud.get_all_keywords, active_only=active_only)
 
 @app.get("/keywords/{keyword_id}", response_model=KeywordInDB)
 async def get_keyword_by_id(keyword_id: int):
-    keyword = crud.get_keyword(keyword_id)
+    keyword = await async_db.read(crud.get_keyword, keyword_id)
     if keyword is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Keyword not found")
     return keyword
 
 @app.put("/keywords/{keyword_id}", response_model=KeywordInDB)
 async def update_existing_keyword(keyword_id: int, keyword: KeywordUpdate):
-    updated_keyword = crud.update_keyword(keyword_id, keyword)
+    previous = await async_db.read(crud.get_keyword, keyword_id)
+    updated_keyword = await async_db.write(crud.update_keyword, keyword_id, keyword)
     if updated_keyword is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Keyword not found or no changes made")
+    # Reactivated or renamed: entries fetched meanwhile were not matched against it
+    if updated_keyword['is_active'] and previous and (not previous['is_active'] or previous['keyword'] != updated_keyword['keyword']):
+        keyword_backfill.enqueue(keyword_id)
     return updated_keyword
 
+@app.post("/keywords/{keyword_id}/backfill", status_code=status.HTTP_202_ACCEPTED)
+async def backfill_keyword(keyword_id: int):
+    """Matches the keyword against the entry archive again, e.g. after ENTRY_ARCHIVE_DAYS was raised."""
+    keyword = await async_db.read(crud.get_keyword, keyword_id)
+    if keyword is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Keyword not found")
+    if not keyword['is_active']:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Keyword is not active")
+    return keyword_backfill.enqueue(keyword_id)
+
 @app.delete("/keywords/{keyword_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_existing_keyword(keyword_id: int):
-    if not crud.delete_keyword(keyword_id):
+    if not await async_db.write(crud.delete_keyword, keyword_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Keyword not found")
     return
 
@@ -101,51 +155,62 @@ async def delete_existing_keyword(keyword_id: int):
 
 @app.post("/rss-feeds/", response_model=RSSFeedInDB, status_code=status.HTTP_201_CREATED)
 async def create_new_rss_feed(feed: RSSFeedCreate):
-    db_feed = crud.create_rss_feed(feed)
+    db_feed = await async_db.write(crud.create_rss_feed, feed)
     if db_feed is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="RSS Feed URL already exists."
         )
-    # Re-schedule monitoring jobs after adding/updating a feed
-    monitor.schedule_feed_monitoring()
+    # Only the new feed's job is added; other feeds keep their schedules
+    await async_db.write(monitor.sync_feed_job, db_feed['id'], run_now=True)
     return db_feed
 
 @app.get("/rss-feeds/", response_model=List[RSSFeedInDB])
 async def get_all_rss_feeds(active_only: bool = False):
-    return crud.get_all_rss_feeds(active_only=active_only)
+    return await async_db.read(crud.get_all_rss_feeds, active_only=active_only)
 
 @app.get("/rss-feeds/{feed_id}", response_model=RSSFeedInDB)
 async def get_rss_feed_by_id(feed_id: int):
-    feed = crud.get_rss_feed(feed_id)
+    feed = await async_db.read(crud.get_rss_feed, feed_id)
     if feed is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="RSS Feed not found")
     return feed
 
+@app.get("/rss-feeds/{feed_id}/health", response_model=FeedHealth)
+async def get_rss_feed_health(feed_id: int):
+    feed = await async_db.read(crud.get_rss_feed, feed_id)
+    if feed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="RSS Feed not found")
+    return health.feed_health(feed, monitor.feed_next_run_time(feed_id))
+
 @app.put("/rss-feeds/{feed_id}", response_model=RSSFeedInDB)
 async def update_existing_rss_feed(feed_id: int, feed: RSSFeedUpdate):
-    updated_feed = crud.update_rss_feed(feed_id, feed)
+    updated_feed = await async_db.write(crud.update_rss_feed, feed_id, feed)
     if updated_feed is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="RSS Feed not found or no changes made")
-    # Re-schedule monitoring jobs after adding/updating a feed
-    monitor.schedule_feed_monitoring()
+    # Update, pause or resume this feed's job only
+    await async_db.write(monitor.sync_feed_job, feed_id)
     return updated_feed
 
 @app.delete("/rss-feeds/{feed_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_existing_rss_feed(feed_id: int):
-    if not crud.delete_rss_feed(feed_id):
+    if not await async_db.write(crud.delete_rss_feed, feed_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="RSS Feed not found")
-    # Re-schedule monitoring jobs after deleting a feed
-    monitor.schedule_feed_monitoring()
+    seen_entries.forget(feed_id)
+    monitor.unschedule_feed(feed_id)
     return
 
 @app.post("/rss-feeds/{feed_id}/refetch", status_code=status.HTTP_202_ACCEPTED)
 async def refetch_rss_feed_manually(feed_id: int, background_tasks: BackgroundTasks):
-    feed_data = crud.get_rss_feed(feed_id)
+    feed_data = await async_db.read(crud.get_rss_feed, feed_id)
     if not feed_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="RSS Feed not found")
 
     feed_url = feed_data['url']
+    if not await async_db.write(monitor.claim_manual_refetch, feed_id):
+        # Another worker holds the feed's lease; it runs the re-fetch at its next heartbeat
+        logger.info(f"Requested re-fetch of feed ID {feed_id} ({feed_url}) from the worker holding its lease.")
+        return {"message": "Re-fetch requested from the worker that monitors this feed. Check its logs for progress."}
     background_tasks.add_task(monitor.fetch_and_process_feed, feed_id, feed_url)
     logger.info(f"Manually triggered re-fetch for feed ID {feed_id} ({feed_url}).")
     return {"message": "Re-fetch task initiated successfully. Check logs for progress."}
@@ -157,14 +222,34 @@ async def get_results_paginated(
     page: int = Query(1, ge=1),
     page_size: int = Query(12, ge=1, le=100),
     keywords: Optional[str] = Query(None, description="Comma-separated keywords to filter by (OR logic)"),
+    keyword_mode: str = Query("any", pattern="^(any|all)$", description="'any' (OR) or 'all' (AND) for the keyword filter"),
+    feed_ids: Optional[str] = Query(None, description="Comma-separated feed IDs to filter by"),
+    published_after: Optional[datetime] = Query(None, description="Only results published at or after this time"),
+    published_before: Optional[datetime] = Query(None, description="Only results published before this time"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="'offset' (page numbers) or 'cursor' (keyset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous response (implies cursor pagination)"),
 ):
     keyword_filters = [k.strip() for k in keywords.split(',')] if keywords else None
-    
-    results = crud.get_results(
-        page=page,
-        page_size=page_size,
-        keyword_filters=keyword_filters
-    )
+    try:
+        feed_id_filters = [int(f) for f in feed_ids.split(',') if f.strip()] if feed_ids else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="feed_ids must be comma-separated integers")
+
+    try:
+        results = await async_db.read(
+            crud.get_results,
+            page=page,
+            page_size=page_size,
+            keyword_filters=keyword_filters,
+            match_all=keyword_mode == "all",
+            feed_ids=feed_id_filters,
+            published_after=published_after,
+            published_before=published_before,
+            use_cursor=pagination == "cursor" or cursor is not None,
+            cursor_token=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     # Convert datetime objects to ISO format strings for JSON serialization
     for item in results['items']:
         if item.get('published_date'):
@@ -172,4 +257,197 @@ async def get_results_paginated(
         if item.get('processed_at'):
             item['processed_at'] = datetime.fromisoformat(item['processed_at'])
 
-    return results
\ No newline at end of file
+    return results
+
+@app.get("/results/stream")
+async def stream_new_results(
+    request: Request,
+    keywords: Optional[str] = Query(None, description="Comma-separated keywords; only results matching one of them are sent"),
+):
+    """
+    Server-sent events stream of newly stored results ('result' events).
+    An 'overflow' event means some events were dropped for this client and it should reload.
+    """
+    subscription = result_broadcaster.subscribe(keywords.split(',') if keywords else None)
+
+    async def event_stream():
+        reported_drops = 0
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    result = await asyncio.wait_for(subscription.queue.get(), timeout=settings.STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if subscription.dropped != reported_drops:
+                    reported_drops = subscription.dropped
+                    yield f"event: overflow\ndata: {json.dumps({'dropped': reported_drops})}\n\n"
+                yield f"event: result\ndata: {json.dumps(result)}\n\n"
+        finally:
+            result_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/results/export")
+async def export_results(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="'ndjson' (one JSON object per line) or 'csv'"),
+    keywords: Optional[str] = Query(None, description="Comma-separated keywords to filter by (OR logic)"),
+    keyword_mode: str = Query("any", pattern="^(any|all)$", description="'any' (OR) or 'all' (AND) for the keyword filter"),
+    feed_ids: Optional[str] = Query(None, description="Comma-separated feed IDs to filter by"),
+    published_after: Optional[datetime] = Query(None, description="Only results published at or after this time"),
+    published_before: Optional[datetime] = Query(None, description="Only results published before this time"),
+    since_id: int = Query(0, ge=0, description="Only results with a larger id (resume point for incremental exports)"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of rows"),
+):
+    """
+    Streams every matching result in id order, in constant memory.
+
+    X-Export-Max-Id is the largest result id when the export started; rows stored later
+    are left for the next run. Incremental consumers pass the id of the last row they
+    received (or X-Export-Max-Id after a complete export) as since_id next time.
+    """
+    keyword_filters = [k.strip() for k in keywords.split(',')] if keywords else None
+    try:
+        feed_id_filters = [int(f) for f in feed_ids.split(',') if f.strip()] if feed_ids else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="feed_ids must be comma-separated integers")
+
+    upto_id = await async_db.read(crud.get_max_result_id)
+    batches = crud.iter_results_export(
+        upto_id,
+        since_id=since_id,
+        limit=limit,
+        keyword_filters=keyword_filters,
+        match_all=keyword_mode == "all",
+        feed_ids=feed_id_filters,
+        published_after=published_after,
+        published_before=published_before,
+    )
+    media_type, extension = export.FORMATS[format]
+    # Each chunk is read and encoded on the DB threads, holding a read slot only meanwhile
+    return StreamingResponse(
+        async_db.iterate(export.encode(batches, format)),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="results.{extension}"',
+            "X-Export-Max-Id": str(upto_id),
+            "Cache-Control": "no-store",
+        },
+    )
+
+@app.get("/results/search", response_model=PaginatedSearchResults)
+async def search_results(
+    q: str = Query(..., min_length=1, description="Words to search for in titles, summaries and matched keywords"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(12, ge=1, le=100),
+):
+    try:
+        results = await async_db.read(crud.search_results, q, page=page, page_size=page_size)
+    except crud.SearchUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    for item in results['items']:
+        if item.get('published_date'):
+            item['published_date'] = datetime.fromisoformat(item['published_date'])
+        if item.get('processed_at'):
+            item['processed_at'] = datetime.fromisoformat(item['processed_at'])
+    return results
+
+@app.get("/results/{result_id}/sources", response_model=List[ResultSource])
+async def get_result_sources(result_id: int):
+    """Every feed a result was found in, with the link it had there (duplicates are merged into one result)."""
+    sources = await async_db.read(crud.get_result_sources, result_id)
+    if not sources and not await async_db.read(crud.get_results_by_ids, [result_id]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result not found")
+    return sources
+
+#  Admin Endpoints 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Pipeline and API metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/admin/db-pool")
+async def get_db_pool_stats():
+    """SQLite connection pool metrics."""
+    return database.pool.stats()
+
+@app.post("/admin/scheduler/reconcile")
+async def reconcile_scheduler():
+    """Diffs feeds in the DB against scheduled jobs and fixes the differences."""
+    if not monitor.scheduler.running:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Feed monitoring does not run in this process")
+    return await async_db.write(monitor.reconcile_feed_jobs)
+
+@app.get("/admin/workers")
+async def get_feed_workers():
+    """Workers sharing the feeds through leases, the feeds each holds, and active feeds nobody holds."""
+    overview = await async_db.read(crud.get_lease_overview, time.time())
+    manager = monitor.lease_manager
+    overview['this_process'] = {
+        'monitoring': monitor.scheduler.running,
+        'worker_id': manager.worker_id if manager else None,
+        'leader': manager.is_leader() if manager else None,
+    }
+    overview['lease_ttl_seconds'] = settings.LEASE_TTL_SECONDS
+    return overview
+
+@app.get("/admin/backfill")
+async def get_backfill_status():
+    """Recent keyword backfills against the entry archive, newest first."""
+    return {
+        "archive_days": settings.ENTRY_ARCHIVE_DAYS,
+        "archived_entries": await async_db.read(crud.count_archived_entries),
+        "jobs": keyword_backfill.status(),
+    }
+
+@app.get("/admin/retention")
+async def get_retention_status():
+    """Global retention settings, per-feed policies, the last run report and database space."""
+    return {
+        "defaults": {
+            "max_age_days": settings.RETENTION_MAX_AGE_DAYS or None,
+            "max_rows": settings.RETENTION_MAX_ROWS or None,
+            "archive": settings.RETENTION_ARCHIVE,
+            "keep_recent_per_feed": settings.RETENTION_KEEP_RECENT_PER_FEED,
+            "interval_minutes": settings.RETENTION_INTERVAL_MINUTES,
+        },
+        "policies": list((await async_db.read(crud.get_retention_policies)).values()),
+        "last_run": retention.last_report,
+        "database": await async_db.read(database.space_stats),
+    }
+
+@app.put("/admin/retention/feeds/{feed_id}", response_model=RetentionPolicy)
+async def set_feed_retention_policy(feed_id: int, policy: RetentionPolicyUpdate):
+    saved = await async_db.write(crud.set_retention_policy, feed_id, policy)
+    if saved is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="RSS Feed not found")
+    return saved
+
+@app.delete("/admin/retention/feeds/{feed_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_feed_retention_policy(feed_id: int):
+    if not await async_db.write(crud.delete_retention_policy, feed_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Retention policy not found")
+    return
+
+# Plain def: these run for a while, so FastAPI runs them in its thread pool
+@app.post("/admin/retention/run")
+def run_retention_now(maintenance: bool = Query(True, description="Also run incremental VACUUM and ANALYZE")):
+    """Applies the retention policies now and reports what was removed and reclaimed."""
+    report = retention.run_retention(maintenance=maintenance)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A retention or vacuum run is already in progress")
+    return report
+
+@app.post("/admin/db/vacuum")
+def vacuum_database():
+    """Full VACUUM; blocks writers while it runs. Needed once to enable incremental VACUUM on older databases."""
+    report = retention.vacuum_database()
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A retention or vacuum run is already in progress")
+    return report
@@ -0,0 +1,123 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+WORD_RE = re.compile(r'\w+')
+PHRASE_EDGE_RE = re.compile(r'\w.*\w', re.DOTALL)
+
+
+class KeywordMatcher:
+    """
+    Finds every active keyword that occurs as a whole word in a text, in one pass.
+
+    Semantics are identical to re.search(r'\\b' + re.escape(keyword) + r'\\b', text)
+    for each keyword, but the cost no longer grows with the number of keywords:
+
+    * keywords made only of word characters are looked up as tokens of the text
+      (a whole-word match is exactly a \\w+ run equal to the keyword);
+    * multi-word phrases that start and end with a word character are indexed by
+      their first token and only verified where that token occurs;
+    * anything else (leading/trailing punctuation, e.g. "c++") keeps its own
+      regex, since \\b behaves differently next to non-word characters.
+
+    Keywords and text are expected to be lower-cased already.
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        self.source: Tuple[str, ...] = tuple(keywords)
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(self.source)) # De-duplicate, keep order
+        self._order: Dict[str, int] = {kw: i for i, kw in enumerate(self.keywords)}
+        self._tokens = set()
+        self._phrases: Dict[str, List[str]] = {}
+        self._patterns: List[Tuple[str, Pattern]] = []
+
+        for keyword in self.keywords:
+            if not keyword:
+                continue
+            if WORD_RE.fullmatch(keyword):
+                self._tokens.add(keyword)
+            elif PHRASE_EDGE_RE.fullmatch(keyword):
+                first_token = WORD_RE.match(keyword).group()
+                self._phrases.setdefault(first_token, []).append(keyword)
+            else:
+                self._patterns.append((keyword, re.compile(r'\b' + re.escape(keyword) + r'\b')))
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def match(self, text: str) -> List[str]:
+        """Returns the matched keywords in the order they were given."""
+        if not self.keywords:
+            return []
+
+        found = set()
+        if self._phrases:
+            text_length = len(text)
+            for token_match in WORD_RE.finditer(text):
+                token = token_match.group()
+                if token in self._tokens:
+                    found.add(token)
+                candidates = self._phrases.get(token)
+                if candidates:
+                    start = token_match.start()
+                    for phrase in candidates:
+                        end = start + len(phrase)
+                        if text.startswith(phrase, start) and (end == text_length or not _is_word_char(text[end])):
+                            found.add(phrase)
+        elif self._tokens:
+            found.update(self._tokens.intersection(WORD_RE.findall(text)))
+
+        for keyword, pattern in self._patterns:
+            if pattern.search(text):
+                found.add(keyword)
+
+        if len(found) > 1:
+            return sorted(found, key=self._order.__getitem__)
+        return list(found)
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same definition of a word character as \w / \b in the re module
+    return ch.isalnum() or ch == '_'
+
+
+_cache_lock = threading.Lock()
+_cached_matcher: Optional[KeywordMatcher] = None
+_cached_version: Optional[int] = None
+
+
+def get_matcher(keywords: Iterable[str], version: Optional[int] = None) -> KeywordMatcher:
+    """
+    Returns a compiled matcher for the given keywords, reusing the cached one
+    while the keyword set is unchanged.
+
+    When `version` is given (e.g. the keyword cache version) it is used as the cache
+    key and `keywords` is only consumed on a rebuild; otherwise the keywords are compared.
+    """
+    global _cached_matcher, _cached_version
+    if version is not None:
+        if _cached_matcher is not None and _cached_version == version:
+            return _cached_matcher
+        with _cache_lock:
+            if _cached_matcher is None or _cached_version != version:
+                _cached_matcher = KeywordMatcher(tuple(keywords))
+                _cached_version = version
+            return _cached_matcher
+
+    keywords = tuple(keywords)
+    matcher = _cached_matcher
+    if matcher is not None and matcher.source == keywords:
+        return matcher
+    with _cache_lock:
+        if _cached_matcher is None or _cached_matcher.source != keywords:
+            _cached_matcher = KeywordMatcher(keywords)
+            _cached_version = None
+        return _cached_matcher
+
+
+def invalidate_matcher():
+    """Drops the cached matcher; the next get_matcher() call rebuilds it."""
+    global _cached_matcher, _cached_version
+    with _cache_lock:
+        _cached_matcher = None
+        _cached_version = None
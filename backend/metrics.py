@@ -0,0 +1,237 @@
+"""
+In-process metrics in the Prometheus text exposition format (served at /metrics).
+
+Counters and histograms are updated from the scheduler, processing and writer threads,
+so every update takes the metric's lock; an update is a dict lookup and a few
+additions. Gauges for queue depths are callbacks read at scrape time, which costs
+nothing on the hot path.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from backend.config import settings
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; spans fast local calls up to slow feed hosts near the fetch timeout
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Iterable) -> LabelValues:
+        key = tuple(str(value) for value in labels)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        return key
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, labels: Iterable = ()):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, labels: Iterable = ()) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels_text(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Set/inc/dec gauge, or a callback evaluated at scrape time (a number, or {label values: number})."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Optional[Callable[[], Union[float, Dict[LabelValues, float]]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, labels: Iterable = ()):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, labels: Iterable = ()):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, labels: Iterable = ()):
+        self.inc(-amount, labels)
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            try:
+                value = self._callback()
+            except Exception:
+                return [] # A failing callback must not break the whole scrape
+            items = value.items() if isinstance(value, dict) else [((), value)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_labels_text(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, labels: Iterable = ()):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, labels: Iterable = ()):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, labels)
+
+    def count(self, labels: Iterable = ()) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series[0]), series[1]) for key, series in self._series.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels_text(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels_text(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def feed_label(feed_id: int) -> str:
+    """Per-feed label value, or one shared series when METRICS_PER_FEED is off (large fleets)."""
+    return str(feed_id) if settings.METRICS_PER_FEED else "all"
+
+
+#  Pipeline metrics (label "feed" is the feed id; see METRICS_PER_FEED)
+fetch_duration = registry.histogram("rss_fetch_duration_seconds", "Feed download time, including failed attempts.", ["feed"])
+fetches = registry.counter("rss_fetches_total", "Feed fetches by outcome (ok, not_modified, http_error, error).", ["outcome"])
+fetch_bytes = registry.counter("rss_fetch_bytes_total", "Feed body bytes downloaded.", ["feed"])
+entries_parsed = registry.counter("rss_entries_parsed_total", "Entries found in parsed feeds.", ["feed"])
+entries_matched = registry.counter("rss_entries_matched_total", "Entries that matched at least one keyword.", ["feed"])
+results_stored = registry.counter("rss_results_stored_total", "New results written to the database.")
+parse_duration = registry.histogram("rss_parse_duration_seconds", "Parsing time per feed body, without keyword matching.")
+parse_runs = registry.counter("rss_parse_runs_total", "Feed bodies parsed, by parser (stream, feedparser, fallback) and whether parsing stopped early at known entries.", ["parser", "stopped_early"])
+parse_skipped_bytes = registry.counter("rss_parse_skipped_bytes_total", "Feed body bytes never parsed because parsing stopped early.")
+match_duration = registry.histogram("rss_match_duration_seconds", "Keyword matching time per feed body.")
+db_write_duration = registry.histogram("rss_db_write_duration_seconds", "Duration of one group commit of the results writer.")
+db_write_batches = registry.histogram(
+    "rss_db_write_batches", "Feed runs written per group commit.", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+scheduler_lag = registry.histogram(
+    "rss_scheduler_lag_seconds", "How late scheduled jobs ran compared with their due time.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+scheduler_missed = registry.counter("rss_scheduler_missed_runs_total", "Job runs skipped because they were too late.")
+export_rows = registry.counter("rss_export_rows_total", "Rows sent by /results/export.", ["format"])
+retention_rows = registry.counter("rss_retention_rows_total", "Results removed by retention (deleted) and written to archives (archived), and entries pruned from the entry archive (entries_pruned).", ["action"])
+db_reclaimed_bytes = registry.counter("rss_db_reclaimed_bytes_total", "Bytes returned to the file system by VACUUM.")
+backfill_entries = registry.counter("rss_backfill_entries_total", "Archived entries scanned and matched when keywords were added.", ["outcome"])
+lease_changes = registry.counter(
+    "rss_feed_lease_changes_total", "Feed leases acquired, released for rebalancing, or lost (taken over or feed deactivated).", ["action"]
+)
+lease_skipped_runs = registry.counter("rss_feed_lease_skipped_runs_total", "Feed job runs skipped because this worker no longer held the lease.")
+api_duration = registry.histogram("rss_api_request_duration_seconds", "API latency by route and method.", ["route", "method"])
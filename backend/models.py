@@ -1,4 +1,4 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 from typing import Optional, List
 from datetime import datetime
 
@@ -36,10 +36,43 @@ class RSSFeedInDB(RSSFeedBase):
     last_fetched: Optional[datetime] = None
     fetch_interval_minutes: int
     is_active: bool
+    # Fetch health, maintained by the monitor's circuit breaker
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
+    last_status_code: Optional[int] = None
+    last_latency_ms: Optional[float] = None
+    last_success_at: Optional[datetime] = None
+    last_failure_at: Optional[datetime] = None
+    backoff_until: Optional[datetime] = None
+    auto_disabled: bool = False
 
     class Config:
         from_attributes = True
 
+class FeedHealth(BaseModel):
+    feed_id: int
+    status: str # healthy, failing, backing_off, paused or disabled
+    is_active: bool
+    auto_disabled: bool
+    consecutive_failures: int
+    last_error: Optional[str] = None
+    last_status_code: Optional[int] = None
+    last_latency_ms: Optional[float] = None
+    last_success_at: Optional[datetime] = None
+    last_failure_at: Optional[datetime] = None
+    backoff_until: Optional[datetime] = None
+    next_run_time: Optional[datetime] = None
+    failures_until_disabled: Optional[int] = None
+
+class RetentionPolicyUpdate(BaseModel):
+    # Unset fields fall back to the global RETENTION_* settings
+    max_age_days: Optional[float] = Field(None, gt=0)
+    max_rows: Optional[int] = Field(None, ge=1)
+    archive: Optional[bool] = None
+
+class RetentionPolicy(RetentionPolicyUpdate):
+    feed_id: int
+
 class ResultInDB(BaseModel):
     id: int
     feed_id: int
@@ -53,9 +86,27 @@ class ResultInDB(BaseModel):
     class Config:
         from_attributes = True
 
+class ResultSource(BaseModel):
+    feed_id: int
+    link: str
+    added_at: Optional[datetime] = None
+
 class PaginatedResults(BaseModel):
     items: List[ResultInDB]
     total_items: int
     total_pages: int
     current_page: int
+    page_size: int
+    next_cursor: Optional[str] = None # Set in cursor mode when another page follows
+    has_more: bool = False
+
+class SearchResult(ResultInDB):
+    rank: float
+    snippet: Optional[str] = None
+
+class PaginatedSearchResults(BaseModel):
+    items: List[SearchResult]
+    total_items: int
+    total_pages: int
+    current_page: int
     page_size: int
\ No newline at end of file
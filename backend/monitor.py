@@ -1,123 +1,538 @@
-import feedparser
-from datetime import datetime
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Union
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from backend import crud, database
+from backend import crud, database, health, metrics, retention, scheduling
+from backend.config import settings
+from backend.events import result_broadcaster
+from backend.fetcher import FetchResult, fetcher
+from backend.leases import LeaseManager
 from backend.logging_config import setup_logging
+from backend.processing import create_parse_pool, parse_and_match
+from backend.seen import seen_entries
+from backend.writer import result_writer
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
 scheduler = BackgroundScheduler()
+# Fetched feeds are handled here so downloads on the fetcher loop are never blocked;
+# these threads hand bodies to the parse pool and store the matches that come back
+processing_pool = ThreadPoolExecutor(max_workers=settings.PROCESSING_WORKERS, thread_name_prefix="feed-processing")
+# Worker processes for parsing and matching; created at startup (None parses in-process)
+parse_pool: Optional[Executor] = None
+# Fetched feeds waiting for a processing thread
+_processing_backlog = 0
+_backlog_lock = threading.Lock()
+# This process's share of the feeds when they are split between workers (None: all feeds)
+lease_manager: Optional[LeaseManager] = None
+
+
+def _on_job_event(event):
+    if event.code == EVENT_JOB_MISSED:
+        metrics.scheduler_missed.inc()
+        return
+    # Jobs only hand work off, so finish time minus due time is essentially the start delay
+    metrics.scheduler_lag.observe(max(0.0, time.time() - event.scheduled_run_time.timestamp()))
+
+
+scheduler.add_listener(_on_job_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+metrics.registry.gauge(
+    "rss_queue_depth", "Work waiting in each pipeline stage (fetch = downloads in flight).", ["queue"],
+    callback=lambda: {
+        ("fetch",): fetcher.in_flight,
+        ("process",): _processing_backlog,
+        ("writer",): result_writer.queue_depth,
+    },
+)
+metrics.registry.gauge("rss_scheduled_feeds", "Feed jobs in the scheduler.", callback=lambda: sum(1 for job in scheduler.get_jobs() if job.id.startswith("feed_")))
+metrics.registry.gauge("rss_feed_leases", "Feeds whose leases this worker holds (lease mode).", callback=lambda: len(lease_manager.held()) if lease_manager else 0)
+metrics.registry.gauge("rss_stream_subscribers", "Connected /results/stream clients.", callback=lambda: result_broadcaster.subscriber_count)
+metrics.registry.gauge(
+    "rss_db_pool_connections", "SQLite pool connections by state.", ["state"],
+    callback=lambda: {(state,): database.pool.stats()[state] for state in ("in_use", "idle")},
+)
+
+def _conditional_headers(feed_id: int) -> Dict[str, str]:
+    """Builds If-None-Match / If-Modified-Since from the validators stored for a feed."""
+    validators = crud.get_feed_validators(feed_id)
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
 
 def fetch_and_process_feed(feed_id: int, feed_url: str):
     """
     Fetches an RSS feed, parses it, and stores matching entries.
+    Blocks until the feed has been processed (used for manual re-fetches, see claim_manual_refetch).
+    """
+    if lease_manager is not None and not lease_manager.holds(feed_id):
+        logger.info(f"Skipping manual re-fetch of {feed_url}: this worker no longer holds its lease.")
+        return
+    logger.info(f"Fetching RSS feed: {feed_url}")
+    result = fetcher.fetch_blocking(feed_url, _conditional_headers(feed_id))
+    handle_fetch_result(feed_id, feed_url, result)
+
+
+def claim_manual_refetch(feed_id: int) -> bool:
+    """
+    True when a manual re-fetch of the feed may run in this process: it monitors the feeds
+    without leases, or holds the feed's lease. Otherwise the re-fetch is requested from the
+    worker holding the lease (it runs it at its next heartbeat), so it never overlaps with
+    that worker's own runs of the feed.
+    """
+    if lease_manager is None and settings.MONITOR_IN_API:
+        return True
+    if lease_manager is not None and lease_manager.holds(feed_id):
+        return True
+    crud.request_feed_refetch(feed_id, time.time())
+    return False
+
+
+def _on_refetch_requested(feed_ids: List[int]):
+    for feed_id in feed_ids:
+        feed = crud.get_rss_feed(feed_id)
+        if feed is not None:
+            logger.info(f"Manual re-fetch of feed ID {feed_id} requested through another process.")
+            enqueue_feed_fetch(feed_id, feed['url'])
+
+
+def enqueue_feed_fetch(feed_id: int, feed_url: str):
     """
+    Scheduler job: hands the download to the async fetcher and returns immediately.
+    Processing continues on the processing pool once the body has arrived.
+    """
+    if lease_manager is not None and not lease_manager.holds(feed_id):
+        # Lease lapsed (heartbeats failing) or moved; the job is removed at the next heartbeat
+        metrics.lease_skipped_runs.inc()
+        logger.info(f"Skipping feed {feed_url}: this worker does not hold its lease.")
+        return
     logger.info(f"Fetching RSS feed: {feed_url}")
+    future = fetcher.submit(feed_url, _conditional_headers(feed_id))
+    future.add_done_callback(lambda f: _on_fetch_done(feed_id, feed_url, f))
+
+
+def _on_fetch_done(feed_id: int, feed_url: str, future: Future):
+    try:
+        result = future.result()
+    except Exception as e:
+        logger.error(f"Failed to fetch feed {feed_url}: {e}", exc_info=True)
+        return
+    global _processing_backlog
+    with _backlog_lock:
+        _processing_backlog += 1
+    try:
+        processing_pool.submit(_handle_queued_result, feed_id, feed_url, result)
+    except RuntimeError:
+        with _backlog_lock:
+            _processing_backlog -= 1
+        result.discard()
+        logger.warning(f"Processing pool is shut down; dropping fetched feed {feed_url}.")
+
+
+def _handle_queued_result(feed_id: int, feed_url: str, result: FetchResult):
+    global _processing_backlog
+    with _backlog_lock:
+        _processing_backlog -= 1
+    handle_fetch_result(feed_id, feed_url, result)
+
+
+def handle_fetch_result(feed_id: int, feed_url: str, result: FetchResult):
+    """Checks the download outcome and passes the body on to parsing and matching."""
     try:
-        feed = feedparser.parse(feed_url)
-        if feed.bozo:
-            logger.warning(f"Error parsing feed {feed_url}: {feed.bozo_exception}")
-            # Consider adding a mechanism to deactivate problematic feeds after multiple failures
+        latency_ms = round(result.elapsed * 1000, 1)
+        feed_label = metrics.feed_label(feed_id)
+        metrics.fetch_duration.observe(result.elapsed, [feed_label])
+        size = result.size
+        if size:
+            metrics.fetch_bytes.inc(size, [feed_label])
+        if result.error:
+            metrics.fetches.inc(labels=["error"])
+            logger.warning(f"Error fetching feed {feed_url}: {result.error}")
+            record_feed_failure(feed_id, feed_url, result.error, None, latency_ms)
+            return
+        if result.status_code == 304:
+            # Unchanged since the last fetch: nothing to parse, match or store
+            metrics.fetches.inc(labels=["not_modified"])
+            crud.record_fetch_success(feed_id, result.status_code, latency_ms)
+            logger.info(f"Feed {feed_url} not modified since last fetch.")
+            adapt_feed_schedule(feed_id, not_modified=True)
+            return
+        if not result.ok:
+            metrics.fetches.inc(labels=["http_error"])
+            logger.warning(f"Error fetching feed {feed_url}: HTTP {result.status_code}")
+            record_feed_failure(feed_id, feed_url, f"HTTP {result.status_code}", result.status_code, latency_ms)
             return
+        metrics.fetches.inc(labels=["ok"])
+        stats = process_feed_content(feed_id, feed_url, result.body)
+        if stats.get('error'):
+            record_feed_failure(feed_id, feed_url, stats['error'], result.status_code, latency_ms)
+            return
+        crud.update_feed_validators(feed_id, result.headers.get('etag'), result.headers.get('last-modified'))
+        crud.record_fetch_success(feed_id, result.status_code, latency_ms)
+        adapt_feed_schedule(feed_id, entry_timestamps=stats['entry_timestamps'], new_entries=stats['new_entries'])
+    finally:
+        result.discard() # A spooled body is not needed once the run is stored
+
+
+def record_feed_failure(feed_id: int, feed_url: str, error: str, status_code: Optional[int], latency_ms: Optional[float]):
+    """
+    Counts a failed fetch. After FEED_CIRCUIT_FAILURE_THRESHOLD failures in a row the
+    circuit opens: the feed's next run is pushed back with exponential backoff, so a
+    broken feed stops taking fetch slots and timeouts every interval. After
+    FEED_AUTO_DISABLE_FAILURES it is deactivated until re-enabled by hand.
+    """
+    failures = crud.record_fetch_failure(feed_id, error, status_code, latency_ms)
+    delay = health.backoff_seconds(failures)
+    if delay is None:
+        return
+    backoff_until = datetime.now(timezone.utc) + timedelta(seconds=delay)
+    if health.should_disable(failures):
+        crud.open_feed_circuit(feed_id, backoff_until, disable=True)
+        pause_feed(feed_id)
+        logger.warning(f"Feed {feed_url} disabled after {failures} consecutive failures (last error: {error}).")
+        return
+    crud.open_feed_circuit(feed_id, backoff_until)
+    job = scheduler.get_job(_feed_job_id(feed_id))
+    if job is not None and job.next_run_time is not None and job.next_run_time < backoff_until:
+        job.modify(next_run_time=backoff_until)
+    logger.warning(f"Feed {feed_url} failed {failures} times in a row; backing off until {backoff_until:%Y-%m-%d %H:%M:%S} UTC.")
+
+
+def process_feed_content(feed_id: int, feed_url: str, content: Union[bytes, str]) -> Optional[Dict[str, Any]]:
+    """
+    Parses a downloaded feed body (or the file it was spooled to) and stores matching entries.
+    Parsing and matching run on the parse pool; filtering against the seen-entry index
+    and storing happen here. Returns what the run observed (entry timestamps and the
+    number of entries not seen before) for the adaptive scheduler, or a dict with an
+    'error' message when the feed could not be processed.
+    """
+    try:
+        # Lets the parser stop once it reaches entries handled in earlier runs
+        known = seen_entries.stop_hint(feed_id)
+        if parse_pool is not None:
+            parsed = parse_pool.submit(parse_and_match, feed_url, content, known).result()
+        else:
+            parsed = parse_and_match(feed_url, content, known)
+        if parsed['error']:
+            logger.warning(f"Error parsing feed {feed_url}: {parsed['error']}")
+            return {'error': f"Parse error: {parsed['error']}"}
+        feed_label = metrics.feed_label(feed_id)
+        metrics.parse_duration.observe(parsed['parse_seconds'])
+        metrics.entries_parsed.inc(parsed['entries'], [feed_label])
+        stopped_early = parsed['stopped_at'] is not None
+        metrics.parse_runs.inc(labels=[parsed['parser'], "true" if stopped_early else "false"])
+        if parsed['bytes_skipped']:
+            metrics.parse_skipped_bytes.inc(parsed['bytes_skipped'])
+        entry_timestamps = seen_entries.record_timestamps(
+            feed_id, parsed['entry_timestamps'], parsed['stopped_at'], time.time() - scheduling.RATE_WINDOW_SECONDS,
+        )
 
-        active_keywords = [kw['keyword'] for kw in crud.get_all_keywords(active_only=True)]
-        if not active_keywords:
+        keywords_version = parsed['keywords_version']
+        archive = parsed['archive']
+        if not parsed['has_keywords']:
             logger.info(f"No active keywords defined. Skipping processing for {feed_url}.")
-            crud.update_last_fetched_time(feed_id) # Still update fetch time if successfully parsed
-            return
+            if archive:
+                # Kept for the keywords added later; unchanged entries are not rewritten
+                result_writer.submit(feed_id, [], [(link, *archive[link]) for link in archive]).result()
+            return {'entry_timestamps': entry_timestamps, 'new_entries': None}
 
-        lower_active_keywords = [kw.lower() for kw in active_keywords]
-
-        new_entries_count = 0
-        for entry in feed.entries:
-            title = entry.get('title', '')
-            link = entry.get('link', '')
-            summary = entry.get('summary', entry.get('description', ''))
-            published_date_str = entry.get('published') or entry.get('updated')
-            published_date = None
-            if published_date_str:
-                try:
-                    if isinstance(published_date_str, datetime):
-                        published_date = published_date_str
-                    else:
-                        # Attempt to parse common date formats
-                        try:
-                            published_date = datetime.strptime(published_date_str, "%a, %d %b %Y %H:%M:%S %z")
-                        except ValueError:
-                            try:
-                                published_date = datetime.strptime(published_date_str, "%Y-%m-%dT%H:%M:%S%z")
-                            except ValueError:
-                                try:
-                                    published_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                                except:
-                                    logger.warning(f"Could not parse date '{published_date_str}' for entry: {link}")
-                                    published_date = datetime.now() 
-
-                except Exception as e:
-                    logger.warning(f"Error parsing published date '{published_date_str}': {e}. Using current time.")
-                    published_date = datetime.now()
+        metrics.match_duration.observe(parsed['match_seconds'])
+        if parsed['matched']:
+            metrics.entries_matched.inc(len(parsed['matched']), [feed_label])
+
+        # Already stored, or already scanned with the same content and keywords
+        skipped_count = 0
+        archive_rows = []
+        for link, fingerprint in parsed['unmatched']:
+            if seen_entries.is_known(feed_id, link, fingerprint, keywords_version):
+                skipped_count += 1
+            else:
+                seen_entries.mark_unmatched(feed_id, link, fingerprint, keywords_version)
+                if link in archive:
+                    archive_rows.append((link, *archive[link]))
+        matched_entries = []
+        for entry in parsed['matched']:
+            if seen_entries.is_known(feed_id, entry['link'], entry['fingerprint'], keywords_version):
+                skipped_count += 1
             else:
-                published_date = datetime.now() # Default to current time if no date available
+                matched_entries.append(entry)
+                if entry['link'] in archive:
+                    archive_rows.append((entry['link'], *archive[entry['link']]))
+
+        # One transaction per run, shared with other feed runs that finish at the same time
+        new_result_ids = result_writer.submit(feed_id, matched_entries, archive_rows).result()
+        new_entries_count = len(new_result_ids)
+        metrics.results_stored.inc(new_entries_count)
+        if new_result_ids and result_broadcaster.subscriber_count:
+            result_broadcaster.publish(crud.get_results_by_ids(new_result_ids))
+        seen_entries.mark_stored(feed_id, (e['link'] for e in matched_entries))
+        logger.info(
+            f"Finished processing feed {feed_url}. Added {new_entries_count} new entries "
+            f"({skipped_count} already seen entries skipped"
+            f"{', stopped early at known entries' if stopped_early else ''})."
+        )
+        return {'entry_timestamps': entry_timestamps, 'new_entries': parsed['entries'] - skipped_count}
 
-            if not link:
-                logger.warning(f"Skipping entry from {feed_url} due to missing link: {title}")
-                continue
+    except Exception as e:
+        logger.error(f"Failed to fetch or process feed {feed_url}: {e}", exc_info=True)
+        return {'error': f"Processing error: {e}"}
 
-            # Case-insensitive, whole-word matching logic
-            matched_entry_keywords = []
-            content_to_check = f"{title.lower()} {summary.lower()}"
 
-            for keyword in lower_active_keywords:
-                import re
-                if re.search(r'\b' + re.escape(keyword) + r'\b', content_to_check):
-                    matched_entry_keywords.append(keyword)
+def _feed_job_id(feed_id: int) -> str:
+    return f"feed_{feed_id}"
 
 
-            if matched_entry_keywords:
-                if crud.add_result(feed_id, title, link, summary, published_date, matched_entry_keywords):
-                    new_entries_count += 1
+def _feed_trigger(interval_seconds: float) -> IntervalTrigger:
+    return IntervalTrigger(seconds=interval_seconds, jitter=scheduling.jitter_seconds(interval_seconds))
 
-        crud.update_last_fetched_time(feed_id)
-        logger.info(f"Finished processing feed {feed_url}. Added {new_entries_count} new entries.")
 
+def adapt_feed_schedule(
+    feed_id: int,
+    not_modified: bool = False,
+    entry_timestamps: Optional[List[float]] = None,
+    new_entries: Optional[int] = None,
+):
+    """Updates the learned publish rate of a feed and moves its job to the new interval."""
+    if not settings.SCHEDULER_ADAPTIVE:
+        return
+    try:
+        row = crud.get_feed_schedule(feed_id)
+        if row:
+            state = scheduling.FeedSchedule.from_row(row)
+        else:
+            feed = crud.get_rss_feed(feed_id)
+            if not feed:
+                return
+            state = scheduling.initial_schedule(feed)
+        previous_interval = state.interval_seconds
+        scheduling.observe(state, not_modified=not_modified, entry_timestamps=entry_timestamps, new_entries=new_entries)
+        crud.save_feed_schedule(state.to_row())
     except Exception as e:
-        logger.error(f"Failed to fetch or process feed {feed_url}: {e}", exc_info=True)
+        logger.error(f"Failed to update the schedule of feed {feed_id}: {e}", exc_info=True)
+        return
 
+    # Small drifts are not worth rescheduling; the job already runs with jitter
+    if abs(state.interval_seconds - previous_interval) < previous_interval * 0.05:
+        return
+    job = scheduler.get_job(_feed_job_id(feed_id))
+    if job is None:
+        return # Manually re-fetched feed without a job
+    if job.next_run_time is None:
+        job.modify(trigger=_feed_trigger(state.interval_seconds)) # Paused: keep it paused
+    else:
+        # Counted from now, which is right after the fetch that was just observed
+        job.reschedule(trigger=_feed_trigger(state.interval_seconds))
+    logger.info(
+        f"Feed {feed_id} now polled every {state.interval_seconds / 60:.1f} minutes "
+        f"(~{state.items_per_hour or 0:.2f} new entries/hour, {state.not_modified_ratio:.0%} not modified)."
+    )
 
-def schedule_feed_monitoring():
+
+def _feed_interval(feed: Dict[str, Any], learned: Optional[Dict[str, Any]]) -> float:
+    """Polling interval of a feed in seconds: learned by the adaptive scheduler, or configured."""
+    if learned and settings.SCHEDULER_ADAPTIVE:
+        return learned['interval_seconds']
+    return scheduling.initial_schedule(feed).interval_seconds
+
+
+def _feed_job_name(feed: Dict[str, Any]) -> str:
+    return f"Monitor: {feed['name'] or feed['url']}"
+
+
+def schedule_feed(feed: Dict[str, Any], run_now: bool = False, learned: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Adds or updates the job of one active feed without touching any other job.
+    An existing job keeps its next run time; it is only brought forward when the new
+    interval is shorter than the time left, or to now when the URL changed.
+    New jobs run now, or after a random startup delay so bulk scheduling is spread out.
+    A feed held back by its circuit breaker never runs before its backoff ends.
+    In lease mode a new job continues from the feed's last fetch, wherever that ran.
+    Returns what was done: 'added', 'resumed', 'updated' or 'unchanged'.
+    """
+    if learned is None and settings.SCHEDULER_ADAPTIVE:
+        learned = crud.get_feed_schedule(feed['id'])
+    interval = _feed_interval(feed, learned)
+    now = datetime.now(timezone.utc)
+    backoff_until = health.parse_timestamp(feed.get('backoff_until'))
+    job = scheduler.get_job(_feed_job_id(feed['id']))
+
+    if job is None:
+        delay = 0 if run_now else scheduling.startup_delay(interval)
+        first_run_time = now + timedelta(seconds=delay)
+        last_fetch = health.last_fetch_time(feed) if lease_manager is not None and not run_now else None
+        if last_fetch and last_fetch + timedelta(seconds=interval) > first_run_time:
+            first_run_time = last_fetch + timedelta(seconds=interval) # Taken over from another worker
+        if backoff_until and backoff_until > first_run_time:
+            first_run_time = backoff_until
+        scheduler.add_job(
+            enqueue_feed_fetch,
+            _feed_trigger(interval),
+            args=[feed['id'], feed['url']],
+            id=_feed_job_id(feed['id']),
+            name=_feed_job_name(feed),
+            replace_existing=True,
+            next_run_time=first_run_time
+        )
+        logger.info(f"Scheduled feed '{feed['name'] or feed['url']}' (ID: {feed['id']}) to run every {interval / 60:.1f} minutes.")
+        return 'added'
+
+    changes = {}
+    url_changed = list(job.args) != [feed['id'], feed['url']]
+    if url_changed:
+        changes['args'] = [feed['id'], feed['url']]
+    if job.name != _feed_job_name(feed):
+        changes['name'] = _feed_job_name(feed)
+    if abs(job.trigger.interval.total_seconds() - interval) >= 1:
+        changes['trigger'] = _feed_trigger(interval)
+
+    paused = job.next_run_time is None
+    next_run_time = job.next_run_time
+    if paused or url_changed or run_now:
+        next_run_time = now
+    elif next_run_time > now + timedelta(seconds=interval + scheduling.jitter_seconds(interval)):
+        next_run_time = now + timedelta(seconds=interval)
+    if backoff_until and next_run_time < backoff_until:
+        next_run_time = backoff_until
+    if next_run_time != job.next_run_time:
+        changes['next_run_time'] = next_run_time
+
+    if not changes:
+        return 'unchanged'
+    job.modify(**changes)
+    logger.info(f"Updated schedule of feed '{feed['name'] or feed['url']}' (ID: {feed['id']}): every {interval / 60:.1f} minutes, next run {next_run_time}.")
+    return 'resumed' if paused else 'updated'
+
+
+def feed_next_run_time(feed_id: int) -> Optional[datetime]:
+    """When the feed's job runs next; None if it is paused or not scheduled."""
+    job = scheduler.get_job(_feed_job_id(feed_id))
+    return job.next_run_time if job else None
+
+
+def pause_feed(feed_id: int) -> bool:
+    """Pauses the job of a deactivated feed; its trigger is kept for when it is resumed."""
+    job = scheduler.get_job(_feed_job_id(feed_id))
+    if job is None or job.next_run_time is None:
+        return False
+    job.pause()
+    logger.info(f"Paused monitoring of feed ID {feed_id}.")
+    return True
+
+
+def unschedule_feed(feed_id: int) -> bool:
+    """Removes the job of a deleted feed."""
+    try:
+        scheduler.remove_job(_feed_job_id(feed_id))
+    except JobLookupError:
+        return False
+    logger.info(f"Removed monitoring job of feed ID {feed_id}.")
+    return True
+
+
+def sync_feed_job(feed_id: int, run_now: bool = False) -> str:
+    """
+    Brings the job of one feed in line with its row: schedules, pauses or removes it.
+    Feeds of other workers are left to them; they notice the change at their next heartbeat.
+    """
+    if not scheduler.running:
+        return 'unchanged' # Monitoring runs in other processes
+    feed = crud.get_rss_feed(feed_id)
+    if feed is None:
+        return 'removed' if unschedule_feed(feed_id) else 'unchanged'
+    if lease_manager is not None and not lease_manager.assigned(feed_id):
+        return 'removed' if unschedule_feed(feed_id) else 'leased_elsewhere'
+    if not feed['is_active']:
+        return 'paused' if pause_feed(feed_id) else 'unchanged'
+    return schedule_feed(feed, run_now=run_now)
+
+
+def reconcile_feed_jobs() -> Dict[str, int]:
     """
-    Schedules all active RSS feeds for periodic monitoring.
-    This function should be called at startup and whenever feed configurations change.
+    Diffs the feeds in the DB against the scheduled jobs and fixes only the differences:
+    missing jobs are added, jobs of deactivated feeds paused, jobs of deleted feeds removed
+    and changed feeds updated. Jobs that already match keep their next run time.
+    In lease mode only the feeds this worker holds are scheduled.
     """
-    # Remove existing jobs to avoid duplicates if called multiple times
+    summary = {action: 0 for action in ('added', 'resumed', 'updated', 'paused', 'removed', 'unchanged')}
+    feeds = {feed['id']: feed for feed in crud.get_all_rss_feeds()}
+    learned = crud.get_feed_schedules() if settings.SCHEDULER_ADAPTIVE else {}
+    if lease_manager is not None:
+        summary['leased_elsewhere'] = 0
+        for feed_id in [feed_id for feed_id in feeds if not lease_manager.assigned(feed_id)]:
+            if feeds.pop(feed_id)['is_active']:
+                summary['leased_elsewhere'] += 1
+
     for job in scheduler.get_jobs():
-        job.remove()
-    logger.info("Cleared existing scheduler jobs.")
+        if not job.id.startswith("feed_"):
+            continue
+        feed_id = int(job.id[len("feed_"):])
+        if feed_id not in feeds:
+            unschedule_feed(feed_id)
+            summary['removed'] += 1
+    for feed_id, feed in feeds.items():
+        if feed['is_active']:
+            action = schedule_feed(feed, learned=learned.get(feed_id) or {})
+        else:
+            action = 'paused' if pause_feed(feed_id) else 'unchanged'
+        summary[action] += 1
 
-    active_feeds = crud.get_all_rss_feeds(active_only=True)
-    if not active_feeds:
-        logger.info("No active RSS feeds to schedule.")
+    logger.info(f"Reconciled feed jobs with the database: {summary}")
+    return summary
+
+
+def _run_scheduled_retention():
+    # Retention must not run in several workers at once; the oldest live one runs it
+    if lease_manager is not None and not lease_manager.is_leader():
         return
+    retention.run_retention()
+
+
+def _on_lease_change(acquired: Set[int], lost: Set[int], feeds_changed: bool):
+    if not scheduler.running:
+        return # Still starting: the first reconcile schedules the initial share
+    for feed_id in lost:
+        unschedule_feed(feed_id)
+        seen_entries.forget(feed_id)
+    if acquired:
+        seen_entries.warm(acquired)
+    if acquired or feeds_changed:
+        reconcile_feed_jobs()
 
-    for feed in active_feeds:
-        interval = feed.get('fetch_interval_minutes')
-        if not interval or interval <= 0:
-            interval = 5 # Fallback to default if not set or invalid
 
+def schedule_feed_monitoring():
+    """
+    Schedules all active RSS feeds for periodic monitoring and starts the scheduler.
+    Called at startup; later changes to single feeds go through sync_feed_job().
+    """
+    reconcile_feed_jobs()
+    if settings.SCHEDULER_RECONCILE_MINUTES > 0:
+        # Picks up feeds edited directly in the database
         scheduler.add_job(
-            fetch_and_process_feed,
-            IntervalTrigger(minutes=interval),
-            args=[feed['id'], feed['url']],
-            id=f"feed_{feed['id']}",
-            name=f"Monitor: {feed['name'] or feed['url']}",
-            replace_existing=True, # Important for re-scheduling after updates
-            next_run_time=datetime.now() # Run immediately on startup/reschedule
+            reconcile_feed_jobs,
+            IntervalTrigger(minutes=settings.SCHEDULER_RECONCILE_MINUTES),
+            id="reconcile_feed_jobs",
+            name="Reconcile feed jobs",
+            replace_existing=True,
+        )
+
+    if settings.RETENTION_INTERVAL_MINUTES > 0:
+        scheduler.add_job(
+            _run_scheduled_retention,
+            IntervalTrigger(minutes=settings.RETENTION_INTERVAL_MINUTES),
+            id="retention",
+            name="Result retention and database maintenance",
+            replace_existing=True,
         )
-        logger.info(f"Scheduled feed '{feed['name'] or feed['url']}' (ID: {feed['id']}) to run every {interval} minutes.")
-    
+
     if not scheduler.running:
         scheduler.start()
         logger.info("Scheduler started.")
@@ -125,16 +540,52 @@ def schedule_feed_monitoring():
         logger.info("Scheduler already running, jobs updated.")
 
 
-def start_monitor_on_startup():
-    """Initial call to schedule feeds when the application starts."""
-    setup_logging() # Ensure logging is set up before any operations
+def start_monitor(use_leases: bool = settings.FEED_LEASES):
+    """
+    Starts the pipeline and schedules the feeds. With use_leases this process is one of
+    several workers sharing the database and only schedules the feeds it holds leases for.
+    """
     logger.info("Starting RSS monitor service...")
     database.create_tables()
+    global lease_manager, parse_pool
+    if use_leases and lease_manager is None:
+        lease_manager = LeaseManager(on_change=_on_lease_change, on_refetch=_on_refetch_requested)
+        lease_manager.start()
+        seen_entries.warm(lease_manager.held())
+    elif lease_manager is None:
+        seen_entries.warm()
+    if parse_pool is None:
+        parse_pool = create_parse_pool()
+    fetcher.start()
+    result_writer.start()
     schedule_feed_monitoring()
 
 
+def start_monitor_on_startup():
+    """Initial call to schedule feeds when the application starts."""
+    setup_logging() # Ensure logging is set up before any operations
+    if not settings.MONITOR_IN_API:
+        database.create_tables()
+        logger.info("Feed monitoring runs in separate workers (MONITOR_IN_API=false); not scheduling feeds here.")
+        return
+    start_monitor()
+
+
 def stop_monitor_on_shutdown():
     """Shuts down the scheduler cleanly."""
     if scheduler.running:
         scheduler.shutdown()
-        logger.info("Scheduler stopped.")
\ No newline at end of file
+        logger.info("Scheduler stopped.")
+    processing_pool.shutdown(wait=True)
+    global parse_pool
+    if parse_pool is not None:
+        parse_pool.shutdown(wait=True)
+        parse_pool = None
+    fetcher.stop()
+    result_writer.stop()
+    global lease_manager
+    if lease_manager is not None:
+        # Released only now, after the feed runs in progress have been stored
+        lease_manager.stop()
+        lease_manager = None
+    database.pool.close_all()
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+CPU stage of the feed pipeline: parsing and keyword matching of raw feed bodies.
+
+Runs in a pool of worker processes so parsing, date handling and matching scale
+across cores instead of sharing one GIL. Functions here only take and return
+picklable values; the seen-entry index and the results writer stay in the main process.
+"""
+import calendar
+import hashlib
+import io
+import multiprocessing
+import os
+import time
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+import feedparser
+
+from backend import crud, dates, dedup
+from backend.config import settings
+from backend.logging_config import setup_logging
+from backend.matcher import get_matcher
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from backend.feedstream import StreamParser, Unsupported
+except (ImportError, AttributeError) as e:
+    # Built on feedparser internals; a feedparser release that moved them must not stop ingestion
+    logger.warning(f"Streaming feed parser unavailable with this feedparser version, using feedparser only: {e}")
+    StreamParser = None
+
+
+def entry_fingerprint(title: str, summary: str) -> int:
+    """Content fingerprint that is stable across processes (unlike the salted built-in hash())."""
+    digest = hashlib.blake2b(f"{title}\0{summary}".encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def pack_entry(title: str, summary: str) -> bytes:
+    """Compressed title and (capped) summary of an entry, as stored in the entry archive."""
+    summary = (summary or "")[:settings.ENTRY_ARCHIVE_MAX_SUMMARY]
+    return zlib.compress(f"{title or ''}\0{summary}".encode("utf-8", "surrogatepass"), 6)
+
+
+def unpack_entry(blob: bytes) -> Tuple[str, str]:
+    title, _, summary = zlib.decompress(blob).decode("utf-8", "surrogatepass").partition("\0")
+    return title, summary
+
+
+def _open_body(content: Union[bytes, str]) -> BinaryIO:
+    return io.BytesIO(content) if isinstance(content, bytes) else open(content, "rb")
+
+
+def parse_and_match(feed_url: str, content: Union[bytes, str], known: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Parses a raw feed body and matches every entry against the active keywords.
+
+    content is the body, or the path of the file the fetcher spooled a large body to
+    (FETCH_SPOOL_BYTES); only the path then crosses into the parse pool, and the
+    streaming parser reads the file a chunk at a time. The body is read with the
+    streaming parser, which hands over to feedparser for documents it does not
+    handle. known is the early-stop hint of the seen-entry index
+    (links that need no further work and the newest publish time seen before): parsing
+    stops once FEED_EARLY_STOP_ENTRIES entries in a row are known and published before
+    that time, as long as the entries read so far were newest first.
+
+    Returns a dict with
+    * error: parse error message, or None
+    * keywords_version: version of the keyword set that was matched against
+    * has_keywords: False when there were no active keywords to match
+    * entry_timestamps: publish times (epoch seconds) of all dated entries read
+    * matched: entries with at least one keyword and their deduplication keys, ready for the results writer
+    * unmatched: (link, fingerprint) of the remaining entries
+    * archive: link -> (published date, packed entry) of every entry, for the entry archive
+      (empty when ENTRY_ARCHIVE_DAYS is 0)
+    * entries: number of entries read
+    * stopped_at: publish time of the entry parsing stopped at, or None when every entry was read
+    * parser: 'stream', 'feedparser' (FEED_STREAM_PARSE off or the streaming parser unavailable)
+      or 'fallback' (the streaming parser gave up)
+    * bytes_skipped: body bytes never parsed because of an early stop
+    * parse_seconds, match_seconds: time spent parsing and in keyword matching
+    """
+    started = time.perf_counter()
+    keywords_version, active_keywords = crud.get_active_keywords_cached()
+    parsed = None
+    stream_parse = settings.FEED_STREAM_PARSE and StreamParser is not None
+    with _open_body(content) as body:
+        if stream_parse:
+            stream = StreamParser(body)
+            try:
+                parsed = _match_entries(feed_url, stream.entries(), keywords_version, active_keywords, known)
+                parsed['parser'] = 'stream'
+                if parsed['stopped_at'] is not None:
+                    size = len(content) if isinstance(content, bytes) else os.fstat(body.fileno()).st_size
+                    parsed['bytes_skipped'] = size - stream.bytes_parsed
+            except Unsupported as e:
+                logger.debug(f"Streaming parser handed {feed_url} over to feedparser: {e}")
+                body.seek(0)
+        if parsed is None:
+            feed = feedparser.parse(body.read()) # feedparser needs the whole document
+            if feed.bozo:
+                return {'error': str(feed.bozo_exception)}
+            parsed = _match_entries(feed_url, feed.entries, keywords_version, active_keywords, known)
+            parsed['parser'] = 'fallback' if stream_parse else 'feedparser'
+    parsed['parse_seconds'] = time.perf_counter() - started - parsed['match_seconds']
+    return parsed
+
+
+def _match_entries(
+    feed_url: str,
+    entries: Iterable[Any],
+    keywords_version: int,
+    active_keywords: List[Dict[str, Any]],
+    known: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    parsed = {
+        'error': None,
+        'keywords_version': keywords_version,
+        'has_keywords': bool(active_keywords),
+        'entry_timestamps': [],
+        'matched': [],
+        'unmatched': [],
+        'archive': {},
+        'entries': 0,
+        'stopped_at': None,
+        'bytes_skipped': 0,
+        'match_seconds': 0.0,
+    }
+    archive = settings.ENTRY_ARCHIVE_DAYS > 0
+    keyword_matcher = get_matcher((kw['keyword'].lower() for kw in active_keywords), keywords_version) if active_keywords else None
+
+    known_links = None
+    if known and settings.FEED_EARLY_STOP_ENTRIES > 0:
+        known_links, high_water = known['links'], known['high_water']
+    known_run = 0
+    previous_timestamp = None
+    match_seconds = 0.0
+    for entry in entries:
+        title = entry.get('title', '')
+        link = entry.get('link', '')
+        summary = entry.get('summary', entry.get('description', ''))
+        parsed_date = entry.get('published_parsed') or entry.get('updated_parsed')
+        timestamp = calendar.timegm(parsed_date) if parsed_date else None
+        if timestamp is not None:
+            parsed['entry_timestamps'].append(timestamp)
+
+        if known_links is not None:
+            if timestamp is not None and previous_timestamp is not None and timestamp > previous_timestamp:
+                known_links = None # Not newest first: older entries may still follow
+            elif timestamp is not None and timestamp <= high_water and link in known_links and (
+                known_links[link] is None or known_links[link] == keywords_version
+            ):
+                known_run += 1
+                if known_run >= settings.FEED_EARLY_STOP_ENTRIES:
+                    parsed['stopped_at'] = timestamp
+                    break
+            else:
+                known_run = 0
+            if timestamp is not None:
+                previous_timestamp = timestamp
+        parsed['entries'] += 1
+        if not active_keywords and not archive:
+            continue
+
+        if not link:
+            logger.warning(f"Skipping entry from {feed_url} due to missing link: {title}")
+            continue
+
+        published_date = dates.entry_published_date(entry, feed_url)
+        if archive:
+            parsed['archive'][link] = (published_date.isoformat(), pack_entry(title, summary))
+        if not active_keywords:
+            continue
+        fingerprint = entry_fingerprint(title, summary)
+        # Case-insensitive, whole-word matching logic
+        match_started = time.perf_counter()
+        matched_entry_keywords = keyword_matcher.match(f"{title.lower()} {summary.lower()}")
+        match_seconds += time.perf_counter() - match_started
+        if not matched_entry_keywords:
+            parsed['unmatched'].append((link, fingerprint))
+            continue
+
+        parsed['matched'].append({
+            'title': title,
+            'link': link,
+            'summary': summary,
+            'published_date': published_date,
+            'matched_keywords': matched_entry_keywords,
+            'fingerprint': fingerprint,
+            'canonical_url': dedup.canonical_url(link),
+            'content_hash': dedup.content_hash(title, summary),
+        })
+    parsed['match_seconds'] = match_seconds
+    return parsed
+
+
+def _init_worker():
+    setup_logging()
+
+
+def create_parse_pool(workers: int = settings.PARSE_WORKERS) -> Optional[Executor]:
+    """
+    Process pool for parse_and_match(), or None when workers is 0 (parse in the calling thread).
+    Workers are spawned rather than forked: the main process already runs threads and holds
+    open SQLite connections, neither of which survives a fork safely.
+    """
+    if workers <= 0:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
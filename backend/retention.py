@@ -0,0 +1,247 @@
+"""
+Retention of stored results and routine database maintenance.
+
+Results past their policy's limits are removed in small batches, each its own short
+transaction with a pause in between, so the results writer never waits long for the
+lock. Afterwards free pages are returned with incremental VACUUM and planner statistics
+refreshed with ANALYZE.
+
+A policy is the global RETENTION_* settings, overridden field by field per feed:
+* max_age_days: results published longer ago are removed (undated ones by storage time)
+* max_rows: only the newest rows of the feed are kept (RETENTION_MAX_ROWS caps the table)
+* archive: removed rows are first appended to gzip-compressed NDJSON files in ARCHIVE_DIR
+
+The newest RETENTION_KEEP_RECENT_PER_FEED results of every feed are never removed: the
+UNIQUE link of a stored result is what keeps an entry that is still in its feed from
+being stored again after a restart.
+
+The same runs drop entries first seen more than ENTRY_ARCHIVE_DAYS ago from the entry
+archive (see backend/backfill.py).
+"""
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from backend import crud, database, dates, metrics
+from backend.config import settings
+from backend.crud import RESULT_COLUMNS
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PATTERN = "results-*.ndjson.gz"
+
+_run_lock = threading.Lock()
+last_report: Optional[Dict[str, Any]] = None
+
+
+class ResultArchive:
+    """
+    Appends result rows to gzip-compressed NDJSON files, starting a new file once the
+    current one reaches ARCHIVE_MAX_FILE_MB. Every write is its own gzip member, flushed
+    and fsynced before it returns, so rows are only deleted once they are on disk.
+    """
+
+    def __init__(
+        self,
+        directory: str = settings.ARCHIVE_DIR,
+        max_file_mb: float = settings.ARCHIVE_MAX_FILE_MB,
+        keep_files: int = settings.ARCHIVE_KEEP_FILES,
+    ):
+        self.directory = directory
+        self.max_bytes = int(max_file_mb * 1024 * 1024)
+        self.keep_files = keep_files
+        self.paths: List[str] = []
+        self._raw = None
+
+    def files(self) -> List[str]:
+        # Names carry the creation time, so they sort oldest first
+        return sorted(glob.glob(os.path.join(self.directory, ARCHIVE_PATTERN)))
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.files()
+        if existing and os.path.getsize(existing[-1]) < self.max_bytes:
+            path = existing[-1] # Appended gzip members read back as one stream
+        else:
+            stamp = dates.now_utc().strftime("%Y%m%dT%H%M%S%fZ")
+            path = os.path.join(self.directory, ARCHIVE_PATTERN.replace("*", stamp))
+        self._raw = open(path, "ab")
+        if path not in self.paths:
+            self.paths.append(path)
+
+    def write(self, rows: List):
+        if self._raw is None:
+            self._open()
+        lines = "".join(json.dumps(dict(zip(RESULT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows)
+        with gzip.GzipFile(fileobj=self._raw, mode="ab") as member:
+            member.write(lines.encode("utf-8"))
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        if self._raw.tell() >= self.max_bytes:
+            self.close()
+
+    def close(self):
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+            self._prune()
+
+    def _prune(self):
+        if self.keep_files <= 0:
+            return
+        for path in self.files()[:-self.keep_files]:
+            os.remove(path)
+            logger.info(f"Removed old result archive {path}.")
+
+
+def effective_policy(feed_id: int, overrides: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """The global policy with the feed's overrides applied."""
+    override = overrides.get(feed_id) or {}
+    policy = {
+        'max_age_days': settings.RETENTION_MAX_AGE_DAYS or None,
+        'max_rows': None,
+        'archive': settings.RETENTION_ARCHIVE,
+    }
+    for field in policy:
+        if override.get(field) is not None:
+            policy[field] = override[field]
+    policy['archive'] = bool(policy['archive'])
+    return policy
+
+
+def _expire_feed(feed_id: int, policy: Dict[str, Any], table_cap_id: Optional[int], archive: ResultArchive, report: Dict[str, Any]):
+    below_id = None
+    if settings.RETENTION_KEEP_RECENT_PER_FEED > 0:
+        below_id = crud.get_nth_newest_result_id(settings.RETENTION_KEEP_RECENT_PER_FEED - 1, feed_id)
+        if below_id is None:
+            return # No more results than the protected ones
+
+    cutoff = dates.now_utc() - timedelta(days=policy['max_age_days']) if policy['max_age_days'] else None
+    feed_cap_id = crud.get_nth_newest_result_id(policy['max_rows'], feed_id) if policy['max_rows'] else None
+    caps = [cap for cap in (feed_cap_id, table_cap_id) if cap is not None]
+    max_id = max(caps) if caps else None
+    if cutoff is None and max_id is None:
+        return
+
+    batch_size = max(1, settings.RETENTION_BATCH_SIZE)
+    while True:
+        rows = crud.get_expired_results(feed_id, below_id, cutoff, max_id, batch_size)
+        if not rows:
+            return
+        if policy['archive']:
+            archive.write(rows)
+            report['archived'] += len(rows)
+            metrics.retention_rows.inc(len(rows), ["archived"])
+        deleted = crud.delete_results([row['id'] for row in rows])
+        report['deleted'] += deleted
+        metrics.retention_rows.inc(deleted, ["deleted"])
+        if len(rows) < batch_size:
+            return
+        time.sleep(settings.RETENTION_BATCH_PAUSE_SECONDS)
+
+
+def _prune_entry_archive(report: Dict[str, Any]):
+    seen_before = time.time() - settings.ENTRY_ARCHIVE_DAYS * 86400
+    batch_size = max(1, settings.RETENTION_BATCH_SIZE)
+    while True:
+        pruned = crud.prune_entry_archive(seen_before, batch_size)
+        report['archived_entries_pruned'] += pruned
+        metrics.retention_rows.inc(pruned, ["entries_pruned"])
+        if pruned < batch_size:
+            return
+        time.sleep(settings.RETENTION_BATCH_PAUSE_SECONDS)
+
+
+def run_retention(maintenance: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Applies the retention policies to every feed with results, then (with maintenance)
+    runs incremental VACUUM and ANALYZE. Returns the run report, or None when another
+    retention or vacuum run is in progress.
+    """
+    global last_report
+    if not _run_lock.acquire(blocking=False):
+        return None
+    try:
+        started = time.perf_counter()
+        before = database.space_stats()
+        report = {
+            'started_at': dates.now_utc().isoformat(),
+            'feeds_checked': 0,
+            'deleted': 0,
+            'archived': 0,
+            'archive_files': [],
+            'archived_entries_pruned': 0,
+            'reclaimed_bytes': 0,
+            'analyzed': False,
+            'size_bytes_before': before['size_bytes'],
+            'error': None,
+        }
+        archive = ResultArchive()
+        try:
+            overrides = crud.get_retention_policies()
+            table_cap_id = None
+            if settings.RETENTION_MAX_ROWS > 0:
+                table_cap_id = crud.get_nth_newest_result_id(settings.RETENTION_MAX_ROWS)
+            for feed_id in crud.get_result_feed_ids():
+                report['feeds_checked'] += 1
+                _expire_feed(feed_id, effective_policy(feed_id, overrides), table_cap_id, archive, report)
+            _prune_entry_archive(report)
+        except Exception as e:
+            # Stops before deleting rows whose archive write failed
+            logger.error(f"Retention run failed: {e}")
+            report['error'] = str(e)
+        finally:
+            archive.close()
+            report['archive_files'] = [path for path in archive.paths if os.path.exists(path)] # Minus rotated-out files
+
+        if maintenance:
+            try:
+                report['reclaimed_bytes'] = database.incremental_vacuum()
+                metrics.db_reclaimed_bytes.inc(report['reclaimed_bytes'])
+                database.analyze()
+                report['analyzed'] = True
+            except Exception as e:
+                logger.error(f"Database maintenance failed: {e}")
+                report['error'] = report['error'] or str(e)
+
+        after = database.space_stats()
+        report.update(
+            size_bytes=after['size_bytes'],
+            free_bytes=after['free_bytes'],
+            auto_vacuum=after['auto_vacuum'],
+            duration_seconds=round(time.perf_counter() - started, 3),
+        )
+        logger.info(
+            f"Retention removed {report['deleted']} results ({report['archived']} archived) from "
+            f"{report['feeds_checked']} feeds, pruned {report['archived_entries_pruned']} archived entries, "
+            f"reclaimed {report['reclaimed_bytes']} bytes "
+            f"in {report['duration_seconds']}s."
+        )
+        last_report = report
+        return report
+    finally:
+        _run_lock.release()
+
+
+def vacuum_database() -> Optional[Dict[str, Any]]:
+    """Full VACUUM (also enables incremental VACUUM on older databases); None while retention runs."""
+    if not _run_lock.acquire(blocking=False):
+        return None
+    try:
+        started = time.perf_counter()
+        reclaimed = database.vacuum()
+        metrics.db_reclaimed_bytes.inc(reclaimed)
+        logger.info(f"VACUUM reclaimed {reclaimed} bytes.")
+        return {
+            'reclaimed_bytes': reclaimed,
+            'duration_seconds': round(time.perf_counter() - started, 3),
+            'database': database.space_stats(),
+        }
+    finally:
+        _run_lock.release()
@@ -0,0 +1,114 @@
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from backend.config import settings
+
+# Weight of the newest observation in the smoothed publish rate and 304 ratio
+SMOOTHING = 0.3
+# Entry timestamps older than this say nothing about the current publish rate
+RATE_WINDOW_SECONDS = 7 * 24 * 3600
+# Quiet feeds back off by at most this factor per fetch
+MAX_BACKOFF_FACTOR = 2.0
+
+
+@dataclass
+class FeedSchedule:
+    """Learned polling state of one feed, persisted in the feed_schedule table."""
+    feed_id: int
+    interval_seconds: float
+    items_per_hour: Optional[float] = None
+    not_modified_ratio: float = 0.0
+    fetches: int = 0
+    last_observed_at: Optional[float] = None # Epoch seconds
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "FeedSchedule":
+        return cls(**{name: row[name] for name in cls.__dataclass_fields__})
+
+    def to_row(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+
+
+def interval_bounds() -> tuple:
+    return settings.SCHEDULER_MIN_INTERVAL_MINUTES * 60, settings.SCHEDULER_MAX_INTERVAL_MINUTES * 60
+
+
+def clamp_interval(seconds: float) -> float:
+    low, high = interval_bounds()
+    return min(high, max(low, seconds))
+
+
+def initial_schedule(feed: Dict[str, Any]) -> FeedSchedule:
+    """Starts a feed from its configured interval until enough has been observed."""
+    minutes = feed.get('fetch_interval_minutes')
+    if not minutes or minutes <= 0:
+        minutes = settings.DEFAULT_FETCH_INTERVAL_MINUTES
+    return FeedSchedule(feed_id=feed['id'], interval_seconds=minutes * 60)
+
+
+def rate_from_timestamps(entry_timestamps: List[float], now: float) -> Optional[float]:
+    """
+    Entries per hour published over the rate window, measured up to now so a feed
+    that went quiet after a burst does not keep looking busy. None without timestamps.
+    """
+    if not entry_timestamps:
+        return None
+    recent = [ts for ts in entry_timestamps if now - RATE_WINDOW_SECONDS <= ts <= now]
+    if not recent:
+        return 0.0
+    span_hours = max(1.0, (now - min(recent)) / 3600)
+    return len(recent) / span_hours
+
+
+def observe(
+    state: FeedSchedule,
+    not_modified: bool = False,
+    entry_timestamps: Optional[List[float]] = None,
+    new_entries: Optional[int] = None,
+    now: Optional[float] = None,
+) -> FeedSchedule:
+    """
+    Folds the outcome of one successful fetch into the feed's state and picks the next
+    interval: roughly the expected time until the next new entry, clamped to the
+    configured bounds. A 304 counts as an observation of zero new entries.
+    """
+    now = time.time() if now is None else now
+    if not_modified:
+        sample = 0.0
+    else:
+        sample = rate_from_timestamps(entry_timestamps or [], now)
+        if sample is None and new_entries is not None and state.last_observed_at and state.fetches:
+            # Undated feeds: new entries since the previous fetch
+            sample = new_entries / max(1 / 60, (now - state.last_observed_at) / 3600)
+
+    if sample is not None:
+        if state.items_per_hour is None:
+            state.items_per_hour = sample
+        else:
+            state.items_per_hour += SMOOTHING * (sample - state.items_per_hour)
+    state.not_modified_ratio += SMOOTHING * ((1.0 if not_modified else 0.0) - state.not_modified_ratio)
+    state.fetches += 1
+    state.last_observed_at = now
+
+    if state.items_per_hour is None:
+        return state # Nothing learned yet; keep the configured interval
+    if state.items_per_hour > 0:
+        target = 3600 / state.items_per_hour
+    else:
+        target = state.interval_seconds * MAX_BACKOFF_FACTOR
+    # Speed up at once when a feed gets busy, but back off gradually
+    target = min(target, state.interval_seconds * MAX_BACKOFF_FACTOR)
+    state.interval_seconds = clamp_interval(target)
+    return state
+
+
+def jitter_seconds(interval_seconds: float) -> float:
+    """Random spread applied to every run so feeds with equal intervals drift apart."""
+    return interval_seconds * settings.SCHEDULER_JITTER_FRACTION
+
+
+def startup_delay(interval_seconds: float) -> float:
+    """Delay of a feed's first run, spread so feeds do not all fire at once."""
+    return random.uniform(0, min(interval_seconds, settings.SCHEDULER_STARTUP_SPREAD_SECONDS))
@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from backend import crud
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+_STORED = object()
+
+
+class SeenEntries:
+    """
+    Per-feed, bounded LRU of entries that need no further work.
+
+    Entries are keyed by link. A link is either
+    * stored: it is already in the results table, so it can be skipped outright
+      (the UNIQUE link constraint would ignore it anyway), or
+    * unmatched: it was scanned and matched nothing. It is only skipped while both its
+      content fingerprint and the keyword version (the keywords data version) are
+      unchanged, so edited entries and new keywords are still picked up.
+
+    It also keeps the publish times seen in each feed's last run and the newest of them
+    (the feed's high-water mark), which let parse_and_match() stop at known entries.
+    """
+
+    def __init__(self, capacity_per_feed: int = settings.SEEN_ENTRIES_PER_FEED):
+        self.capacity_per_feed = capacity_per_feed
+        self._feeds: Dict[int, OrderedDict] = {}
+        self._timestamps: Dict[int, List[float]] = {}
+        self._high_water: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, feed_id: int, link: str, value):
+        entries = self._feeds.get(feed_id)
+        if entries is None:
+            entries = self._feeds[feed_id] = OrderedDict()
+        entries[link] = value
+        entries.move_to_end(link)
+        if len(entries) > self.capacity_per_feed:
+            entries.popitem(last=False)
+
+    def is_known(self, feed_id: int, link: str, fingerprint: Hashable, keywords_version: int) -> bool:
+        with self._lock:
+            entries = self._feeds.get(feed_id)
+            if not entries:
+                return False
+            value = entries.get(link)
+            if value is None:
+                return False
+            if value is _STORED or value == (fingerprint, keywords_version):
+                entries.move_to_end(link)
+                return True
+            return False
+
+    def mark_stored(self, feed_id: int, links: Iterable[str]):
+        with self._lock:
+            for link in links:
+                self._remember(feed_id, link, _STORED)
+
+    def mark_unmatched(self, feed_id: int, link: str, fingerprint: Hashable, keywords_version: int):
+        with self._lock:
+            self._remember(feed_id, link, (fingerprint, keywords_version))
+
+    def forget(self, feed_id: int):
+        with self._lock:
+            self._feeds.pop(feed_id, None)
+            self._timestamps.pop(feed_id, None)
+            self._high_water.pop(feed_id, None)
+
+    def stop_hint(self, feed_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Early-stop hint for parse_and_match(): the high-water mark and every known link,
+        mapped to None when it is stored or to the keyword version it was scanned with.
+        None until a run of the feed has been recorded.
+        """
+        with self._lock:
+            high_water = self._high_water.get(feed_id)
+            entries = self._feeds.get(feed_id)
+            if high_water is None or not entries:
+                return None
+            links = {link: None if value is _STORED else value[1] for link, value in entries.items()}
+        return {'high_water': high_water, 'links': links}
+
+    def record_timestamps(
+        self, feed_id: int, entry_timestamps: List[float], stopped_at: Optional[float] = None, keep_after: float = 0.0,
+    ) -> List[float]:
+        """
+        Remembers the publish times read in a run and returns them completed with the ones
+        of the entries an early stop left unread (taken from the previous run). Only times
+        after keep_after are kept for the next run.
+        """
+        with self._lock:
+            if stopped_at is not None:
+                entry_timestamps = entry_timestamps + [
+                    ts for ts in self._timestamps.get(feed_id, ()) if ts < stopped_at
+                ]
+            if entry_timestamps:
+                self._high_water[feed_id] = max(self._high_water.get(feed_id, 0.0), max(entry_timestamps))
+            self._timestamps[feed_id] = [ts for ts in entry_timestamps if ts > keep_after]
+        return entry_timestamps
+
+    def warm(self, feed_ids: Optional[Iterable[int]] = None):
+        """Loads the most recently stored links of every feed (or of the given ones) from the results table."""
+        if feed_ids is None:
+            chunks = [None]
+        else:
+            feed_ids = sorted(feed_ids)
+            chunks = [feed_ids[i:i + 500] for i in range(0, len(feed_ids), 500)]
+        count = 0
+        for chunk in chunks:
+            for feed_id, link in crud.get_recent_result_links(self.capacity_per_feed, chunk):
+                with self._lock:
+                    self._remember(feed_id, link, _STORED)
+                count += 1
+        logger.info(f"Warmed seen-entry index with {count} stored links.")
+
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._feeds.values())
+
+
+seen_entries = SeenEntries()
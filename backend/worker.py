@@ -0,0 +1,36 @@
+"""
+Standalone feed worker: runs feed monitoring without the API.
+
+    python -m backend.worker
+
+Any number of workers, on this machine or on others sharing the database, split the
+feeds between them through leases (see backend/leases.py). Run the API with
+MONITOR_IN_API=false next to them, or with FEED_LEASES=true to let the API processes
+take a share as well.
+"""
+import signal
+import threading
+
+from backend import monitor
+from backend.logging_config import setup_logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    setup_logging()
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    monitor.start_monitor(use_leases=True)
+    logger.info(f"Feed worker {monitor.lease_manager.worker_id} running; stop with Ctrl+C or SIGTERM.")
+    while not stop.wait(1):
+        pass
+    logger.info("Stopping feed worker...")
+    monitor.stop_monitor_on_shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend import crud, metrics
+from backend.config import settings
+from backend.database import get_db_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """
+    Single writer thread for matched results.
+
+    Feed runs submit the matches of one run as a batch, together with the entries to
+    keep in the entry archive, and get a Future resolving to the ids of the new rows.
+    Whatever batches are queued when the writer wakes up are written together in one
+    transaction, so concurrent feed runs share a single commit (and fsync) instead of
+    each paying for their own.
+    """
+
+    def __init__(self, max_batches_per_commit: int = settings.WRITER_MAX_BATCHES_PER_COMMIT):
+        self.max_batches_per_commit = max_batches_per_commit
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.batches_written = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, feed_id: int, entries: List[Dict[str, Any]], archive: Optional[List[Tuple[str, str, bytes]]] = None) -> Future:
+        future: Future = Future()
+        if not entries and not archive:
+            future.set_result([])
+            return future
+        if not self.running:
+            self.start()
+        self._queue.put((feed_id, entries, archive, future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            group = [item]
+            stopping = False
+            while len(group) < self.max_batches_per_commit:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                group.append(item)
+            self._write_group(group)
+            if stopping:
+                return
+
+    def _write_group(self, group: List[Tuple[int, List[Dict[str, Any]], Optional[List], Future]]):
+        conn = get_db_connection()
+        try:
+            try:
+                started = time.perf_counter()
+                added = []
+                for feed_id, entries, archive, _ in group:
+                    added.append(crud.insert_results(conn, feed_id, entries))
+                    crud.archive_entries(conn, feed_id, archive)
+                conn.commit()
+                metrics.db_write_duration.observe(time.perf_counter() - started)
+                metrics.db_write_batches.observe(len(group))
+                self.commits += 1
+                self.batches_written += len(group)
+                for (_, _, _, future), new_ids in zip(group, added):
+                    future.set_result(new_ids)
+                return
+            except Exception as e:
+                conn.rollback()
+                if len(group) == 1:
+                    logger.error(f"Error writing results for feed {group[0][0]}: {e}")
+                    group[0][3].set_exception(e)
+                    return
+                logger.warning(f"Group commit of {len(group)} batches failed ({e}); retrying batches one by one.")
+        finally:
+            conn.close()
+        for batch in group:
+            self._write_group([batch])
+
+
+result_writer = GroupCommitWriter()
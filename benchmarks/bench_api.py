@@ -0,0 +1,213 @@
+"""
+API latency under concurrent mixed load, with database calls on the event loop
+(API_DB_THREADS=0, the previous behaviour) versus offloaded to the DB threads.
+
+A database is preloaded with results, then for each mode a uvicorn server is started
+on it and concurrent clients request a weighted mix of endpoints for a fixed time.
+"results_filtered" uses a different date filter on every request, so its COUNT is
+never cached: the slow query that used to stall the whole worker. "ping" does no
+database work at all and shows how long requests wait for the event loop.
+
+    python -m benchmarks.bench_api --results 100000 --clients 32 --seconds 20
+    python -m benchmarks.bench_api --mode after --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+
+from benchmarks.feed_server import WORDS
+
+MODES = {
+    "before": {"API_DB_THREADS": "0"},
+    "after": {},
+}
+
+# (name, weight)
+ENDPOINTS = [
+    ("results", 30),
+    ("results_filtered", 10),
+    ("search", 15),
+    ("keywords", 10),
+    ("feeds", 10),
+    ("index", 10),
+    ("ping", 15),
+]
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def preload(results: int, feeds: int):
+    from backend import crud, database
+    from backend.models import KeywordCreate, RSSFeedCreate, RSSFeedUpdate
+
+    database.create_tables()
+    for word in WORDS:
+        crud.create_keyword(KeywordCreate(keyword=word))
+    feed_ids = []
+    for i in range(feeds):
+        feed = crud.create_rss_feed(RSSFeedCreate(url=f"http://bench.invalid/feed-{i}.xml"))
+        # Inactive, so the server under test does not fetch anything
+        crud.update_rss_feed(feed['id'], RSSFeedUpdate(url=feed['url'], is_active=False))
+        feed_ids.append(feed['id'])
+    rng = random.Random(7)
+    for start in range(0, results, 1000):
+        for feed_id in feed_ids:
+            entries = []
+            for i in range(start, min(results, start + 1000), len(feed_ids)):
+                keywords = rng.sample(WORDS, 2)
+                entries.append({
+                    'title': f"Story {i} about {' and '.join(keywords)}",
+                    'link': f"http://bench.invalid/{feed_id}/{i}",
+                    'summary': " ".join(rng.choice(WORDS) for _ in range(60)),
+                    'published_date': START_DATE + timedelta(minutes=i),
+                    'matched_keywords': keywords,
+                })
+            crud.add_results_bulk(feed_id, entries)
+    return feed_ids
+
+
+def endpoint_url(name: str, rng: random.Random, feed_ids, results: int) -> str:
+    if name == "results":
+        return f"/results/?page={rng.randint(1, 50)}"
+    if name == "results_filtered":
+        after = START_DATE + timedelta(minutes=rng.randint(0, results))
+        return f"/results/?keywords={rng.choice(WORDS)}&published_after={after.isoformat().replace('+', '%2B')}"
+    if name == "search":
+        return f"/results/search?q={rng.choice(WORDS)}"
+    if name == "keywords":
+        return "/keywords/"
+    if name == "feeds":
+        return "/rss-feeds/"
+    if name == "index":
+        return "/"
+    return "/admin/db-pool"
+
+
+async def load(base_url: str, clients: int, seconds: float, feed_ids, results: int):
+    names = [name for name, _ in ENDPOINTS]
+    weights = [weight for _, weight in ENDPOINTS]
+    latencies = {name: [] for name in names}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                async with session.get(base_url + endpoint_url(name, rng, feed_ids, results)) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies[name].append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies, errors
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_mode(mode: str, env: dict, args, feed_ids):
+    port = free_port()
+    server_env = dict(os.environ, **env, **MODES[mode])
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=server_env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                    break
+            except OSError:
+                time.sleep(0.1)
+        asyncio.run(load(base_url, 4, 2, feed_ids, args.results)) # Warm-up
+        started = time.perf_counter()
+        latencies, errors = asyncio.run(load(base_url, args.clients, args.seconds, feed_ids, args.results))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = {"mode": mode, "requests": sum(map(len, latencies.values())), "errors": errors, "endpoints": {}}
+    report["requests_per_second"] = round(report["requests"] / elapsed, 1)
+    for name, values in latencies.items():
+        report["endpoints"][name] = {
+            "count": len(values),
+            **{f"p{pct}_ms": round(percentile(values, pct) * 1000, 2) for pct in (50, 95, 99)},
+            "max_ms": round(max(values, default=0) * 1000, 2),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\n[{report['mode']}] {report['requests']} requests, {report['requests_per_second']} req/s, {report['errors']} errors")
+    print(f"  {'endpoint':18s} {'count':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}")
+    for name, row in report["endpoints"].items():
+        print(f"  {name:18s} {row['count']:7d} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f} {row['max_ms']:9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["both", *MODES], default="both")
+    parser.add_argument("--results", type=int, default=100000, help="Results preloaded into the database")
+    parser.add_argument("--feeds", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "DATABASE_URL": os.path.join(tmp, "bench.sqlite3"),
+            "LOG_FILE_PATH": os.devnull,
+            "LOG_LEVEL": "WARNING",
+            "PARSE_WORKERS": "0",
+            "RETENTION_INTERVAL_MINUTES": "0",
+        }
+        os.environ.update(env)
+        started = time.perf_counter()
+        feed_ids = preload(args.results, args.feeds)
+        if not args.json:
+            print(f"preloaded {args.results} results in {time.perf_counter() - started:.1f}s; "
+                  f"{args.clients} clients for {args.seconds:.0f}s per mode")
+
+        modes = list(MODES) if args.mode == "both" else [args.mode]
+        reports = [run_mode(mode, env, args, feed_ids) for mode in modes]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Entry date normalization: the old strptime chain versus backend.dates.
+
+The corpus is publish dates in the formats real feeds use (RFC 822 with numeric
+offsets, zone names and GMT, ISO 8601 with Z, offsets and fractions, and a few
+non-standard ones feedparser cannot read). It is parsed once by feedparser, then
+each entry's date is normalized many times.
+
+    python -m benchmarks.bench_dates --rounds 2000
+"""
+import argparse
+import time
+from datetime import datetime
+
+import feedparser
+
+from backend import dates
+
+DATE_CORPUS = [
+    "Mon, 06 Sep 2021 16:45:00 +0000",
+    "Mon, 06 Sep 2021 16:45:00 +0200",
+    "Tue, 07 Sep 2021 09:05:12 -0400",
+    "Wed, 08 Sep 2021 23:59:59 GMT",
+    "Thu, 09 Sep 2021 08:00:00 EST",
+    "Fri, 10 Sep 2021 12:30:00 PDT",
+    "Sat, 11 Sep 2021 07:15:00 UT",
+    "11 Sep 2021 07:15:00 +0100",
+    "Sun, 12 Sep 2021 18:20 +0300",
+    "2021-09-13T10:00:00Z",
+    "2021-09-13T10:00:00+05:30",
+    "2021-09-13T10:00:00.123456+00:00",
+    "2021-09-13T10:00:00.123Z",
+    "2021-09-13T10:00:00-07:00",
+    "2021-09-13 10:00:00",
+    "2021-09-13",
+    "Mon, 13 Sep 2021 10:00:00 +0000 (UTC)",
+    "13.09.2021 10:00",
+    "2021/09/13 10:00:00",
+    "Monday, September 13, 2021 - 10:00",
+]
+
+
+def legacy_parse(entry, link):
+    """The date chain formerly inlined in the monitor."""
+    published_date_str = entry.get('published') or entry.get('updated')
+    published_date = None
+    if published_date_str:
+        try:
+            try:
+                published_date = datetime.strptime(published_date_str, "%a, %d %b %Y %H:%M:%S %z")
+            except ValueError:
+                try:
+                    published_date = datetime.strptime(published_date_str, "%Y-%m-%dT%H:%M:%S%z")
+                except ValueError:
+                    try:
+                        published_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
+                    except:
+                        published_date = datetime.now()
+        except Exception:
+            published_date = datetime.now()
+    else:
+        published_date = datetime.now()
+    return published_date
+
+
+def build_entries():
+    items = "".join(
+        f"<item><title>t{i}</title><link>http://example.invalid/{i}</link><pubDate>{value}</pubDate></item>"
+        for i, value in enumerate(DATE_CORPUS)
+    )
+    feed = feedparser.parse(f"<rss version='2.0'><channel><title>dates</title>{items}</channel></rss>")
+    return feed.entries
+
+
+def timed(fn, entries, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for entry in entries:
+            fn(entry)
+    return (time.perf_counter() - started) / (rounds * len(entries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    entries = build_entries()
+    unparsed = [e for e in entries if not e.get('published_parsed')]
+    print(f"{len(entries)} date formats, {len(unparsed)} not parsed by feedparser")
+    for value, entry in zip(DATE_CORPUS, entries):
+        print(f"  {value:42s} -> {dates.entry_published_date(entry, 'corpus').isoformat()}")
+
+    # Entries whose dates feedparser could not read, as one feed would repeat them
+    same_format = [{"published": "13.09.2021 10:%02d" % minute} for minute in range(60)]
+    no_memo = lambda e: dates.parse_date_string(e["published"])
+
+    cases = [
+        ("legacy strptime chain (all formats)", lambda e: legacy_parse(e, e.get('link')), entries),
+        ("dates.entry_published_date (all formats)", lambda e: dates.entry_published_date(e, "corpus"), entries),
+        ("fallback formats, no memo", no_memo, same_format),
+        ("fallback formats, per-feed memo", lambda e: dates.entry_published_date(e, "dotted-feed"), same_format),
+    ]
+    for name, fn, sample in cases:
+        print(f"{name:44s} {timed(fn, sample, args.rounds):8.2f} us/entry")
+
+
+if __name__ == "__main__":
+    main()
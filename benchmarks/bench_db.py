@@ -0,0 +1,116 @@
+"""
+Concurrent /results/ reads during heavy ingestion.
+
+Writer threads insert results through crud.add_result while reader threads page
+through crud.get_results (what the /results/ endpoint runs). Each configuration
+runs in its own process because database settings are read at import time.
+
+    python -m benchmarks.bench_db                   # before (no pool, rollback journal) vs after
+    python -m benchmarks.bench_db --mode after      # a single configuration
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+MODES = {
+    "before": {"DB_POOL_SIZE": "0", "DB_JOURNAL_MODE": "DELETE", "DB_SYNCHRONOUS": "FULL"},
+    "after": {},
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_workload(seconds: float, writers: int, readers: int, preload: int):
+    from backend import crud, database
+    from backend.models import RSSFeedCreate
+
+    database.create_tables()
+    feed = crud.create_rss_feed(RSSFeedCreate(url="http://bench.invalid/feed.xml"))
+    for i in range(preload):
+        crud.add_result(feed["id"], f"Preloaded {i}", f"http://bench.invalid/pre/{i}", "summary " * 20, None, ["ai"])
+
+    stop = threading.Event()
+    written = [0] * writers
+    read_latencies = [[] for _ in range(readers)]
+    errors = []
+
+    def writer(n):
+        i = 0
+        while not stop.is_set():
+            try:
+                if crud.add_result(feed["id"], f"Story {n}-{i}", f"http://bench.invalid/{n}/{i}", "summary " * 20, None, ["ai", "data"]):
+                    written[n] += 1
+            except Exception as e:
+                errors.append(str(e))
+            i += 1
+
+    def reader(n):
+        page = 1
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                crud.get_results(page=page, page_size=12, keyword_filters=["ai"])
+                read_latencies[n].append((time.perf_counter() - started) * 1e3)
+            except Exception as e:
+                errors.append(str(e))
+            page = page % 20 + 1
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies = [v for per_thread in read_latencies for v in per_thread]
+    return {
+        "writes_per_sec": round(sum(written) / seconds, 1),
+        "reads_per_sec": round(len(latencies) / seconds, 1),
+        "read_p50_ms": round(percentile(latencies, 50), 2),
+        "read_p99_ms": round(percentile(latencies, 99), 2),
+        "errors": len(errors),
+        "pool": database.pool.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=sorted(MODES), default=None)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--preload", type=int, default=5000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_workload(args.seconds, args.writers, args.readers, args.preload)))
+        return
+
+    for mode in [args.mode] if args.mode else ["before", "after"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=os.path.join(tmp, "bench.sqlite3"), LOG_FILE_PATH=os.path.join(tmp, "bench.log"))
+            env.update(MODES[mode])
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_db", "--child", "--seconds", str(args.seconds),
+                 "--writers", str(args.writers), "--readers", str(args.readers), "--preload", str(args.preload)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:7s} {json.dumps(result)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+End-to-end load test of the monitor against a synthetic feed farm, with a JSON report
+that later runs can be compared with.
+
+* ingest - every feed of the farm is fetched in rounds, as fast as the pipeline goes,
+  through the stages the scheduler hands feeds to: async fetcher, processing threads,
+  parse pool, results writer. The first round stores everything; later rounds see what
+  the farm published since (--updates-per-minute), 304s and injected failures.
+* api - a uvicorn server runs on the same database while concurrent clients request
+  /results/ (pages, keyword and date filters) and /results/search. It runs twice: idle
+  (MONITOR_IN_API=false) and while its monitor polls the farm every minute.
+
+Ingestion, parsing, matching and DB write figures come from the pipeline's metrics.
+The report's "summary" holds the headline numbers that --compare checks:
+
+    python -m benchmarks.bench_e2e --feeds 500 --output before.json
+    python -m benchmarks.bench_e2e --feeds 500 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import wait
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import aiohttp
+
+from benchmarks.bench_api import free_port, percentile
+from benchmarks.feed_server import WORDS, FeedServer, build_feed, generate_keywords
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, weight)
+ENDPOINTS = [
+    ("results", 40),
+    ("results_keyword", 20),
+    ("results_since", 20),
+    ("search", 20),
+]
+
+# Summary keys and whether a higher value is better
+SUMMARY = {
+    "ingest_cold_feeds_per_second": True,
+    "ingest_cold_entries_per_second": True,
+    "ingest_steady_feeds_per_second": True,
+    "parse_ms_per_feed": False,
+    "match_ms_per_feed": False,
+    "db_results_per_second": True,
+    "db_ms_per_commit": False,
+    "api_idle_p95_ms": False,
+    "api_ingesting_p95_ms": False,
+    "api_ingesting_requests_per_second": True,
+}
+
+# Entry dates of the synthetic feeds (see feed_server.build_feed)
+FIRST_PUBLISHED = datetime.fromtimestamp(1_700_000_000, timezone.utc)
+
+
+def scrape(text: str) -> dict:
+    """Prometheus text format -> {series: value}."""
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            values[series] = float(value)
+    return values
+
+
+def total(values: dict, name: str, label: str = "") -> float:
+    """Sum of a metric over its label sets, or only those that contain `label`."""
+    return sum(
+        value for series, value in values.items()
+        if (series == name or series.startswith(name + "{")) and label in series
+    )
+
+
+def pipeline_stats(before: dict, after: dict, elapsed: float, feeds: Optional[int] = None) -> dict:
+    def delta(name, label=""):
+        return total(after, name, label) - total(before, name, label)
+
+    parses = delta("rss_parse_duration_seconds_count")
+    matches = delta("rss_match_duration_seconds_count")
+    commits = delta("rss_db_write_duration_seconds_count")
+    entries = delta("rss_entries_parsed_total")
+    results = delta("rss_results_stored_total")
+    stats = {"seconds": round(elapsed, 3)}
+    if feeds is not None:
+        stats.update(feeds=feeds, feeds_per_second=round(feeds / elapsed, 1))
+    stats.update({
+        "fetches": {
+            outcome: int(delta("rss_fetches_total", f'outcome="{outcome}"'))
+            for outcome in ("ok", "not_modified", "http_error", "error")
+        },
+        "entries_parsed": int(entries),
+        "entries_per_second": round(entries / elapsed, 1),
+        "results_stored": int(results),
+        "results_per_second": round(results / elapsed, 1),
+        "parse_ms_per_feed": round(delta("rss_parse_duration_seconds_sum") / parses * 1000, 3) if parses else None,
+        "match_ms_per_feed": round(delta("rss_match_duration_seconds_sum") / matches * 1000, 3) if matches else None,
+        "db_commits": int(commits),
+        "db_ms_per_commit": round(delta("rss_db_write_duration_seconds_sum") / commits * 1000, 3) if commits else None,
+    })
+    return stats
+
+
+def setup_database(server: FeedServer, feeds: int, keywords: int):
+    from backend import crud, database
+    from backend.models import KeywordCreate, RSSFeedCreate
+
+    database.create_tables()
+    for keyword in generate_keywords(keywords):
+        crud.create_keyword(KeywordCreate(keyword=keyword))
+    for feed_id in range(feeds):
+        server.get_body(feed_id) # Rendered now rather than during the first round
+    return [
+        crud.create_rss_feed(RSSFeedCreate(url=server.feed_url(i), fetch_interval_minutes=1))
+        for i in range(feeds)
+    ]
+
+
+def fetch_round(feeds):
+    """Fetches and processes every feed once; returns when all results are written."""
+    from backend import monitor
+    from backend.fetcher import fetcher
+
+    processed = []
+    arrived = threading.Semaphore(0)
+
+    def on_fetched(feed, future):
+        processed.append(monitor.processing_pool.submit(monitor.handle_fetch_result, feed['id'], feed['url'], future.result()))
+        arrived.release()
+
+    for feed in feeds:
+        future = fetcher.submit(feed['url'], monitor._conditional_headers(feed['id']))
+        future.add_done_callback(lambda f, feed=feed: on_fetched(feed, f))
+    for _ in feeds:
+        arrived.acquire()
+    wait(processed)
+
+
+def run_ingest(feeds, args) -> dict:
+    from backend import metrics, monitor
+    from backend.config import settings
+    from backend.fetcher import fetcher
+    from backend.logging_config import setup_logging
+    from backend.processing import create_parse_pool, parse_and_match
+    from backend.writer import result_writer
+
+    setup_logging()
+    monitor.parse_pool = create_parse_pool(settings.PARSE_WORKERS)
+    if monitor.parse_pool is not None:
+        # Spawn the workers and build their matchers before the first round is timed
+        for future in [monitor.parse_pool.submit(parse_and_match, "warmup", build_feed(0, 1)) for _ in range(settings.PARSE_WORKERS * 2)]:
+            future.result()
+    fetcher.start()
+    result_writer.start()
+    rounds = []
+    try:
+        for number in range(args.rounds):
+            round_started = time.monotonic()
+            before = scrape(metrics.registry.render())
+            started = time.perf_counter()
+            fetch_round(feeds)
+            elapsed = time.perf_counter() - started
+            rounds.append(pipeline_stats(before, scrape(metrics.registry.render()), elapsed, len(feeds)))
+            if not args.json:
+                row = rounds[-1]
+                print(f"  round {number + 1}: {row['seconds']:6.2f}s {row['feeds_per_second']:8.1f} feeds/s "
+                      f"{row['entries_parsed']:7d} entries {row['results_stored']:6d} results  {row['fetches']}")
+            if number + 1 < args.rounds:
+                time.sleep(max(0.0, round_started + args.round_interval - time.monotonic()))
+    finally:
+        result_writer.stop()
+        fetcher.stop()
+        monitor.parse_pool.shutdown()
+        monitor.parse_pool = None
+
+    steady = rounds[1:]
+    return {
+        "rounds": rounds,
+        "cold": rounds[0],
+        "steady": {
+            "feeds_per_second": round(sum(r["feeds"] for r in steady) / sum(r["seconds"] for r in steady), 1),
+            "results_stored": sum(r["results_stored"] for r in steady),
+            "fetches": {k: sum(r["fetches"][k] for r in steady) for k in rounds[0]["fetches"]},
+        } if steady else None,
+    }
+
+
+def endpoint_url(name: str, rng: random.Random, feeds: int) -> str:
+    if name == "results":
+        return f"/results/?page={rng.randint(1, 20)}"
+    if name == "results_keyword":
+        return f"/results/?keywords={rng.choice(WORDS)}"
+    if name == "results_since":
+        since = FIRST_PUBLISHED + timedelta(hours=rng.uniform(0, feeds))
+        return f"/results/?published_after={since.isoformat().replace('+', '%2B')}"
+    return f"/results/search?q={rng.choice(WORDS)}"
+
+
+async def api_load(base_url: str, clients: int, seconds: float, feeds: int):
+    names = [name for name, _ in ENDPOINTS]
+    weights = [weight for _, weight in ENDPOINTS]
+    latencies = {name: [] for name in names}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                async with session.get(base_url + endpoint_url(name, rng, feeds)) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies[name].append(time.perf_counter() - started)
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=clients)) as session:
+        await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies, errors
+
+
+def latency_report(values) -> dict:
+    return {
+        "count": len(values),
+        **{f"p{pct}_ms": round(percentile(values, pct) * 1000, 2) for pct in (50, 95, 99)},
+        "max_ms": round(max(values, default=0) * 1000, 2),
+    }
+
+
+def run_api(mode: str, env: dict, args) -> dict:
+    port = free_port()
+    server_env = dict(
+        os.environ, **env,
+        MONITOR_IN_API="true" if mode == "ingesting" else "false",
+        SCHEDULER_ADAPTIVE="false",
+        SCHEDULER_STARTUP_SPREAD_SECONDS="60",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=server_env, cwd=ROOT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                    break
+            except OSError:
+                time.sleep(0.1)
+        asyncio.run(api_load(base_url, 4, 2, args.feeds)) # Warm-up
+        before = asyncio.run(get_text(base_url + "/metrics"))
+        started = time.perf_counter()
+        latencies, errors = asyncio.run(api_load(base_url, args.clients, args.seconds, args.feeds))
+        elapsed = time.perf_counter() - started
+        after = asyncio.run(get_text(base_url + "/metrics"))
+    finally:
+        server.terminate()
+        server.wait()
+
+    requests = sum(map(len, latencies.values()))
+    report = {
+        "requests": requests,
+        "errors": errors,
+        "requests_per_second": round(requests / elapsed, 1),
+        "all": latency_report([value for values in latencies.values() for value in values]),
+        "endpoints": {name: latency_report(values) for name, values in latencies.items()},
+    }
+    if mode == "ingesting":
+        # What the server's monitor did while the clients were running
+        report["pipeline"] = pipeline_stats(scrape(before), scrape(after), elapsed)
+    return report
+
+
+async def get_text(url: str) -> str:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            return await response.text()
+
+
+def summarize(report: dict) -> dict:
+    ingest = report.get("ingest")
+    api = report.get("api", {})
+    summary = {}
+    if ingest:
+        cold = ingest["cold"]
+        summary.update(
+            ingest_cold_feeds_per_second=cold["feeds_per_second"],
+            ingest_cold_entries_per_second=cold["entries_per_second"],
+            ingest_steady_feeds_per_second=(ingest["steady"] or {}).get("feeds_per_second"),
+            parse_ms_per_feed=cold["parse_ms_per_feed"],
+            match_ms_per_feed=cold["match_ms_per_feed"],
+            db_results_per_second=cold["results_per_second"],
+            db_ms_per_commit=cold["db_ms_per_commit"],
+        )
+    if "idle" in api:
+        summary["api_idle_p95_ms"] = api["idle"]["all"]["p95_ms"]
+    if "ingesting" in api:
+        summary["api_ingesting_p95_ms"] = api["ingesting"]["all"]["p95_ms"]
+        summary["api_ingesting_requests_per_second"] = api["ingesting"]["requests_per_second"]
+    return summary
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list:
+    """Prints the change of every summary value; returns the keys that got worse than the tolerance."""
+    regressions = []
+    print(f"\n{'metric':36s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for key, higher_is_better in SUMMARY.items():
+        old, new = baseline.get(key), summary.get(key)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:36s} {old:12.2f} {new:12.2f} {change * 100:+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phase", choices=["all", "ingest", "api"], default="all")
+    parser.add_argument("--feeds", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=30, help="Entries per feed")
+    parser.add_argument("--keywords", type=int, default=1000)
+    parser.add_argument("--updates-per-minute", type=float, default=6, help="New entries per feed and minute")
+    parser.add_argument("--latency", type=float, default=0.02, help="Feed server latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Share of feed requests answered with HTTP 500")
+    parser.add_argument("--malformed-rate", type=float, default=0.01, help="Share of feed requests answered with a truncated document")
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--round-interval", type=float, default=10, help="Seconds from the start of one ingest round to the next")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent API clients")
+    parser.add_argument("--seconds", type=float, default=20, help="Duration of each API run")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--compare", default=None, help="JSON report of an earlier run; exits with 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative change --compare accepts")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    if args.phase == "api":
+        args.rounds = 1 # The API runs need the results of one round
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "json")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+    }
+    farm = FeedServer(
+        entries_per_feed=args.entries, latency=args.latency, updates_per_minute=args.updates_per_minute,
+        error_rate=args.error_rate, malformed_rate=args.malformed_rate, seed=1,
+    ).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                "DATABASE_URL": os.path.join(tmp, "bench.sqlite3"),
+                "ARCHIVE_DIR": os.path.join(tmp, "archive"),
+                "LOG_FILE_PATH": os.devnull,
+                "LOG_LEVEL": "ERROR", # Injected failures are expected
+                "RETENTION_INTERVAL_MINUTES": "0",
+                "FEED_AUTO_DISABLE_FAILURES": "0",
+            }
+            os.environ.update(env) # Before the backend is imported
+            feeds = setup_database(farm, args.feeds, args.keywords)
+            if not args.json:
+                print(f"{args.feeds} feeds x {args.entries} entries, {args.keywords} keywords, "
+                      f"{args.updates_per_minute:g} updates/min per feed; {os.cpu_count()} CPUs")
+                print("ingest:")
+            ingest = run_ingest(feeds, args)
+            if args.phase != "api":
+                report["ingest"] = ingest
+            if args.phase != "ingest":
+                report["api"] = {}
+                for mode in ("idle", "ingesting"):
+                    report["api"][mode] = run_api(mode, env, args)
+                    if not args.json:
+                        row = report["api"][mode]
+                        print(f"api {mode:9s}: {row['requests_per_second']:7.1f} req/s, p50 {row['all']['p50_ms']:.1f} ms, "
+                              f"p95 {row['all']['p95_ms']:.1f} ms, p99 {row['all']['p99_ms']:.1f} ms, {row['errors']} errors")
+    finally:
+        farm.stop()
+    report["feed_server"] = {"requests": farm.requests_served, "injected_errors": farm.errors_served}
+    report["summary"] = summarize(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif not args.compare:
+        print(json.dumps(report["summary"], indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report["summary"], baseline.get("summary", {}), args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
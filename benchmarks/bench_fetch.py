@@ -0,0 +1,64 @@
+"""
+Download throughput: blocking feedparser.parse(url) on a 10-thread pool (the default
+APScheduler executor) versus the shared async FeedFetcher.
+
+    python -m benchmarks.bench_fetch --feeds 2000 --latency 0.1
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import feedparser
+
+from backend.fetcher import FeedFetcher
+from benchmarks.feed_server import FeedServer
+
+
+def bench_blocking(urls, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(feedparser.parse, urls))
+    return time.perf_counter() - started
+
+
+def bench_async(urls) -> float:
+    fetcher = FeedFetcher(per_host_limit=64, spool_bytes=0) # Bodies in memory, as feedparser.parse gets them
+    fetcher.start()
+    try:
+        started = time.perf_counter()
+        results = fetcher.fetch_many(urls)
+        downloaded = time.perf_counter() - started
+        # Parsing is a separate stage; include it so the comparison is like for like
+        for result in results:
+            feedparser.parse(result.content)
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for r in results if not r.ok)
+        print(f"  async download stage: {downloaded:.2f}s ({len(urls) / downloaded * 60:.0f} feeds/min), {failed} failed")
+        return elapsed
+    finally:
+        fetcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=2000)
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated server latency in seconds")
+    args = parser.parse_args()
+
+    server = FeedServer(entries_per_feed=args.entries, latency=args.latency).start()
+    try:
+        urls = [server.feed_url(i) for i in range(args.feeds)]
+        for name, run in (
+            (f"blocking feedparser ({args.threads} threads)", lambda: bench_blocking(urls, args.threads)),
+            ("async FeedFetcher + parse", lambda: bench_async(urls)),
+        ):
+            elapsed = run()
+            print(f"{name:40s} {elapsed:7.2f}s  {args.feeds / elapsed * 60:10.0f} feeds/min")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Keyword matching cost per entry: one re.search per keyword (the previous inner loop)
+versus the single-pass KeywordMatcher, for growing keyword sets.
+
+    python -m benchmarks.bench_matcher --sizes 10,100,1000,10000,100000
+"""
+import argparse
+import random
+import re
+import time
+
+from backend.matcher import KeywordMatcher
+from benchmarks.feed_server import WORDS
+
+# The per-keyword regex loop is too slow to run on very large keyword sets
+NAIVE_LIMIT = 10_000
+
+
+def make_keywords(count: int, rng: random.Random):
+    keywords = list(WORDS)
+    while len(keywords) < count:
+        word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+        # Roughly one in ten keywords is a two-word phrase
+        keywords.append(f"{word} {rng.choice(WORDS)}" if rng.random() < 0.1 else word)
+    return list(dict.fromkeys(keywords))[:count]
+
+
+def make_texts(count: int, rng: random.Random):
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))).lower()
+        for _ in range(count)
+    ]
+
+
+def naive_match(keywords, text):
+    return [kw for kw in keywords if re.search(r'\b' + re.escape(kw) + r'\b', text)]
+
+
+def timed(fn, texts) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - started) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--entries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = make_texts(args.entries, rng)
+    print(f"{'keywords':>10} {'build ms':>10} {'matcher us/entry':>18} {'re.search us/entry':>20}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        keywords = make_keywords(size, rng)
+        started = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build_ms = (time.perf_counter() - started) * 1e3
+        fast = timed(matcher.match, texts)
+        if size <= NAIVE_LIMIT:
+            sample = texts[: max(10, args.entries // max(1, size // 100))]
+            for text in sample[:20]:
+                assert matcher.match(text) == naive_match(keywords, text)
+            naive = f"{timed(lambda t: naive_match(keywords, t), sample):20.1f}"
+        else:
+            naive = f"{'skipped':>20}"
+        print(f"{size:>10} {build_ms:>10.1f} {fast:>18.1f} {naive}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Parse-and-match throughput of the CPU stage by worker count.
+
+Feeds a corpus of raw feed bodies through backend.processing.parse_and_match, in the
+calling thread (0 workers) and on process pools of increasing size, one task per feed
+like the monitor does. The corpus is a directory of recorded feed files, or synthetic
+feeds that can be saved for later runs:
+
+    python -m benchmarks.bench_parse --feeds 2000 --save /tmp/feed-corpus
+    python -m benchmarks.bench_parse --corpus /tmp/feed-corpus --workers 0 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.feed_server import build_feed, generate_keywords
+
+
+def load_corpus(args):
+    if args.corpus:
+        paths = sorted(p for p in Path(args.corpus).iterdir() if p.is_file())
+        return [p.read_bytes() for p in paths]
+    corpus = [build_feed(feed_id, args.entries) for feed_id in range(args.feeds)]
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+        for feed_id, body in enumerate(corpus):
+            Path(args.save, f"feed-{feed_id:05d}.xml").write_bytes(body)
+    return corpus
+
+
+def create_keywords(count: int):
+    from backend import crud, database
+    from backend.models import KeywordCreate
+
+    database.create_tables()
+    for keyword in generate_keywords(count, phrases=0):
+        crud.create_keyword(KeywordCreate(keyword=keyword))
+
+
+def run(corpus, workers: int) -> float:
+    from backend.processing import create_parse_pool, parse_and_match
+
+    pool = create_parse_pool(workers)
+    try:
+        if pool is not None:
+            # Spawn every worker and build its matcher before timing
+            for future in [pool.submit(parse_and_match, "warmup", body) for body in corpus[:workers * 4]]:
+                future.result()
+        else:
+            parse_and_match("warmup", corpus[0])
+        started = time.perf_counter()
+        if pool is None:
+            for body in corpus:
+                parse_and_match("bench", body)
+        else:
+            for future in [pool.submit(parse_and_match, "bench", body) for body in corpus]:
+                future.result()
+        return time.perf_counter() - started
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None, help="Directory of recorded feed bodies")
+    parser.add_argument("--save", default=None, help="Write the synthetic corpus to this directory")
+    parser.add_argument("--feeds", type=int, default=1000)
+    parser.add_argument("--entries", type=int, default=30)
+    parser.add_argument("--keywords", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Worker counts to compare (0 = in-process)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({0, 1, 2, 4, cpus} - {n for n in (2, 4) if n > cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Set before any pool is created; spawned workers inherit it
+        os.environ["DATABASE_URL"] = os.path.join(tmp, "bench.sqlite3")
+        os.environ.setdefault("LOG_FILE_PATH", os.devnull)
+        create_keywords(args.keywords)
+        corpus = load_corpus(args)
+        size_mb = sum(map(len, corpus)) / 1e6
+        print(f"corpus: {len(corpus)} feeds, {size_mb:.1f} MB; {args.keywords} keywords; {cpus} CPUs")
+
+        baseline = None
+        for workers in worker_counts:
+            elapsed = run(corpus, workers)
+            rate = len(corpus) / elapsed
+            if workers == 1:
+                baseline = rate
+            speedup = f"{rate / baseline:5.2f}x vs 1 worker" if baseline else ""
+            label = "in-process" if workers == 0 else f"{workers} worker(s)"
+            print(f"{label:14s} {elapsed:7.2f}s {rate:9.0f} feeds/s {rate * 60:11.0f} feeds/min  {speedup}")
+
+
+if __name__ == "__main__":
+    main()
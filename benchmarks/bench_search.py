@@ -0,0 +1,111 @@
+"""
+/results/ keyword filter versus the FTS5-backed /results/search on a large results table.
+
+The database is generated once and reused when --db points to an existing file:
+
+    python -m benchmarks.bench_search --rows 3000000 --db /tmp/results-bench.sqlite3
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.feed_server import WORDS
+
+CHUNK = 50_000
+VOCABULARY_SIZE = 20_000
+
+
+def make_vocabulary(rng: random.Random):
+    """Synthetic words with a Zipf-like frequency, so common and rare terms both exist."""
+    generated = {
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    }
+    vocabulary = sorted(generated - set(WORDS))
+    rng.shuffle(vocabulary)
+    # The benchmark keywords sit in the long tail, like real topics do
+    vocabulary[200:200] = WORDS
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    return vocabulary, cum_weights
+
+
+def populate(rows: int):
+    from backend import crud, database
+    from backend.models import KeywordCreate, RSSFeedCreate
+
+    database.create_tables()
+    conn = database.get_db_connection()
+    existing = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    conn.close()
+    if existing >= rows:
+        return existing
+
+    for word in WORDS:
+        crud.create_keyword(KeywordCreate(keyword=word))
+    feed = crud.get_rss_feed(1) or crud.create_rss_feed(RSSFeedCreate(url="http://bench.invalid/feed.xml"))
+    rng = random.Random(7)
+    vocabulary, cum_weights = make_vocabulary(rng)
+    started = time.perf_counter()
+    for offset in range(existing, rows, CHUNK):
+        entries = []
+        for i in range(offset, min(rows, offset + CHUNK)):
+            words = rng.choices(vocabulary, cum_weights=cum_weights, k=30)
+            entries.append({
+                "title": " ".join(words[:8]).capitalize(),
+                "link": f"http://bench.invalid/{i}",
+                "summary": " ".join(words),
+                "published_date": None,
+                "matched_keywords": sorted(set(words) & set(WORDS)) or [words[0]],
+            })
+        crud.add_results_bulk(feed["id"], entries)
+        print(f"  populated {min(rows, offset + CHUNK):,} rows ({time.perf_counter() - started:.0f}s)", file=sys.stderr)
+    return rows
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", default=None, help="Database file to create or reuse")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = None
+    if args.db is None:
+        tmp = tempfile.TemporaryDirectory()
+        args.db = os.path.join(tmp.name, "bench.sqlite3")
+    os.environ["DATABASE_URL"] = args.db
+    os.environ.setdefault("LOG_FILE_PATH", os.devnull)
+
+    from backend import crud
+
+    total = populate(args.rows)
+    print(f"results table: {total:,} rows")
+    cases = [
+        ("keyword filter 'ai', page 1", lambda: crud.get_results(page=1, keyword_filters=["ai"])),
+        ("keyword filter 'ai', page 500", lambda: crud.get_results(page=500, keyword_filters=["ai"])),
+        ("FTS search 'ai', page 1", lambda: crud.search_results("ai", page=1)),
+        ("FTS search 'ai', page 500", lambda: crud.search_results("ai", page=500)),
+        ("FTS search 'climate robotics'", lambda: crud.search_results("climate robotics")),
+    ]
+    for name, fn in cases:
+        print(f"{name:32s} {timed(fn, args.repeat):10.1f} ms (median of {args.repeat})")
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Time and peak memory per feed for the parsing paths of parse_and_match:
+
+* feedparser  - FEED_STREAM_PARSE=false, the whole document through feedparser
+* stream      - the streaming parser, every entry parsed
+* early_stop  - the streaming parser on a re-fetch that only has a few new entries on
+                top, stopping at the entries the previous run already handled
+* stream_spooled, early_stop_spooled - the same, reading the body from the file the
+                fetcher spools large bodies to (FETCH_SPOOL_BYTES) instead of from memory
+
+Each mode runs in its own process, so the peak RSS it reports (ru_maxrss) is not
+inflated by the other modes; the tracemalloc peak is the allocation peak of a single
+parse_and_match call. The feeds are newest-first with long descriptions, like the
+large news and podcast feeds that the early stop is for.
+
+    python -m benchmarks.bench_stream --entries 500 2000 8000
+    python -m benchmarks.bench_stream --entries 5000 --new 10 --json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from email.utils import formatdate
+
+from benchmarks.feed_server import WORDS
+
+MODES = {
+    "feedparser": {"FEED_STREAM_PARSE": "false"},
+    "stream": {"FEED_STREAM_PARSE": "true", "FEED_EARLY_STOP_ENTRIES": "0"},
+    "early_stop": {"FEED_STREAM_PARSE": "true", "FEED_EARLY_STOP_ENTRIES": "3"},
+    "stream_spooled": {"FEED_STREAM_PARSE": "true", "FEED_EARLY_STOP_ENTRIES": "0"},
+    "early_stop_spooled": {"FEED_STREAM_PARSE": "true", "FEED_EARLY_STOP_ENTRIES": "3"},
+}
+SPOOLED = {"stream_spooled", "early_stop_spooled"}
+
+START = 1_700_000_000
+
+
+def build_body(entries: int, new: int = 0) -> bytes:
+    """A newest-first RSS document with `entries` old entries and `new` newer ones on top."""
+    items = []
+    for i in range(entries + new):
+        words = " ".join(WORDS[(i * 7 + j) % len(WORDS)] for j in range(60))
+        items.append(
+            f"<item><title>Story {i} about {WORDS[i % len(WORDS)]}</title>"
+            f"<link>http://example.invalid/story/{i}</link><guid>story-{i}</guid>"
+            f"<description>&lt;p&gt;{words}&lt;/p&gt;</description>"
+            f"<pubDate>{formatdate(START + i * 600)}</pubDate></item>"
+        )
+    items.reverse()
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        "<title>Large feed</title><link>http://example.invalid/</link>"
+        f"<description>Benchmark feed</description>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def known_hint(entries: int):
+    """What seen.stop_hint() returns after a run over the first `entries` entries."""
+    return {
+        'high_water': float(START + (entries - 1) * 600),
+        'links': {f"http://example.invalid/story/{i}": None for i in range(entries)},
+    }
+
+
+def child(mode: str, path: str, entries: int, new: int, repeat: int):
+    from backend import crud, database
+    from backend.models import KeywordCreate
+    from backend.processing import parse_and_match
+
+    database.create_tables()
+    for keyword in ("python", "market", "climate"):
+        crud.create_keyword(KeywordCreate(keyword=keyword))
+
+    if mode in SPOOLED:
+        body = path
+    else:
+        with open(path, "rb") as f:
+            body = f.read() # Held in memory, as the fetcher does for bodies below FETCH_SPOOL_BYTES
+    known = known_hint(entries) if mode.startswith("early_stop") else None
+    parse_and_match("warmup", build_body(5)) # Imports and the keyword matcher
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parsed = parse_and_match("bench", body, known)
+        timings.append(time.perf_counter() - started)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    parse_and_match("bench", body, known)
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "mode": mode,
+        "entries": entries + new,
+        "body_kb": round(os.path.getsize(path) / 1024),
+        "parser": parsed['parser'],
+        "entries_parsed": len(parsed['entry_timestamps']),
+        "stopped_early": parsed['stopped_at'] is not None,
+        "median_ms": round(timings[len(timings) // 2] * 1000, 2),
+        "min_ms": round(timings[0] * 1000, 2),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "rss_growth_mb": round((peak_kb - baseline_kb) / 1024, 1),
+        "alloc_peak_mb": round(traced_peak / 2**20, 1),
+    }
+
+
+def run_mode(mode: str, entries: int, body_path: str, args, tmp: str):
+    env = dict(
+        os.environ,
+        DATABASE_URL=os.path.join(tmp, f"{mode}-{entries}.sqlite3"),
+        LOG_FILE_PATH=os.devnull,
+        LOG_LEVEL="WARNING",
+        PARSE_WORKERS="0",
+        **MODES[mode],
+    )
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_stream", "--child", mode, "--body", body_path,
+         "--entries", str(entries), "--new", str(args.new), "--repeat", str(args.repeat)],
+        env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["all", *MODES], default="all")
+    parser.add_argument("--entries", type=int, nargs="+", default=[500, 2000, 8000], help="Entries already seen, per feed size")
+    parser.add_argument("--new", type=int, default=5, help="New entries on top of the re-fetched document")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    parser.add_argument("--child", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--body", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.body, args.entries[0], args.new, args.repeat)))
+        return
+
+    modes = list(MODES) if args.mode == "all" else [args.mode]
+    reports = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for entries in args.entries:
+            # Written here, so building the document never counts towards a mode's peak memory
+            body_path = os.path.join(tmp, f"body-{entries}.xml")
+            with open(body_path, "wb") as f:
+                f.write(build_body(entries, args.new))
+            for mode in modes:
+                reports.append(run_mode(mode, entries, body_path, args, tmp))
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    print(f"{'mode':18s} {'entries':>7s} {'body KB':>8s} {'parsed':>7s} {'median ms':>10s} "
+          f"{'peak RSS MB':>12s} {'RSS growth MB':>14s} {'alloc peak MB':>14s}")
+    for r in reports:
+        print(f"{r['mode']:18s} {r['entries']:7d} {r['body_kb']:8d} {r['entries_parsed']:7d} {r['median_ms']:10.1f} "
+              f"{r['peak_rss_mb']:12.1f} {r['rss_growth_mb']:14.1f} {r['alloc_peak_mb']:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
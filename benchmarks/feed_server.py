@@ -0,0 +1,194 @@
+"""
+Local stub HTTP server that serves synthetic RSS feeds for benchmarks.
+
+Feeds live at /feed/<id>.xml and are generated deterministically from the feed id,
+so every run sees the same documents. The server speaks just enough HTTP/1.1
+(keep-alive, Content-Length) to behave like a real feed host, and runs its own
+asyncio loop on a background thread so it never competes with the client loop.
+
+For load tests the server can act as a feed farm: with updates_per_minute every feed
+gains new entries over time (the oldest drop out, like a real feed window), and
+error_rate / malformed_rate answer a share of the requests with HTTP 500 or with a
+truncated document.
+"""
+import asyncio
+import random
+import threading
+import time
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+
+WORDS = (
+    "market energy policy election climate startup security cloud python data "
+    "health travel science space football music finance crypto ai robotics"
+).split()
+
+
+def build_feed(feed_id: int, entries: int = 20, first: int = 0) -> bytes:
+    """Entries first .. first + entries - 1 of a feed, newest first like most real feeds."""
+    items = []
+    for i in range(first + entries - 1, first - 1, -1):
+        words = " ".join(WORDS[(feed_id + i + j) % len(WORDS)] for j in range(12))
+        published = formatdate(1_700_000_000 + feed_id * 3600 + i * 60)
+        items.append(
+            f"<item><title>Story {feed_id}-{i} about {WORDS[(feed_id + i) % len(WORDS)]}</title>"
+            f"<link>http://example.invalid/{feed_id}/{i}</link>"
+            f"<guid>feed-{feed_id}-item-{i}</guid>"
+            f"<description>{words}</description>"
+            f"<pubDate>{published}</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Synthetic feed {feed_id}</title><link>http://example.invalid/{feed_id}</link>"
+        f"<description>Benchmark feed</description>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def generate_keywords(count: int, phrases: float = 0.1, seed: int = 3) -> List[str]:
+    """
+    A keyword set of `count` keywords: the words the synthetic feeds are made of (so
+    entries match), then random words that never match, a `phrases` share of them as
+    two-word phrases that only go through the matcher's phrase path.
+    """
+    rng = random.Random(seed)
+    keywords = dict.fromkeys(WORDS[:count])
+
+    def random_word():
+        return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+
+    while len(keywords) < count:
+        keyword = random_word()
+        if rng.random() < phrases:
+            keyword = f"{rng.choice(WORDS)} {keyword}"
+        keywords[keyword] = None
+    return list(keywords)
+
+
+class FeedServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        entries_per_feed: int = 20,
+        latency: float = 0.0,
+        updates_per_minute: float = 0.0,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.entries_per_feed = entries_per_feed
+        self.latency = latency # Seconds added to every response, to mimic remote hosts
+        self.updates_per_minute = updates_per_minute # New entries per feed and minute
+        self.error_rate = error_rate # Share of requests answered with HTTP 500
+        self.malformed_rate = malformed_rate # Share of requests answered with a truncated document
+        self.requests_served = 0
+        self.errors_served = 0 # Injected errors and truncated documents
+        self._rng = random.Random(seed) # Only used on the server loop
+        self._started = time.monotonic()
+        self._bodies: Dict[int, Tuple[int, bytes]] = {} # feed id -> (first entry, body)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def feed_url(self, feed_id: int) -> str:
+        return f"{self.base_url}/feed/{feed_id}.xml"
+
+    def first_entry(self, feed_id: int) -> int:
+        """Index of the oldest entry the feed holds now; grows by updates_per_minute."""
+        if not self.updates_per_minute:
+            return 0
+        period = 60 / self.updates_per_minute
+        # Feeds are out of step with each other, but none has updated at start
+        return int((time.monotonic() - self._started + (feed_id * 7.919) % period) / period)
+
+    def get_body(self, feed_id: int, first: Optional[int] = None) -> bytes:
+        if first is None:
+            first = self.first_entry(feed_id)
+        cached = self._bodies.get(feed_id)
+        if cached is None or cached[0] != first:
+            cached = self._bodies[feed_id] = (first, build_feed(feed_id, self.entries_per_feed, first))
+        return cached[1]
+
+    def respond(self, path: str, headers: Dict[str, str]):
+        """Returns (status, extra headers, body) for a GET request."""
+        try:
+            feed_id = int(path.rsplit("/", 1)[-1].split(".")[0])
+        except ValueError:
+            return 404, {}, b"not found"
+        roll = self._rng.random() if self.error_rate or self.malformed_rate else 1.0
+        if roll < self.error_rate:
+            self.errors_served += 1
+            return 500, {}, b"injected error"
+        first = self.first_entry(feed_id)
+        body = self.get_body(feed_id, first)
+        etag = f'"{feed_id}-{first}"'
+        if headers.get("if-none-match") == etag:
+            return 304, {"ETag": etag}, b""
+        if roll < self.error_rate + self.malformed_rate:
+            self.errors_served += 1
+            return 200, {"Content-Type": "application/rss+xml"}, body[:len(body) // 2]
+        return 200, {"Content-Type": "application/rss+xml", "ETag": etag}, body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                path = lines[0].split(" ")[1]
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                status, extra_headers, body = await self._respond_async(path, headers)
+                self.requests_served += 1
+                out = [f"HTTP/1.1 {status} X", f"Content-Length: {len(body)}"]
+                out.extend(f"{k}: {v}" for k, v in extra_headers.items())
+                writer.write(("\r\n".join(out) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        finally:
+            writer.close()
+
+    async def _respond_async(self, path: str, headers: Dict[str, str]):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.respond(path, headers)
+
+    def start(self) -> "FeedServer":
+        ready = threading.Event()
+        self._started = time.monotonic()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port, backlog=2048)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="feed-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        async def _close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
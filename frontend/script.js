@@ -9,8 +9,8 @@ document.addEventListener("DOMContentLoaded", () => {
   loadRSSFeeds();
   loadResults(1); // Load first page of results
 
-  // Setup auto-refresh for results
-  setupAutoRefresh();
+  // Live updates for results
+  setupResultStream();
 
   // Event Listeners for Forms
   document
@@ -272,6 +272,19 @@ async function loadRSSFeeds() {
       return;
     }
 
+    const escapeAttr = (text) =>
+      String(text).replace(/&/g, "&amp;").replace(/"/g, "&quot;").replace(/</g, "&lt;");
+    const feedHealthLine = (feed) => {
+      if (feed.auto_disabled) {
+        return `<br><small class="feed-health feed-health-disabled" title="${escapeAttr(feed.last_error || "")}">Disabled after ${feed.consecutive_failures} failed fetches</small>`;
+      }
+      if (!feed.consecutive_failures) return "";
+      const backoff = feed.backoff_until && new Date(feed.backoff_until) > new Date()
+        ? ` | retrying after ${new Date(feed.backoff_until).toLocaleTimeString()}`
+        : "";
+      return `<br><small class="feed-health" title="${escapeAttr(feed.last_error || "")}">${feed.consecutive_failures} failed fetch(es)${backoff}</small>`;
+    };
+
     feeds.forEach((feed) => {
       const item = document.createElement("div");
       item.className = "list-item";
@@ -284,7 +297,7 @@ async function loadRSSFeeds() {
                     <small>${feed.url}</small><br>
                     <small>Interval: ${
                       feed.fetch_interval_minutes
-                    } min | Last Fetched: ${lastFetched}</small>
+                    } min | Last Fetched: ${lastFetched}</small>${feedHealthLine(feed)}
                 </span>
                 <div class="actions">
                     <button class="btn toggle-btn btn-warning" data-id="${
@@ -475,18 +488,39 @@ async function handleDeleteRSSFeed(event) {
 
 //  Results Functions 
 let currentPage = 1;
-const AUTO_REFRESH_INTERVAL_MS = 60000; // Refresh every 60 seconds (1 minute)
-let autoRefreshTimer;
+// pageCursors[i] is the keyset cursor that starts page i + 1 (null for the first page)
+let pageCursors = [null];
+const STREAM_REFRESH_DELAY_MS = 1000; // Coalesce bursts of new results into one reload
+let resultStream;
+let streamRefreshTimer;
+
+// Subscribes to new results pushed by the server instead of polling /results/
+function setupResultStream() {
+  if (resultStream) {
+    resultStream.close();
+  }
+  const queryParams = new URLSearchParams();
+  if (selectedFilterKeywords.length > 0) {
+    queryParams.append("keywords", selectedFilterKeywords.join(","));
+  }
+  resultStream = new EventSource(
+    `${API_BASE_URL}/results/stream?${queryParams.toString()}`
+  );
+  // "overflow" means this client missed events; a reload resynchronises it
+  ["result", "overflow"].forEach((eventName) => {
+    resultStream.addEventListener(eventName, scheduleStreamRefresh);
+  });
+}
 
-function setupAutoRefresh() {
-  // Clear any existing timer to prevent multiple intervals
-  if (autoRefreshTimer) {
-    clearInterval(autoRefreshTimer);
+function scheduleStreamRefresh() {
+  if (streamRefreshTimer) {
+    return;
   }
-  autoRefreshTimer = setInterval(() => {
-    console.log("Auto-refreshing results...");
+  streamRefreshTimer = setTimeout(() => {
+    streamRefreshTimer = null;
+    console.log("New results received, refreshing...");
     loadResults(currentPage, true); // Pass a flag to indicate it's an auto-refresh
-  }, AUTO_REFRESH_INTERVAL_MS);
+  }, STREAM_REFRESH_DELAY_MS);
 }
 
 // Populates the datalist for the filter input
@@ -537,6 +571,7 @@ function addFilterTagFromInput() {
       filterInput.value = ""; // Clear input
       renderActiveFilterTags();
       loadResults(1); // Reload results with new filter
+      setupResultStream(); // Stream only results matching the new filters
     } else {
       alert(`"${keyword}" is not a valid keyword. Please add it first.`);
     }
@@ -552,6 +587,7 @@ function removeFilterTag(keywordToRemove) {
   );
   renderActiveFilterTags();
   loadResults(1); // Reload results after removing filter
+  setupResultStream(); // Stream only results matching the new filters
 }
 
 // Clears all active filters
@@ -559,9 +595,16 @@ function clearAllFilters() {
   selectedFilterKeywords = [];
   renderActiveFilterTags();
   loadResults(1); // Reload results after clearing all filters
+  setupResultStream(); // Stream only results matching the new filters
 }
 
 async function loadResults(page, isAutoRefresh = false) {
+  if (page === 1 && !isAutoRefresh) {
+    pageCursors = [null]; // Filters or data changed: start over from the newest results
+  }
+  if (page > pageCursors.length) {
+    page = pageCursors.length; // Only pages we have a cursor for can be opened
+  }
   currentPage = page;
   const resultsGrid = document.getElementById("resultsGrid");
   const paginationDiv = document.getElementById("pagination");
@@ -572,7 +615,14 @@ async function loadResults(page, isAutoRefresh = false) {
     paginationDiv.innerHTML = "";
   }
 
-  const queryParams = new URLSearchParams({ page: page, page_size: 12 });
+  const queryParams = new URLSearchParams({
+    page: page,
+    page_size: 12,
+    pagination: "cursor",
+  });
+  if (pageCursors[page - 1]) {
+    queryParams.append("cursor", pageCursors[page - 1]);
+  }
   if (selectedFilterKeywords.length > 0) {
     queryParams.append("keywords", selectedFilterKeywords.join(","));
   }
@@ -617,7 +667,12 @@ async function loadResults(page, isAutoRefresh = false) {
       resultsGrid.appendChild(card);
     });
 
-    renderPagination(data.current_page, data.total_pages);
+    if (data.next_cursor) {
+      pageCursors[page] = data.next_cursor;
+    } else {
+      pageCursors.length = page; // This is the last page
+    }
+    renderPagination(page, data.total_pages, data.has_more);
   } catch (error) {
     console.error("Failed to load results:", error);
     resultsGrid.innerHTML =
@@ -626,7 +681,7 @@ async function loadResults(page, isAutoRefresh = false) {
   }
 }
 
-function renderPagination(currentPage, totalPages) {
+function renderPagination(currentPage, totalPages, hasMore) {
   const paginationDiv = document.getElementById("pagination");
   paginationDiv.innerHTML = "";
 
@@ -637,51 +692,22 @@ function renderPagination(currentPage, totalPages) {
   prevButton.addEventListener("click", () => loadResults(currentPage - 1));
   paginationDiv.appendChild(prevButton);
 
-  // Page numbers (simple version)
-  const maxPagesToShow = 5; // e.g., 1 ... 4 5 6 ... 10
-  let startPage = Math.max(1, currentPage - Math.floor(maxPagesToShow / 2));
-  let endPage = Math.min(totalPages, startPage + maxPagesToShow - 1);
-
-  if (endPage - startPage + 1 < maxPagesToShow) {
-    startPage = Math.max(1, endPage - maxPagesToShow + 1);
+  // Pages are walked with cursors, so jump straight back to the first page only
+  if (currentPage > 2) {
+    const firstButton = document.createElement("button");
+    firstButton.textContent = "1";
+    firstButton.addEventListener("click", () => loadResults(1));
+    paginationDiv.appendChild(firstButton);
   }
 
-  if (startPage > 1) {
-    const btn = document.createElement("button");
-    btn.textContent = "1";
-    btn.addEventListener("click", () => loadResults(1));
-    paginationDiv.appendChild(btn);
-    if (startPage > 2) {
-      const ellipsis = document.createElement("span");
-      ellipsis.textContent = "...";
-      paginationDiv.appendChild(ellipsis);
-    }
-  }
-
-  for (let i = startPage; i <= endPage; i++) {
-    const button = document.createElement("button");
-    button.textContent = i;
-    button.classList.toggle("active", i === currentPage);
-    button.addEventListener("click", () => loadResults(i));
-    paginationDiv.appendChild(button);
-  }
-
-  if (endPage < totalPages) {
-    if (endPage < totalPages - 1) {
-      const ellipsis = document.createElement("span");
-      ellipsis.textContent = "...";
-      paginationDiv.appendChild(ellipsis);
-    }
-    const btn = document.createElement("button");
-    btn.textContent = totalPages;
-    btn.addEventListener("click", () => loadResults(totalPages));
-    paginationDiv.appendChild(btn);
-  }
+  const pageInfo = document.createElement("span");
+  pageInfo.textContent = `Page ${currentPage} of ${Math.max(totalPages, 1)}`;
+  paginationDiv.appendChild(pageInfo);
 
   // Next button
   const nextButton = document.createElement("button");
   nextButton.textContent = "Next";
-  nextButton.disabled = currentPage === totalPages;
+  nextButton.disabled = !hasMore;
   nextButton.addEventListener("click", () => loadResults(currentPage + 1));
   paginationDiv.appendChild(nextButton);
-}
+}
\ No newline at end of file
@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+# Read by backend.config at import time, so set before any backend module is imported
+os.environ.setdefault("DATABASE_URL", os.path.join(tempfile.mkdtemp(prefix="rss-monitor-tests-"), "unused.sqlite3"))
+os.environ.setdefault("LOG_FILE_PATH", os.devnull)
+os.environ.setdefault("PARSE_WORKERS", "0")
+os.environ.setdefault("KEYWORD_CACHE_CHECK_SECONDS", "0")
+os.environ.setdefault("BACKFILL_BATCH_PAUSE_SECONDS", "0")
+
+import pytest
+
+from backend import crud, database
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path, monkeypatch):
+    """A fresh database (and connection pool) for every test."""
+    monkeypatch.setattr(database, "DATABASE_FILE", str(tmp_path / "test.sqlite3"))
+    monkeypatch.setattr(database, "pool", database.ConnectionPool())
+    crud._count_cache.clear()
+    crud.invalidate_keyword_cache()
+    database.create_tables()
+    yield
+    crud._count_cache.clear()
+    crud.invalidate_keyword_cache()
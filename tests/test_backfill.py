@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from backend import crud, dates
+from backend.backfill import KeywordBackfill
+from backend.models import KeywordCreate, RSSFeedCreate
+from backend.processing import pack_entry
+from backend.writer import result_writer
+
+
+@pytest.fixture
+def writer():
+    result_writer.start()
+    yield result_writer
+    result_writer.stop()
+
+
+def _run_backfill(keyword_id: int):
+    backfill = KeywordBackfill(pause_seconds=0)
+    backfill.enqueue(keyword_id)
+    deadline = time.monotonic() + 10
+    while backfill.status()[0]['state'] in ('queued', 'running'):
+        assert time.monotonic() < deadline, "backfill did not finish"
+        time.sleep(0.01)
+    return backfill.status()[0]
+
+
+def test_backfill_updates_filtered_counts(writer):
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    feed = crud.create_rss_feed(RSSFeedCreate(url="http://example.invalid/feed.xml"))
+    published = dates.now_utc()
+    stored = {
+        'title': "Python and Rust in the kernel",
+        'link': "http://example.invalid/kernel",
+        'summary': "Both languages are now accepted for new drivers",
+        'published_date': published,
+        'matched_keywords': ["python"],
+    }
+    archive = [
+        (stored['link'], published.isoformat(), pack_entry(stored['title'], stored['summary'])),
+        ("http://example.invalid/cargo", published.isoformat(), pack_entry("Cargo gets a new resolver", "Rust tooling news")),
+    ]
+    writer.submit(feed['id'], [stored], archive).result()
+
+    # Added without a backfill yet (the API queues one); the count is cached meanwhile
+    rust = crud.create_keyword(KeywordCreate(keyword="rust"))
+    assert crud.get_results(keyword_filters=["rust"])['total_items'] == 0
+
+    job = _run_backfill(rust['id'])
+    assert job['state'] == 'done'
+    assert job['matched'] == 2
+    assert job['new_results'] == 1
+
+    # The stored result gained the keyword, the other archived entry became a new result
+    assert crud.get_results(keyword_filters=["rust"])['total_items'] == 2
+    assert crud.get_results(keyword_filters=["python"])['total_items'] == 1
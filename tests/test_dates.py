@@ -0,0 +1,55 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from backend import crud, database, dates
+from backend.models import RSSFeedCreate
+
+
+def test_parsed_struct_is_utc():
+    entry = {'published_parsed': time.struct_time((2024, 3, 1, 12, 30, 0, 4, 61, 0))}
+    assert dates.entry_published_date(entry) == datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def test_raw_strings_are_converted_to_utc():
+    value = dates.entry_published_date({'published': "2024-03-01 14:30:00"}, "http://example.invalid/a.xml")
+    assert value == datetime(2024, 3, 1, 14, 30, tzinfo=timezone.utc)
+    value = dates.entry_published_date({'published': "Fri, 01 Mar 2024 14:30:00 +0200"})
+    assert value == datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def test_format_is_remembered_per_feed():
+    feed_key = "http://example.invalid/dotted.xml"
+    assert dates.parse_date_string("01.03.2024 14:30", feed_key) == datetime(2024, 3, 1, 14, 30, tzinfo=timezone.utc)
+    assert dates.remembered_format(feed_key) == "%d.%m.%Y %H:%M"
+    assert dates.parse_date_string("not a date", feed_key) is None
+
+
+def _published(result_id: int) -> str:
+    conn = database.get_db_connection()
+    value = conn.execute("SELECT published_date FROM results WHERE id = ?", (result_id,)).fetchone()[0]
+    conn.close()
+    return value
+
+
+def test_stored_dates_are_normalized_once():
+    feed = crud.create_rss_feed(RSSFeedCreate(url="http://example.invalid/feed.xml"))
+    conn = database.get_db_connection()
+    conn.execute("DELETE FROM migrations") # As for a database from before the dates were normalized
+    offset = datetime(2024, 3, 1, 14, 30, tzinfo=timezone(timedelta(hours=2))).isoformat()
+    old_id = conn.execute(
+        "INSERT INTO results (feed_id, link, published_date) VALUES (?, 'http://example.invalid/old', ?)", (feed['id'], offset)
+    ).lastrowid
+    conn.commit()
+    conn.close()
+
+    database.create_tables()
+    assert _published(old_id) == "2024-03-01T12:30:00+00:00"
+
+    conn = database.get_db_connection()
+    later_id = conn.execute(
+        "INSERT INTO results (feed_id, link, published_date) VALUES (?, 'http://example.invalid/later', ?)", (feed['id'], offset)
+    ).lastrowid
+    conn.commit()
+    conn.close()
+    database.create_tables() # Not scanned again on later startups
+    assert _published(later_id) == offset
@@ -0,0 +1,57 @@
+import pytest
+
+from backend import dedup
+from backend.config import settings
+
+
+@pytest.mark.parametrize("variant", [
+    "https://www.example.com/news/story",
+    "http://example.com/news/story/",
+    "https://EXAMPLE.com:443/news//story",
+    "https://example.com/news/story#comments",
+    "https://example.com/news/story?utm_source=rss&utm_medium=feed",
+    "https://example.com/news/story?fbclid=abc&ref=twitter",
+    "  https://example.com./news/story  ",
+])
+def test_canonical_url_drops_cosmetic_differences(variant):
+    assert dedup.canonical_url(variant) == "example.com/news/story"
+
+
+def test_canonical_url_keeps_content_parameters_sorted():
+    assert dedup.canonical_url("https://example.com/a?b=2&utm_campaign=x&a=1") == "example.com/a?a=1&b=2"
+    assert dedup.canonical_url("https://example.com/a?id=1") != dedup.canonical_url("https://example.com/a?id=2")
+
+
+def test_canonical_url_keeps_port_and_path_case():
+    assert dedup.canonical_url("http://example.com:8080/Story") == "example.com:8080/Story"
+    assert dedup.canonical_url("http://[::1]:8080/x") == "[::1]:8080/x"
+
+
+def test_canonical_url_strips_configured_tracking_params(monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_TRACKING_PARAMS", {"src"})
+    assert dedup.canonical_url("https://example.com/a?src=feed&id=1") == "example.com/a?id=1"
+
+
+@pytest.mark.parametrize("url", ["not a url", "/relative/path", "http://[broken/x"])
+def test_canonical_url_leaves_unparseable_links_alone(url):
+    assert dedup.canonical_url(url) == url.strip()
+
+
+def test_content_hash_ignores_markup_case_and_truncation():
+    title = "Central bank raises interest rates again"
+    summary = " ".join(f"word{i}" for i in range(40))
+    base = dedup.content_hash(title, summary)
+    assert base is not None
+    assert dedup.content_hash(title.upper() + "!", f"<p>{summary[:300]}</p>") == base
+    assert dedup.content_hash(title, summary + " and more text the copy kept") == base
+    assert dedup.content_hash("Central bank cuts interest rates again", summary) != base
+
+
+def test_content_hash_needs_enough_words():
+    assert dedup.content_hash("Breaking news", "") is None
+    assert dedup.content_hash("Breaking news", "more about it here") is not None
+
+
+def test_leading_words_matches_full_normalization():
+    text = "<p>Alpha &amp; beta, " + "<b>gamma</b> delta " * 200 + "</p>"
+    assert dedup.leading_words(text, 20) == dedup.normalize_text(text).split()[:20]
@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+
+from backend import crud
+from backend.models import RSSFeedCreate
+
+
+def test_fetch_success_writes_utc_timestamps():
+    feed = crud.create_rss_feed(RSSFeedCreate(url="http://example.invalid/feed.xml"))
+    crud.record_fetch_success(feed['id'], 200, 12.5)
+    crud.update_feed_validators(feed['id'], '"etag"', None)
+
+    feed = crud.get_rss_feed(feed['id'])
+    last_fetched = datetime.fromisoformat(feed['last_fetched'])
+    assert last_fetched.utcoffset() == timezone.utc.utcoffset(None)
+    assert abs((datetime.now(timezone.utc) - last_fetched).total_seconds()) < 60
+    assert feed['last_success_at'] <= feed['last_fetched']
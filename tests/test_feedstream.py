@@ -0,0 +1,52 @@
+import feedparser
+import pytest
+
+from backend import processing
+from backend.feedstream import StreamParser, Unsupported
+
+FIELDS = ('title', 'link', 'summary', 'published', 'published_parsed', 'updated', 'updated_parsed')
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel><title>Feed</title>
+<item><title>Newest &amp; best</title><link>http://example.invalid/2</link>
+  <description>&lt;p&gt;Some &lt;b&gt;bold&lt;/b&gt; text&lt;script&gt;x()&lt;/script&gt;&lt;/p&gt;</description>
+  <pubDate>Mon, 06 Sep 2021 16:45:00 GMT</pubDate></item>
+<item><guid isPermaLink="true">http://example.invalid/1</guid><dc:title>Only a guid</dc:title>
+  <content:encoded><![CDATA[<a href="/relative">link</a>]]></content:encoded>
+  <dc:date>2021-09-05T10:00:00Z</dc:date></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title>
+<entry><title type="html">A &lt;em&gt;title&lt;/em&gt;</title>
+  <link rel="alternate" href="http://example.invalid/a"/><link rel="enclosure" href="http://example.invalid/a.mp3"/>
+  <summary>Plain summary</summary><published>2021-09-06T16:45:00Z</published><updated>2021-09-07T08:00:00Z</updated></entry>
+</feed>"""
+
+
+def _fields(entry):
+    return {field: entry.get(field) for field in FIELDS}
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+@pytest.mark.parametrize("document", [RSS, ATOM], ids=["rss", "atom"])
+def test_stream_parser_matches_feedparser(document):
+    expected = [_fields(entry) for entry in feedparser.parse(document).entries]
+    assert [_fields(entry) for entry in StreamParser(document).entries()] == expected
+
+
+def test_unsupported_documents_are_handed_to_feedparser():
+    with pytest.raises(Unsupported):
+        list(StreamParser(b'<!DOCTYPE rss><rss version="2.0"><channel></channel></rss>').entries())
+    parsed = processing.parse_and_match("http://example.invalid/feed.xml", b'<!DOCTYPE rss>' + RSS.split(b"?>", 1)[1])
+    assert parsed['parser'] == 'fallback'
+    assert parsed['entries'] == 2
+
+
+def test_feedparser_only_without_stream_parser(monkeypatch):
+    # What processing falls back to when feedparser's internals moved
+    monkeypatch.setattr(processing, "StreamParser", None)
+    parsed = processing.parse_and_match("http://example.invalid/feed.xml", RSS)
+    assert parsed['parser'] == 'feedparser'
+    assert parsed['entries'] == 2
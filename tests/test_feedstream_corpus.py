@@ -0,0 +1,78 @@
+"""
+The streaming parser against feedparser on the malformed and encoding corpora in
+tests/feeds: whatever it does not reject must come out exactly as feedparser has it,
+and parse_and_match must store the same whichever parser read the document.
+"""
+from pathlib import Path
+
+import feedparser
+import pytest
+
+from backend import crud, processing
+from backend.config import settings
+from backend.feedstream import StreamParser, Unsupported
+from backend.models import KeywordCreate
+
+FEEDS = Path(__file__).parent / "feeds"
+FIELDS = ('title', 'link', 'summary', 'published', 'published_parsed', 'updated', 'updated_parsed')
+
+# Documents the streaming parser must hand over to feedparser; the rest it parses itself
+HANDED_OVER = {
+    "encoding/declared_utf8_sent_latin1.xml",
+    "encoding/shift_jis.xml", # Multi-byte encodings other than UTF-8/16
+    "encoding/utf16_doctype.xml",
+    *(f"malformed/{path.name}" for path in (FEEDS / "malformed").glob("*.xml")),
+}
+
+
+def _corpus(name: str):
+    return sorted((FEEDS / name).glob("*.xml"))
+
+
+def _id(path: Path) -> str:
+    return f"{path.parent.name}/{path.name}"
+
+
+def _fields(entry):
+    return {field: entry.get(field) for field in FIELDS}
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+@pytest.mark.parametrize("path", _corpus("malformed") + _corpus("encoding"), ids=_id)
+def test_stream_parser_matches_feedparser(path):
+    document = path.read_bytes()
+    try:
+        entries = [_fields(entry) for entry in StreamParser(document).entries()]
+    except Unsupported:
+        assert _id(path) in HANDED_OVER
+        return
+    assert _id(path) not in HANDED_OVER
+    expected = feedparser.parse(document)
+    assert not expected.bozo
+    assert entries == [_fields(entry) for entry in expected.entries]
+
+
+def _parse(document: bytes, monkeypatch, stream: bool):
+    monkeypatch.setattr(settings, "FEED_STREAM_PARSE", stream)
+    parsed = processing.parse_and_match("http://example.invalid/feed.xml", document)
+    return {key: parsed.get(key) for key in ('error', 'entries', 'entry_timestamps', 'matched', 'unmatched')}
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+@pytest.mark.parametrize("path", _corpus("malformed") + _corpus("encoding"), ids=_id)
+def test_parse_and_match_is_parser_independent(path, monkeypatch):
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    document = path.read_bytes()
+    assert _parse(document, monkeypatch, stream=True) == _parse(document, monkeypatch, stream=False)
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_spooled_body_is_parsed_from_the_file(tmp_path):
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    document = (FEEDS / "encoding" / "koi8-r.xml").read_bytes()
+    spooled = tmp_path / "feed.xml"
+    spooled.write_bytes(document)
+    from_file = processing.parse_and_match("http://example.invalid/feed.xml", str(spooled))
+    in_memory = processing.parse_and_match("http://example.invalid/feed.xml", document)
+    assert from_file['parser'] == 'stream'
+    assert from_file['matched'] == in_memory['matched'] and len(from_file['matched']) == 2
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from backend import crud, monitor
+from backend.fetcher import FeedFetcher, FetchResult
+from backend.models import KeywordCreate, RSSFeedCreate
+from backend.writer import result_writer
+from benchmarks.feed_server import FeedServer
+
+
+@pytest.fixture
+def farm():
+    server = FeedServer(entries_per_feed=200).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = FeedFetcher(spool_bytes=4096)
+    fetcher.start()
+    yield fetcher
+    fetcher.stop()
+
+
+def test_large_bodies_are_spooled_to_a_file(farm, fetcher):
+    result = fetcher.fetch_blocking(farm.feed_url(1))
+    assert result.ok
+    assert result.content == b""
+    with open(result.content_file, "rb") as spooled:
+        assert spooled.read() == farm.get_body(1)
+    assert result.size == len(farm.get_body(1))
+    path = result.content_file
+    result.discard()
+    assert not os.path.exists(path)
+
+
+def test_small_bodies_stay_in_memory(farm):
+    fetcher = FeedFetcher(spool_bytes=0)
+    try:
+        result = fetcher.fetch_blocking(farm.feed_url(1))
+    finally:
+        fetcher.stop()
+    assert result.content == farm.get_body(1)
+    assert result.content_file is None
+
+
+def test_spooled_feed_is_processed_and_removed(farm, fetcher, monkeypatch):
+    monkeypatch.setattr(monitor, "fetcher", fetcher)
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    feed = crud.create_rss_feed(RSSFeedCreate(url=farm.feed_url(1)))
+    spooled = []
+    discard = FetchResult.discard
+
+    def tracking_discard(result):
+        spooled.append(result.content_file)
+        discard(result)
+    monkeypatch.setattr(FetchResult, "discard", tracking_discard)
+
+    try:
+        monitor.fetch_and_process_feed(feed['id'], feed['url'])
+    finally:
+        result_writer.stop()
+    assert spooled[0] is not None and not os.path.exists(spooled[0])
+    assert crud.get_results(keyword_filters=["python"])['total_items'] > 0
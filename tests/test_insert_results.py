@@ -0,0 +1,87 @@
+from backend import crud, database
+from backend.models import KeywordCreate, RSSFeedCreate
+
+
+def _entry(link: str, title: str, keywords=("python",)):
+    return {
+        'title': title,
+        'link': link,
+        'summary': "A longer summary of the story so that it gets a content hash",
+        'published_date': None,
+        'matched_keywords': list(keywords),
+    }
+
+
+def _insert(feed_id: int, entries):
+    conn = database.get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        new_ids = crud.insert_results(conn, feed_id, entries)
+        conn.commit()
+    finally:
+        conn.set_trace_callback(None)
+        conn.close()
+    return new_ids, statements
+
+
+def _feed(url: str = "http://example.invalid/feed.xml") -> int:
+    return crud.create_rss_feed(RSSFeedCreate(url=url))['id']
+
+
+def test_returns_ids_of_new_rows():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    feed_id = _feed()
+    new_ids, _ = _insert(feed_id, [_entry(f"http://example.invalid/{i}", f"Story number {i} about python packaging") for i in range(5)])
+
+    stored = crud.get_results_by_ids(new_ids)
+    assert [row['link'] for row in stored] == [f"http://example.invalid/{i}" for i in range(5)]
+    assert crud.get_results(keyword_filters=["python"])['total_items'] == 5
+    assert all(crud.get_result_sources(result_id)[0]['feed_id'] == feed_id for result_id in new_ids)
+
+
+def test_lookups_do_not_grow_with_the_batch():
+    feed_id = _feed()
+    _, small = _insert(feed_id, [_entry(f"http://example.invalid/a{i}", f"First batch story {i} about python") for i in range(2)])
+    _, large = _insert(feed_id, [_entry(f"http://example.invalid/b{i}", f"Second batch story {i} about python") for i in range(200)])
+
+    def selects(statements):
+        return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+    assert len(selects(large)) == len(selects(small))
+
+
+def test_copies_merge_into_stored_and_earlier_rows():
+    for keyword in ("python", "rust"):
+        crud.create_keyword(KeywordCreate(keyword=keyword))
+    first, second = _feed("http://one.invalid/feed.xml"), _feed("http://two.invalid/feed.xml")
+    (stored_id,), _ = _insert(first, [_entry("http://news.invalid/story", "Python and Rust in the kernel")])
+
+    new_ids, _ = _insert(second, [
+        _entry("https://www.news.invalid/story?utm_source=two", "Other title entirely for the url copy", ["rust"]), # Canonical URL
+        _entry("http://mirror.invalid/kernel", "Python and Rust in the kernel"), # Content
+        _entry("http://news.invalid/fresh", "A fresh story about python tooling"),
+        _entry("http://news.invalid/fresh#comments", "A fresh story about python tooling", ["rust"]), # Copy of the row above
+    ])
+
+    assert len(new_ids) == 1
+    assert crud.get_results()['total_items'] == 2
+    assert {source['feed_id'] for source in crud.get_result_sources(stored_id)} == {first, second}
+    stored, fresh = crud.get_results_by_ids([stored_id, new_ids[0]])
+    assert stored['matched_keywords'] == "python,rust"
+    assert fresh['matched_keywords'] == "python,rust"
+    assert crud.get_results(keyword_filters=["rust"])['total_items'] == 2
+
+
+def test_same_link_under_other_canonical_url_is_merged():
+    feed_id = _feed()
+    (stored_id,), _ = _insert(feed_id, [_entry("http://news.invalid/story", "Python packaging news")])
+    # As if stored while other tracking parameters were configured
+    conn = database.get_db_connection()
+    conn.execute("UPDATE results SET canonical_url = 'other', content_hash = NULL WHERE id = ?", (stored_id,))
+    conn.commit()
+    conn.close()
+
+    new_ids, _ = _insert(_feed("http://two.invalid/feed.xml"), [_entry("http://news.invalid/story", "Python packaging news")])
+    assert new_ids == []
+    assert len(crud.get_result_sources(stored_id)) == 2
@@ -0,0 +1,38 @@
+from backend import crud
+from backend.cache import VersionedCache
+from backend.models import KeywordCreate
+
+
+def _worker_cache():
+    """The keyword cache as a separate process (a parse pool worker) holds it."""
+    return VersionedCache(
+        loader=lambda: crud.get_all_keywords(active_only=True),
+        db_version_loader=lambda: crud.get_data_version('keywords'),
+        check_interval=0,
+    )
+
+
+def test_keyword_version_identifies_the_keyword_set_across_processes():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    worker_a = _worker_cache()
+    version_a, keywords_a = worker_a.get()
+
+    crud.create_keyword(KeywordCreate(keyword="rust"))
+    worker_b = _worker_cache()
+    version_b, keywords_b = worker_b.get()
+
+    # Different keyword sets never share a version, whatever each process reloaded before
+    assert [kw['keyword'] for kw in keywords_a] == ["python"]
+    assert [kw['keyword'] for kw in keywords_b] == ["python", "rust"]
+    assert version_a != version_b
+    # Once it sees the change, the first worker labels the set like the second
+    assert worker_a.get()[0] == version_b
+    assert crud.get_active_keywords_cached()[0] == version_b
+
+
+def test_keyword_version_is_stable_without_changes():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    worker = _worker_cache()
+    version = worker.get()[0]
+    worker.invalidate()
+    assert worker.get()[0] == version
@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+
+from backend import crud, database
+from backend.main import app
+from backend.models import KeywordCreate, RSSFeedCreate
+
+
+def _links(keyword_id: int) -> int:
+    conn = database.get_db_connection()
+    count = conn.execute("SELECT COUNT(*) FROM result_keywords WHERE keyword_id = ?", (keyword_id,)).fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_delete_keyword_without_results():
+    keyword = crud.create_keyword(KeywordCreate(keyword="python"))
+    response = TestClient(app).delete(f"/keywords/{keyword['id']}")
+    assert response.status_code == 204
+    assert crud.get_keyword(keyword['id']) is None
+
+
+def test_delete_keyword_with_results():
+    keyword = crud.create_keyword(KeywordCreate(keyword="python"))
+    feed = crud.create_rss_feed(RSSFeedCreate(url="http://example.invalid/feed.xml"))
+    crud.add_results_bulk(feed['id'], [{
+        'title': "Python 3.13 released",
+        'link': "http://example.invalid/story",
+        'summary': "Release notes",
+        'published_date': None,
+        'matched_keywords': ["python"],
+    }])
+    assert _links(keyword['id']) == 1
+
+    assert crud.delete_keyword(keyword['id']) is True
+    assert crud.get_keyword(keyword['id']) is None
+    assert _links(keyword['id']) == 0
+
+
+def test_delete_missing_keyword():
+    assert crud.delete_keyword(12345) is False
+    assert TestClient(app).delete("/keywords/12345").status_code == 404
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import crud, monitor
+from backend.leases import LeaseManager
+from backend.main import app
+from backend.models import RSSFeedCreate
+
+
+def _feeds(count: int):
+    return [crud.create_rss_feed(RSSFeedCreate(url=f"http://example.invalid/{i}.xml"))['id'] for i in range(count)]
+
+
+def _manager(worker_id: str, ttl: float = 60, **kwargs) -> LeaseManager:
+    return LeaseManager(on_change=kwargs.pop('on_change', lambda *_: None), worker_id=worker_id, ttl=ttl, **kwargs)
+
+
+def test_workers_split_the_feeds():
+    feed_ids = _feeds(5)
+    first, second = _manager("first"), _manager("second")
+    first.heartbeat()
+    assert first.held() == feed_ids # Alone so far
+
+    second.heartbeat() # Two live workers: a share is 3, so one feed is still unassigned
+    first.heartbeat() # Gives up the feeds above its share
+    second.heartbeat()
+    assert len(first.held()) == 3 and len(second.held()) == 2
+    assert sorted(first.held() + second.held()) == feed_ids
+    assert first.is_leader() and not second.is_leader()
+
+
+def test_expired_leases_are_taken_over():
+    feed_ids = _feeds(2)
+    dead = _manager("dead", ttl=0.05)
+    dead.heartbeat()
+    assert dead.held() == feed_ids
+
+    survivor = _manager("survivor", ttl=0.05)
+    survivor.heartbeat()
+    assert survivor.held() == []
+    time.sleep(0.1)
+    assert not dead.holds(feed_ids[0]) # Stops running the feeds by its own clock first
+    survivor.heartbeat()
+    assert survivor.held() == feed_ids
+
+
+def test_released_leases_are_claimed_at_once():
+    feed_ids = _feeds(2)
+    leaving, staying = _manager("leaving"), _manager("staying")
+    leaving.heartbeat()
+    crud.remove_worker(leaving.worker_id) # What stop() does
+    staying.heartbeat()
+    assert staying.held() == feed_ids
+
+
+@pytest.fixture
+def in_lease_mode(monkeypatch):
+    def use(manager: LeaseManager):
+        monkeypatch.setattr(monitor, "lease_manager", manager)
+    return use
+
+
+def test_manual_refetch_goes_to_the_lease_holder(in_lease_mode, monkeypatch):
+    feed_id, = _feeds(1)
+    requested = []
+    holder = _manager("holder", on_refetch=requested.extend)
+    holder.heartbeat()
+    api_worker = _manager("api")
+    api_worker.heartbeat()
+    assert not api_worker.holds(feed_id)
+
+    in_lease_mode(api_worker)
+    fetched = []
+    monkeypatch.setattr(monitor, "fetch_and_process_feed", lambda *args: fetched.append(args))
+    response = TestClient(app).post(f"/rss-feeds/{feed_id}/refetch")
+    assert response.status_code == 202
+    assert fetched == [] # Not fetched next to the holder's own runs
+
+    holder.heartbeat()
+    assert requested == [feed_id]
+    holder.heartbeat()
+    assert requested == [feed_id] # Taken once
+
+
+def test_manual_refetch_runs_on_the_lease_holder(in_lease_mode, monkeypatch):
+    feed_id, = _feeds(1)
+    holder = _manager("holder")
+    holder.heartbeat()
+    in_lease_mode(holder)
+    fetched = []
+    monkeypatch.setattr(monitor, "fetch_and_process_feed", lambda *args: fetched.append(args))
+    assert TestClient(app).post(f"/rss-feeds/{feed_id}/refetch").status_code == 202
+    assert fetched == [(feed_id, "http://example.invalid/0.xml")]
+    assert crud.take_feed_refetch_requests(holder.worker_id) == []
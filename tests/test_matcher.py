@@ -0,0 +1,55 @@
+import re
+
+import pytest
+
+from backend import matcher
+from backend.matcher import KeywordMatcher, get_matcher
+
+
+def _regex_match(keywords, text):
+    """What the per-keyword regex loop the matcher replaced returned."""
+    return [kw for kw in dict.fromkeys(keywords) if kw and re.search(r'\b' + re.escape(kw) + r'\b', text)]
+
+
+@pytest.mark.parametrize("keywords, text", [
+    (["python", "rust"], "python 3.13 released"),
+    (["python"], "pythonic code"),
+    (["python"], "cpython internals"),
+    (["machine learning"], "new machine learning models"),
+    (["machine learning"], "machine learnings"),
+    (["machine learning"], "a machine  learning gap"),
+    (["c++", "c#", ".net"], "c++ and c# on .net"),
+    (["c++"], "c++20 modules"),
+    (["ai", "ai act"], "the eu ai act passes"),
+    (["data", "big data", "data"], "big data, small data"),
+    (["über"], "über alles"),
+    (["snake_case"], "snake_case names"),
+    (["", "python"], "python"),
+])
+def test_match_agrees_with_regex(keywords, text):
+    assert KeywordMatcher(keywords).match(text) == _regex_match(keywords, text)
+
+
+def test_match_keeps_keyword_order():
+    keywords = ["zeta", "alpha", "big data", "c++"]
+    assert KeywordMatcher(keywords).match("c++20 for big data, alpha and zeta") == keywords
+
+
+def test_no_keywords_match_nothing():
+    assert KeywordMatcher([]).match("anything") == []
+
+
+def test_get_matcher_caches_by_version():
+    matcher.invalidate_matcher()
+    first = get_matcher(["python"], version=1)
+    assert get_matcher(["ignored"], version=1) is first
+    rebuilt = get_matcher(["rust"], version=2)
+    assert rebuilt is not first
+    assert rebuilt.match("rust and python") == ["rust"]
+
+
+def test_get_matcher_caches_by_keywords():
+    matcher.invalidate_matcher()
+    first = get_matcher(["python", "rust"])
+    assert get_matcher(["python", "rust"]) is first
+    assert get_matcher(["rust", "python"]) is not first
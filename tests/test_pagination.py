@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import crud
+from backend.main import app
+from backend.models import KeywordCreate, RSSFeedCreate
+
+
+def _store(count: int, start: int = 0):
+    feed = crud.create_rss_feed(RSSFeedCreate(url=f"http://example.invalid/feed/{start}.xml"))
+    base = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    entries = []
+    for i in range(start, start + count):
+        # Runs of equal dates and some undated entries, to exercise every tie-break of the keyset
+        published = None if i % 7 == 0 else base - timedelta(hours=i // 3)
+        entries.append({
+            'title': f"Story {i}",
+            'link': f"http://example.invalid/story/{i}",
+            'summary': "python",
+            'published_date': published,
+            'matched_keywords': ["python"],
+        })
+    crud.add_results_bulk(feed['id'], entries)
+    return feed['id']
+
+
+def _walk(page_size: int, **filters):
+    ids, token = [], None
+    while True:
+        page = crud.get_results(page_size=page_size, use_cursor=True, cursor_token=token, **filters)
+        ids.extend(row['id'] for row in page['items'])
+        if not page['has_more']:
+            assert page['next_cursor'] is None
+            return ids
+        token = page['next_cursor']
+
+
+@pytest.mark.parametrize("page_size", [1, 4, 12, 50])
+def test_cursor_pages_match_offset_order(page_size):
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    _store(40)
+    every_row = [row['id'] for row in crud.get_results(page_size=100)['items']]
+    assert len(every_row) == 40
+    assert _walk(page_size) == every_row
+    assert _walk(page_size, keyword_filters=["python"]) == every_row
+
+
+def test_cursor_is_stable_while_results_arrive():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    _store(10)
+    first = crud.get_results(page_size=5, use_cursor=True)
+    _store(10, start=100) # Newer and undated rows, some sorting before the cursor
+    second = crud.get_results(page_size=5, use_cursor=True, cursor_token=first['next_cursor'])
+    seen = {row['id'] for row in first['items']}
+    assert not seen & {row['id'] for row in second['items']}
+
+
+def test_cursor_round_trip():
+    row = {'published_date': "2024-05-01T00:00:00+00:00", 'processed_at': "2024-05-02T00:00:00", 'id': 7}
+    assert crud.decode_cursor(crud.encode_cursor(row)) == ("2024-05-01T00:00:00+00:00", "2024-05-02T00:00:00", 7)
+
+
+def test_invalid_cursor_is_a_bad_request():
+    client = TestClient(app)
+    response = client.get("/results/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    response = client.get("/results/", params={"pagination": "cursor", "page_size": 2})
+    assert response.status_code == 200
+    assert response.json()['next_cursor'] is None
+
+
+def test_cached_count_follows_inserts_and_deletes():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    feed_id = _store(5)
+    assert crud.get_results(keyword_filters=["python"])['total_items'] == 5
+    _store(3, start=50)
+    assert crud.get_results(keyword_filters=["python"])['total_items'] == 8
+    crud.delete_rss_feed(feed_id)
+    assert crud.get_results(keyword_filters=["python"])['total_items'] == 3
@@ -0,0 +1,73 @@
+import sqlite3
+import threading
+
+import pytest
+
+from backend import database
+
+
+def test_nested_acquire_reuses_the_thread_connection():
+    pool = database.ConnectionPool(size=2, timeout=1)
+    outer = pool.acquire()
+    inner = pool.acquire()
+    assert inner._conn is outer._conn
+    inner.close()
+    assert pool.stats()['in_use'] == 1
+    outer.close()
+    stats = pool.stats()
+    assert (stats['in_use'], stats['idle'], stats['created'], stats['reentrant_reuses']) == (0, 1, 1, 1)
+    pool.close_all()
+
+
+def test_idle_connections_are_reused():
+    pool = database.ConnectionPool(size=2, timeout=1)
+    first = pool.acquire()
+    raw = first._conn
+    first.close()
+    again = pool.acquire()
+    assert again._conn is raw
+    again.close()
+    pool.close_all()
+
+
+def test_open_transaction_is_rolled_back_on_release():
+    pool = database.ConnectionPool(size=1, timeout=1)
+    conn = pool.acquire()
+    conn.execute("INSERT INTO keywords (keyword) VALUES ('leaked')")
+    assert conn.in_transaction
+    conn.close()
+
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM keywords WHERE keyword = 'leaked'").fetchone()[0] == 0
+    conn.close()
+    pool.close_all()
+
+
+def test_full_pool_waits_then_times_out():
+    pool = database.ConnectionPool(size=1, timeout=0.05)
+    held = pool.acquire()
+    errors = []
+
+    def other_thread():
+        try:
+            pool.acquire().close()
+        except TimeoutError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+    assert len(errors) == 1 and pool.stats()['waits'] == 1
+    held.close()
+    pool.close_all()
+
+
+def test_size_zero_opens_a_connection_per_call():
+    pool = database.ConnectionPool(size=0)
+    conn = pool.acquire()
+    raw = conn._conn
+    conn.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        raw.execute("SELECT 1") # Closed
+    assert pool.stats()['idle'] == 0
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from backend import crud, monitor
+from backend.models import RSSFeedCreate, RSSFeedUpdate
+
+
+@pytest.fixture(autouse=True)
+def scheduler(monkeypatch):
+    """A scheduler of its own that never runs its jobs."""
+    scheduler = BackgroundScheduler(timezone=timezone.utc)
+    scheduler.start(paused=True)
+    monkeypatch.setattr(monitor, "scheduler", scheduler)
+    monkeypatch.setattr(monitor, "lease_manager", None)
+    yield scheduler
+    scheduler.shutdown(wait=False)
+
+
+def _feed(name: str, active: bool = True) -> dict:
+    url = f"http://{name}.invalid/feed.xml"
+    feed = crud.create_rss_feed(RSSFeedCreate(url=url, name=name))
+    if not active:
+        feed = crud.update_rss_feed(feed['id'], RSSFeedUpdate(url=url, is_active=False))
+    return feed
+
+
+def _next_runs(scheduler):
+    return {job.id: job.next_run_time for job in scheduler.get_jobs()}
+
+
+def test_reconcile_adds_missing_jobs_then_leaves_them_alone(scheduler):
+    active = [_feed("a"), _feed("b")]
+    _feed("inactive", active=False)
+
+    summary = monitor.reconcile_feed_jobs()
+    assert summary['added'] == 2 and summary['unchanged'] == 1
+    assert set(_next_runs(scheduler)) == {f"feed_{feed['id']}" for feed in active}
+
+    before = _next_runs(scheduler)
+    summary = monitor.reconcile_feed_jobs()
+    assert summary['unchanged'] == 3 and summary['added'] == summary['updated'] == 0
+    assert _next_runs(scheduler) == before
+
+
+def test_reconcile_fixes_only_the_differences(scheduler):
+    kept, paused, deleted, moved = (_feed(name) for name in ("kept", "paused", "deleted", "moved"))
+    monitor.reconcile_feed_jobs()
+    kept_next_run = monitor.feed_next_run_time(kept['id'])
+
+    crud.update_rss_feed(paused['id'], RSSFeedUpdate(url=paused['url'], is_active=False))
+    crud.delete_rss_feed(deleted['id'])
+    crud.update_rss_feed(moved['id'], RSSFeedUpdate(url="http://moved.invalid/new.xml"))
+    before = datetime.now(timezone.utc)
+
+    summary = monitor.reconcile_feed_jobs()
+
+    assert (summary['paused'], summary['removed'], summary['updated'], summary['unchanged']) == (1, 1, 1, 1)
+    assert monitor.feed_next_run_time(kept['id']) == kept_next_run
+    assert monitor.feed_next_run_time(paused['id']) is None
+    assert scheduler.get_job(f"feed_{deleted['id']}") is None
+    moved_job = scheduler.get_job(f"feed_{moved['id']}")
+    assert moved_job.args == [moved['id'], "http://moved.invalid/new.xml"]
+    assert moved_job.next_run_time <= before + timedelta(seconds=1) # A new URL is fetched right away
+
+
+def test_sync_feed_job_touches_one_feed(scheduler):
+    other, changed = _feed("other"), _feed("changed")
+    monitor.reconcile_feed_jobs()
+    other_next_run = monitor.feed_next_run_time(other['id'])
+
+    crud.update_rss_feed(changed['id'], RSSFeedUpdate(url=changed['url'], is_active=False))
+    assert monitor.sync_feed_job(changed['id']) == 'paused'
+    crud.update_rss_feed(changed['id'], RSSFeedUpdate(url=changed['url'], is_active=True))
+    assert monitor.sync_feed_job(changed['id']) == 'resumed'
+    crud.delete_rss_feed(changed['id'])
+    assert monitor.sync_feed_job(changed['id']) == 'removed'
+
+    assert monitor.feed_next_run_time(other['id']) == other_next_run
+
+
+class _Leases:
+    def __init__(self, feed_ids):
+        self.feed_ids = set(feed_ids)
+
+    def assigned(self, feed_id: int) -> bool:
+        return feed_id in self.feed_ids
+
+
+def test_reconcile_schedules_only_leased_feeds(scheduler, monkeypatch):
+    mine, theirs = _feed("mine"), _feed("theirs")
+    monitor.reconcile_feed_jobs()
+    monkeypatch.setattr(monitor, "lease_manager", _Leases({mine['id']}))
+
+    summary = monitor.reconcile_feed_jobs()
+
+    assert summary['leased_elsewhere'] == 1 and summary['removed'] == 1
+    assert set(_next_runs(scheduler)) == {f"feed_{mine['id']}"}
+    assert monitor.sync_feed_job(theirs['id']) == 'leased_elsewhere'
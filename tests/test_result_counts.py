@@ -0,0 +1,31 @@
+from backend import crud
+from backend.models import KeywordCreate, RSSFeedCreate
+
+
+def _entry(link: str, keywords):
+    return {
+        'title': "Python and Rust in the kernel",
+        'link': link,
+        'summary': "Both languages are now accepted for new drivers in the next release",
+        'published_date': None,
+        'matched_keywords': keywords,
+    }
+
+
+def test_merged_duplicate_updates_filtered_counts():
+    for keyword in ("python", "rust"):
+        crud.create_keyword(KeywordCreate(keyword=keyword))
+    first = crud.create_rss_feed(RSSFeedCreate(url="http://one.invalid/feed.xml"))
+    second = crud.create_rss_feed(RSSFeedCreate(url="http://two.invalid/feed.xml"))
+    crud.add_results_bulk(first['id'], [_entry("http://news.invalid/story?utm_source=one", ["python"])])
+
+    # Cached while the result only has the first feed and keyword
+    assert crud.get_results(keyword_filters=["rust"])['total_items'] == 0
+    assert crud.get_results(feed_ids=[second['id']])['total_items'] == 0
+
+    # The same story from another feed is merged into the stored result
+    assert crud.add_results_bulk(second['id'], [_entry("http://news.invalid/story?utm_source=two", ["python", "rust"])]) == 0
+
+    assert crud.get_results(keyword_filters=["rust"])['total_items'] == 1
+    assert crud.get_results(feed_ids=[second['id']])['total_items'] == 1
+    assert crud.get_results()['total_items'] == 1
@@ -0,0 +1,109 @@
+import functools
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+
+from backend import crud, dates, retention
+from backend.config import settings
+from backend.models import KeywordCreate, RSSFeedCreate, RetentionPolicyUpdate
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "archive"
+    monkeypatch.setattr(retention, "ResultArchive", functools.partial(retention.ResultArchive, directory=str(directory)))
+    monkeypatch.setattr(settings, "RETENTION_BATCH_PAUSE_SECONDS", 0)
+    monkeypatch.setattr(settings, "RETENTION_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "RETENTION_MAX_AGE_DAYS", 0)
+    monkeypatch.setattr(settings, "RETENTION_MAX_ROWS", 0)
+    monkeypatch.setattr(settings, "RETENTION_KEEP_RECENT_PER_FEED", 0)
+    monkeypatch.setattr(settings, "RETENTION_ARCHIVE", True)
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    return directory
+
+
+def _feed_with_results(name: str, ages_in_days):
+    """A feed with one result per age, oldest first (so ids grow with recency)."""
+    feed = crud.create_rss_feed(RSSFeedCreate(url=f"http://{name}.invalid/feed.xml"))
+    now = dates.now_utc()
+    crud.add_results_bulk(feed['id'], [{
+        'title': f"{name} story {i}",
+        'link': f"http://{name}.invalid/story/{i}",
+        'summary': "python",
+        'published_date': now - timedelta(days=age),
+        'matched_keywords': ["python"],
+    } for i, age in enumerate(ages_in_days)])
+    return feed['id']
+
+
+def _titles(feed_id: int):
+    return sorted(row['title'] for row in crud.get_results(feed_ids=[feed_id], page_size=100)['items'])
+
+
+def _archived(directory):
+    rows = []
+    for path in sorted(directory.glob(retention.ARCHIVE_PATTERN)):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def test_old_results_are_archived_then_deleted(archive_dir, monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_MAX_AGE_DAYS", 30)
+    feed_id = _feed_with_results("one", [90, 80, 70, 60, 50, 40, 5, 1])
+
+    report = retention.run_retention(maintenance=False)
+
+    assert report['error'] is None
+    assert report['deleted'] == report['archived'] == 6
+    assert _titles(feed_id) == ["one story 6", "one story 7"]
+    assert sorted(row['title'] for row in _archived(archive_dir)) == [f"one story {i}" for i in range(6)]
+
+
+def test_newest_results_of_a_feed_are_kept(monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_MAX_AGE_DAYS", 30)
+    monkeypatch.setattr(settings, "RETENTION_KEEP_RECENT_PER_FEED", 3)
+    feed_id = _feed_with_results("one", [90, 80, 70, 60, 50])
+
+    assert retention.run_retention(maintenance=False)['deleted'] == 2
+    assert _titles(feed_id) == ["one story 2", "one story 3", "one story 4"]
+
+
+def test_feed_policy_overrides_global_settings(archive_dir):
+    capped = _feed_with_results("capped", [5, 4, 3, 2, 1])
+    untouched = _feed_with_results("untouched", [5, 4, 3, 2, 1])
+    crud.set_retention_policy(capped, RetentionPolicyUpdate(max_rows=2, archive=False))
+
+    report = retention.run_retention(maintenance=False)
+
+    assert report['deleted'] == 3 and report['archived'] == 0
+    assert _titles(capped) == ["capped story 3", "capped story 4"]
+    assert len(_titles(untouched)) == 5
+    assert _archived(archive_dir) == []
+
+
+def test_table_cap_removes_oldest_rows_first(monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_MAX_ROWS", 4)
+    first = _feed_with_results("first", [9, 8, 7])
+    second = _feed_with_results("second", [3, 2, 1])
+
+    assert retention.run_retention(maintenance=False)['deleted'] == 2
+    assert _titles(first) == ["first story 2"]
+    assert len(_titles(second)) == 3
+
+
+def test_no_policy_removes_nothing(archive_dir):
+    feed_id = _feed_with_results("one", [900, 1])
+    report = retention.run_retention()
+    assert report['deleted'] == 0 and report['analyzed']
+    assert len(_titles(feed_id)) == 2
+    assert not archive_dir.exists()
+
+
+def test_effective_policy_merges_overrides(monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_MAX_AGE_DAYS", 30)
+    overrides = {1: {'feed_id': 1, 'max_age_days': None, 'max_rows': 10, 'archive': 0}}
+    assert retention.effective_policy(1, overrides) == {'max_age_days': 30, 'max_rows': 10, 'archive': False}
+    assert retention.effective_policy(2, overrides) == {'max_age_days': 30, 'max_rows': None, 'archive': True}
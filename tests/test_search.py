@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from backend import crud, database
+from backend.main import app
+from backend.models import RSSFeedCreate
+
+
+def _store_result(title: str):
+    feed = crud.create_rss_feed(RSSFeedCreate(url="http://example.invalid/feed.xml"))
+    crud.add_results_bulk(feed['id'], [{
+        'title': title,
+        'link': "http://example.invalid/story",
+        'summary': "A story about python packaging",
+        'published_date': None,
+        'matched_keywords': ["python"],
+    }])
+
+
+def test_search_finds_stored_results():
+    _store_result("Python 3.13 released")
+    response = TestClient(app).get("/results/search", params={"q": "python"})
+    assert response.status_code == 200
+    assert response.json()['total_items'] == 1
+
+
+def test_search_without_fts5_returns_503():
+    _store_result("Python 3.13 released")
+    # What create_tables leaves behind when SQLite has no FTS5
+    conn = database.get_db_connection()
+    for trigger in ("results_fts_insert", "results_fts_delete", "results_fts_update"):
+        conn.execute(f"DROP TRIGGER {trigger}")
+    conn.execute("DROP TABLE results_fts")
+    conn.commit()
+    conn.close()
+
+    response = TestClient(app).get("/results/search", params={"q": "python"})
+    assert response.status_code == 503
+    assert "FTS5" in response.json()['detail']
+
+
+def test_search_snippet_escapes_feed_markup():
+    feed = crud.create_rss_feed(RSSFeedCreate(url="http://example.invalid/feed.xml"))
+    crud.add_results_bulk(feed['id'], [{
+        'title': "Python <script>alert('x')</script> released",
+        'link': "http://example.invalid/story",
+        'summary': "Notes with <img src=x onerror=alert(1)> markup",
+        'published_date': None,
+        'matched_keywords': ["python"],
+    }])
+    response = TestClient(app).get("/results/search", params={"q": "python"})
+    assert response.status_code == 200
+    snippet = response.json()['items'][0]['snippet']
+    assert "<script>" not in snippet and "<img" not in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "<mark>Python</mark>" in snippet
@@ -0,0 +1,62 @@
+from backend import crud
+from backend.models import KeywordCreate, RSSFeedCreate
+from backend.seen import SeenEntries
+
+
+def test_stored_links_are_always_known():
+    seen = SeenEntries(capacity_per_feed=10)
+    seen.mark_stored(1, ["http://a.invalid/1"])
+    assert seen.is_known(1, "http://a.invalid/1", fingerprint=123, keywords_version=9)
+    assert not seen.is_known(2, "http://a.invalid/1", fingerprint=123, keywords_version=9)
+
+
+def test_unmatched_links_are_rescanned_after_an_edit_or_new_keywords():
+    seen = SeenEntries(capacity_per_feed=10)
+    seen.mark_unmatched(1, "http://a.invalid/1", fingerprint=5, keywords_version=1)
+    assert seen.is_known(1, "http://a.invalid/1", 5, 1)
+    assert not seen.is_known(1, "http://a.invalid/1", 6, 1) # Edited entry
+    assert not seen.is_known(1, "http://a.invalid/1", 5, 2) # Keywords changed
+
+
+def test_least_recently_used_links_are_evicted():
+    seen = SeenEntries(capacity_per_feed=2)
+    seen.mark_stored(1, ["http://a.invalid/1", "http://a.invalid/2"])
+    assert seen.is_known(1, "http://a.invalid/1", 0, 0) # Now the most recently used
+    seen.mark_stored(1, ["http://a.invalid/3"])
+    assert seen.is_known(1, "http://a.invalid/1", 0, 0)
+    assert not seen.is_known(1, "http://a.invalid/2", 0, 0)
+    assert seen.size() == 2
+
+
+def test_stop_hint_and_timestamps():
+    seen = SeenEntries(capacity_per_feed=10)
+    assert seen.stop_hint(1) is None
+    seen.mark_stored(1, ["http://a.invalid/1"])
+    seen.mark_unmatched(1, "http://a.invalid/2", 7, 3)
+    assert seen.record_timestamps(1, [300.0, 200.0, 100.0]) == [300.0, 200.0, 100.0]
+    assert seen.stop_hint(1) == {'high_water': 300.0, 'links': {"http://a.invalid/1": None, "http://a.invalid/2": 3}}
+
+    # A run that stopped early at 200 gets the older times back from the previous run
+    assert seen.record_timestamps(1, [400.0, 300.0], stopped_at=200.0) == [400.0, 300.0, 100.0]
+    assert seen.stop_hint(1)['high_water'] == 400.0
+
+    seen.forget(1)
+    assert seen.stop_hint(1) is None and seen.size() == 0
+
+
+def test_warm_loads_stored_links():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    feed = crud.create_rss_feed(RSSFeedCreate(url="http://a.invalid/feed.xml"))
+    crud.add_results_bulk(feed['id'], [{
+        'title': f"Story {i}",
+        'link': f"http://a.invalid/story/{i}",
+        'summary': "python",
+        'published_date': None,
+        'matched_keywords': ["python"],
+    } for i in range(5)])
+
+    seen = SeenEntries(capacity_per_feed=3)
+    seen.warm()
+    assert seen.size() == 3
+    assert seen.is_known(feed['id'], "http://a.invalid/story/4", 0, 0)
+    assert not seen.is_known(feed['id'], "http://a.invalid/story/0", 0, 0)
@@ -0,0 +1,87 @@
+from concurrent.futures import Future
+
+from backend import crud
+from backend.models import KeywordCreate, RSSFeedCreate
+from backend.writer import GroupCommitWriter
+
+
+def _entries(name: str, count: int = 2):
+    return [{
+        'title': f"{name} story {i}",
+        'link': f"http://{name}.invalid/story/{i}",
+        'summary': "python",
+        'published_date': None,
+        'matched_keywords': ["python"],
+    } for i in range(count)]
+
+
+def _feed(name: str) -> int:
+    return crud.create_rss_feed(RSSFeedCreate(url=f"http://{name}.invalid/feed.xml"))['id']
+
+
+def _queue_then_start(writer: GroupCommitWriter, batches):
+    """Queues every batch before the writer thread runs, so they are all waiting at once."""
+    futures = []
+    for feed_id, entries in batches:
+        future = Future()
+        writer._queue.put((feed_id, entries, None, future))
+        futures.append(future)
+    writer.start()
+    return futures
+
+
+def test_waiting_batches_share_one_commit():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    writer = GroupCommitWriter(max_batches_per_commit=10)
+    futures = _queue_then_start(writer, [(_feed(name), _entries(name)) for name in ("a", "b", "c")])
+    try:
+        new_ids = [future.result(timeout=5) for future in futures]
+    finally:
+        writer.stop()
+
+    assert writer.commits == 1 and writer.batches_written == 3
+    assert [len(ids) for ids in new_ids] == [2, 2, 2]
+    assert crud.get_results()['total_items'] == 6
+
+
+def test_group_size_is_capped():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    writer = GroupCommitWriter(max_batches_per_commit=2)
+    futures = _queue_then_start(writer, [(_feed(name), _entries(name, 1)) for name in ("a", "b", "c", "d", "e")])
+    try:
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        writer.stop()
+    assert writer.commits == 3 and writer.batches_written == 5
+
+
+def test_failed_batch_does_not_lose_the_rest_of_its_group():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    broken = [{'title': "no link", 'summary': "python", 'published_date': None, 'matched_keywords': ["python"]}]
+    writer = GroupCommitWriter()
+    good, bad, also_good = _queue_then_start(writer, [
+        (_feed("a"), _entries("a")),
+        (_feed("b"), broken),
+        (_feed("c"), _entries("c")),
+    ])
+    try:
+        assert len(good.result(timeout=5)) == 2
+        assert bad.exception(timeout=5) is not None
+        assert len(also_good.result(timeout=5)) == 2
+    finally:
+        writer.stop()
+    assert crud.get_results()['total_items'] == 4
+
+
+def test_submit_starts_the_writer_and_skips_empty_batches():
+    crud.create_keyword(KeywordCreate(keyword="python"))
+    writer = GroupCommitWriter()
+    assert writer.submit(_feed("a"), []).result(timeout=0) == []
+    assert not writer.running
+    try:
+        assert len(writer.submit(_feed("b"), _entries("b")).result(timeout=5)) == 2
+        assert writer.running
+    finally:
+        writer.stop()
+    assert not writer.running